@@ -14,11 +14,6 @@ fi
 LOGS_DIR="$1"
 MAX_PARALLEL="${2:-4}"  # Default to 4 jobs at once
 
-RED='\033[0;31m'
-GREEN='\033[0;32m'
-YELLOW='\033[1;33m'
-NC='\033[0m'
-
 if [ -f "venv/bin/activate" ]; then
     source venv/bin/activate
 fi
@@ -31,53 +26,12 @@ echo "Max parallel jobs: $MAX_PARALLEL"
 echo "Start time: $(date)"
 echo ""
 
-LOG_FILES=$(find "$LOGS_DIR" -name "*.log" -type f | sort)
-
-if [ -z "$LOG_FILES" ]; then
-    echo "${RED}ERROR: No log files found in $LOGS_DIR${NC}"
-    exit 1
-fi
-
-TOTAL_LOGS=$(echo "$LOG_FILES" | wc -l | tr -d ' ')
-echo "Found $TOTAL_LOGS log file(s) to analyze"
-echo "================================================================================"
-echo ""
-
 RESULTS_DIR="results/$(basename $LOGS_DIR)"
-mkdir -p "$RESULTS_DIR"
 
-# Process a single log file
-analyze_log() {
-    local LOG_FILE="$1"
-    local LOG_NAME=$(basename "$LOG_FILE" .log)
-    local RESULTS_CSV="$RESULTS_DIR/${LOG_NAME}_metrics.csv"
-
-    echo "${YELLOW}Analyzing${NC}: $LOG_NAME"
-
-    if python3 benchmark/Benchmark.py analyze "$LOG_FILE" -o "$RESULTS_CSV" > /dev/null 2>&1; then
-        echo "${GREEN}✓ Complete${NC}: $LOG_NAME"
-        return 0
-    else
-        echo "${RED}✗ Failed${NC}: $LOG_NAME"
-        return 1
-    fi
-}
-
-export -f analyze_log
-export RESULTS_DIR GREEN RED YELLOW NC
-
-echo "Starting parallel analysis..."
-echo ""
-
-# Use xargs to run multiple analyses at once
-if command -v xargs &> /dev/null; then
-    echo "$LOG_FILES" | xargs -P "$MAX_PARALLEL" -I {} bash -c 'analyze_log "$@"' _ {}
-else
-    # If xargs isn't available, just do them one at a time
-    for LOG_FILE in $LOG_FILES; do
-        analyze_log "$LOG_FILE"
-    done
-fi
+# One process analyzes every log with a pool of workers, shows progress and writes
+# per-log CSVs, an error report per failed log and results/<dir>/combined_metrics.csv
+STATUS=0
+python3 benchmark/Benchmark.py analyze-dir "$LOGS_DIR" -o "$RESULTS_DIR" -j "$MAX_PARALLEL" || STATUS=$?
 
 echo ""
 echo "================================================================================"
@@ -87,3 +41,5 @@ echo "End time: $(date)"
 echo ""
 echo "Output directory: $RESULTS_DIR"
 echo "================================================================================"
+
+exit $STATUS
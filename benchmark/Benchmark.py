@@ -1,5 +1,11 @@
 import sys
 import argparse
+import contextlib
+import csv
+import io
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from os import path
 
 sys.path.insert(0, path.dirname(path.abspath(__file__)))
@@ -12,6 +18,22 @@ import importlib
 import time
 from LoggingModule import console_log, ConsoleLogLevel
 from MetricsCalculator import MetricsCalculator
+from LiveMetrics import LiveMetricsServer
+from LocalBroker import LocalBroker, LOCAL_BROKER_ADDRESS
+from LoopbackClient import NULL_BROKER_ADDRESS
+from LogGenerator import LogGenerator, GeneratorSettings
+from rich.console import Console
+from rich.progress import Progress, TextColumn, BarColumn, TaskProgressColumn, SpinnerColumn, TimeElapsedColumn
+from rich.table import Table
+from typing import Dict, List, Optional, Tuple
+
+# Metrics of each log shown in the summary table of a batch analysis, the combined CSV has all of them
+SUMMARY_METRICS: List[Tuple[str, str, str]] = [
+    ("Messaging", "Throughput (msgs/sec)", "Throughput (msgs/s)"),
+    ("Messaging", "Latency Avg (ms)", "Latency Avg (ms)"),
+    ("Purpose Correctness", "Avg False Accept Rate", "False Accept"),
+    ("Purpose Correctness", "Avg False Reject Rate", "False Reject"),
+]
 
 
 def main():
@@ -27,16 +49,71 @@ def main():
 
     run_benchmark_parser = subparsers.add_parser("run")
     run_benchmark_parser.add_argument('config', help='Path to configuration file')
-    run_benchmark_parser.add_argument('broker_address', help='IP or FQDN of the broker')
+    run_benchmark_parser.add_argument('broker_address', help=f'IP or FQDN of the broker, "{LOCAL_BROKER_ADDRESS}" to run against a local in-process broker, '
+                                            f'or "{NULL_BROKER_ADDRESS}" to measure the benchmark\'s own ceiling without a broker')
     run_benchmark_parser.add_argument('-p', '--port', type=int, default=1883,
                        help='Broker port (default: 1883)')
     run_benchmark_parser.add_argument('-o', '--logfile', help='Log file path (optional)')
     run_benchmark_parser.add_argument('-v', '--verbose', help='Verbose logging flag (optional)', action='store_true')
+    run_benchmark_parser.add_argument('-m', '--metrics-port', dest='metrics_port', type=int,
+                       help='Serve live Prometheus metrics on this localhost port (optional)')
+    run_benchmark_parser.add_argument('-s', '--saturate', action='store_true',
+                       help='Publish as fast as possible, ignoring publication periods (optional)')
     
     analyze_results_parser = subparsers.add_parser("analyze")
     analyze_results_parser.add_argument("logfile", help="The path to log file to analyze")
     analyze_results_parser.add_argument("-o" "--outfile", dest="outfile", help="The file in which to store the results (default: '<logfile>.csv')")
     analyze_results_parser.add_argument('-v', '--verbose', help='Verbose logging flag (optional)', action='store_true')
+    analyze_results_parser.add_argument('--warmup-ms', dest='warmup_ms', type=float, default=0.0,
+                       help='Time after the start of the run excluded from messaging metrics (default: 0)')
+    analyze_results_parser.add_argument('--cooldown-ms', dest='cooldown_ms', type=float, default=0.0,
+                       help='Time before the end of the run excluded from messaging metrics (default: 0)')
+    analyze_results_parser.add_argument('--steady-state', dest='steady_state', action='store_true',
+                       help='Only calculate messaging metrics where throughput and latency are stable (optional)')
+    analyze_results_parser.add_argument('--window-ms', dest='window_ms', type=float, default=1000.0,
+                       help='Window length of the time series export (default: 1000)')
+
+    analyze_dir_parser = subparsers.add_parser("analyze-dir")
+    analyze_dir_parser.add_argument("logs_dir", help="The directory to search for .log files, including subdirectories")
+    analyze_dir_parser.add_argument('-o', '--outdir', help="The directory in which to store the results (default: 'results/<logs_dir name>')")
+    analyze_dir_parser.add_argument('-j', '--jobs', type=int, default=4, help='Logs analyzed at once, each in its own process (default: 4)')
+    analyze_dir_parser.add_argument('-v', '--verbose', help='Verbose logging flag (optional)', action='store_true')
+    analyze_dir_parser.add_argument('--warmup-ms', dest='warmup_ms', type=float, default=0.0,
+                       help='Time after the start of the run excluded from messaging metrics (default: 0)')
+    analyze_dir_parser.add_argument('--cooldown-ms', dest='cooldown_ms', type=float, default=0.0,
+                       help='Time before the end of the run excluded from messaging metrics (default: 0)')
+    analyze_dir_parser.add_argument('--steady-state', dest='steady_state', action='store_true',
+                       help='Only calculate messaging metrics where throughput and latency are stable (optional)')
+    analyze_dir_parser.add_argument('--window-ms', dest='window_ms', type=float, default=1000.0,
+                       help='Window length of the time series export (default: 1000)')
+
+    generate_log_parser = subparsers.add_parser("generate")
+    generate_log_parser.add_argument('config', help='Path to configuration file')
+    generate_log_parser.add_argument('-o', '--logfile', help='Log file path, the ground truth is written next to it with a _truth.json suffix (optional)')
+    generate_log_parser.add_argument('-v', '--verbose', help='Verbose logging flag (optional)', action='store_true')
+    generate_log_parser.add_argument('--seed', type=int, default=0, help='Seed of every random choice (default: 0)')
+    generate_log_parser.add_argument('--device-scale', dest='device_scale', type=float, default=1.0,
+                       help='Multiplies the count of every device instance entry (default: 1)')
+    generate_log_parser.add_argument('--rate-scale', dest='rate_scale', type=float, default=1.0,
+                       help='Multiplies the publication rate of every publisher (default: 1)')
+    generate_log_parser.add_argument('--duration-ms', dest='duration_ms', type=int,
+                       help='Overrides the duration of each test (optional)')
+    generate_log_parser.add_argument('--op-send-rate-ms', dest='op_send_rate_ms', type=int,
+                       help='Overrides the period of operational requests, 0 disables them (optional)')
+    generate_log_parser.add_argument('--purpose-change-ms', dest='purpose_change_ms', type=int, default=0,
+                       help='Gives a share of the devices a random new purpose this often, on top of the scheduled changes (default: 0, off)')
+    generate_log_parser.add_argument('--purpose-change-fraction', dest='purpose_change_fraction', type=float, default=0.5,
+                       help='The share of devices changed each time (default: 0.5)')
+    generate_log_parser.add_argument('--latency-ms', dest='latency_ms', type=float, default=2.0,
+                       help='Average delivery latency (default: 2)')
+    generate_log_parser.add_argument('--loss', type=float, default=0.0,
+                       help='Probability that an allowed delivery is lost (default: 0)')
+    generate_log_parser.add_argument('--duplicate', type=float, default=0.0,
+                       help='Probability that a delivery is duplicated (default: 0)')
+    generate_log_parser.add_argument('--false-accept', dest='false_accept', type=float, default=0.0,
+                       help='Probability that a delivery the purposes forbid is made anyway (default: 0)')
+    generate_log_parser.add_argument('--op-leakage', dest='op_leakage', type=float, default=0.0,
+                       help='Probability that an operational request reaches an irrelevant subscriber (default: 0)')
 
     args = parser.parse_args()
 
@@ -52,9 +129,17 @@ def main():
 
     # Perform relevant operations
     if args.command == "run":
-        run_tests(args.config, args.logfile, args.broker_address, args.port)
+        run_tests(args.config, args.logfile, args.broker_address, args.port, args.metrics_port, args.saturate)
     elif args.command == "analyze":
-        analyze_results(args.logfile, args.outfile)
+        analyze_results(args.logfile, args.outfile, args.warmup_ms, args.cooldown_ms, args.steady_state, args.window_ms)
+    elif args.command == "analyze-dir":
+        if not analyze_directory(args.logs_dir, args.outdir, args.jobs, args.warmup_ms, args.cooldown_ms, args.steady_state, args.window_ms):
+            sys.exit(GlobalDefs.ExitCode.MALFORMED_LOG_FILE)
+    elif args.command == "generate":
+        settings = GeneratorSettings(args.seed, args.device_scale, args.rate_scale, args.duration_ms, args.op_send_rate_ms,
+                                     args.purpose_change_ms, args.purpose_change_fraction, args.latency_ms, args.loss,
+                                     args.duplicate, args.false_accept, args.op_leakage)
+        generate_log(args.config, args.logfile, settings)
     else:
         # We should never get here as the argument validation should handle 
         # existing on malformed arguments
@@ -89,7 +174,11 @@ def _validate_arguments(args: argparse.Namespace) -> bool:
         
         # Port must be valid
         if not 1 <= args.port <= 65535:
-            console_log(ConsoleLogLevel.ERROR, f"Port must be in the range [1-66535]")
+            console_log(ConsoleLogLevel.ERROR, f"Port must be in the range [1-65535]")
+            return False
+        
+        if args.metrics_port is not None and not 1 <= args.metrics_port <= 65535:
+            console_log(ConsoleLogLevel.ERROR, f"Metrics port must be in the range [1-65535]")
             return False
         
     elif args.command == "analyze":
@@ -99,7 +188,54 @@ def _validate_arguments(args: argparse.Namespace) -> bool:
             console_log(ConsoleLogLevel.ERROR, f"Cannot find log file at {args.logfile}")
             return False
 
+        if args.warmup_ms < 0 or args.cooldown_ms < 0:
+            console_log(ConsoleLogLevel.ERROR, f"Warm-up and cool-down must not be negative")
+            return False
+
+        if args.window_ms <= 0:
+            console_log(ConsoleLogLevel.ERROR, f"Time series window must be positive")
+            return False
+
         # Outfile will be validated on open
+
+    elif args.command == "analyze-dir":
+        if not path.isdir(args.logs_dir):
+            console_log(ConsoleLogLevel.ERROR, f"Cannot find log directory at {args.logs_dir}")
+            return False
+
+        if args.jobs < 1:
+            console_log(ConsoleLogLevel.ERROR, f"At least one job is needed")
+            return False
+
+        if args.warmup_ms < 0 or args.cooldown_ms < 0:
+            console_log(ConsoleLogLevel.ERROR, f"Warm-up and cool-down must not be negative")
+            return False
+
+        if args.window_ms <= 0:
+            console_log(ConsoleLogLevel.ERROR, f"Time series window must be positive")
+            return False
+
+    elif args.command == "generate":
+        if not path.isfile(args.config):
+            console_log(ConsoleLogLevel.ERROR, f"Cannot find configuration file at {args.config}")
+            return False
+
+        if args.device_scale <= 0 or args.rate_scale <= 0:
+            console_log(ConsoleLogLevel.ERROR, f"Device and rate scales must be positive")
+            return False
+
+        if (args.duration_ms is not None and args.duration_ms <= 0) or args.purpose_change_ms < 0 or args.latency_ms < 0:
+            console_log(ConsoleLogLevel.ERROR, f"Durations must be positive and periods and latencies must not be negative")
+            return False
+
+        if args.op_send_rate_ms is not None and args.op_send_rate_ms < 0:
+            console_log(ConsoleLogLevel.ERROR, f"Operational request period must not be negative")
+            return False
+
+        for probability in (args.purpose_change_fraction, args.loss, args.duplicate, args.false_accept, args.op_leakage):
+            if not 0.0 <= probability <= 1.0:
+                console_log(ConsoleLogLevel.ERROR, f"Fractions and probabilities must be in the range [0-1]")
+                return False
         
     # Invalid subcommand
     else:
@@ -108,7 +244,7 @@ def _validate_arguments(args: argparse.Namespace) -> bool:
     # All passed
     return True
     
-def run_tests(config, logfile, broker_address, port):
+def run_tests(config, logfile, broker_address, port, metrics_port=None, saturate=False):
     # Parse configuration
     console_log(ConsoleLogLevel.INFO, f"Loading configuration from: {config}")
     config_parser = ConfigParser()
@@ -118,17 +254,7 @@ def run_tests(config, logfile, broker_address, port):
         console_log(ConsoleLogLevel.ERROR, f"Failed to parse configuration: {e}")
         sys.exit(GlobalDefs.ExitCode.MALFORMED_CONFIG)
 
-    # Set global configuration values
-    GlobalDefs.REG_BY_MSG_REG_TOPIC = benchmark_config.reg_by_msg_reg_topic
-    GlobalDefs.REG_BY_TOPIC_PUB_REG_TOPIC = benchmark_config.reg_by_topic_pub_reg_topic
-    GlobalDefs.REG_BY_TOPIC_SUB_REG_TOPIC = benchmark_config.reg_by_topic_sub_reg_topic
-    GlobalDefs.OR_TOPIC = benchmark_config.or_topic_name
-    GlobalDefs.ORS_TOPIC = benchmark_config.ors_topic_name
-    GlobalDefs.ON_TOPIC = benchmark_config.on_topic_name
-    GlobalDefs.ONP_TOPIC = benchmark_config.onp_topic_name
-    GlobalDefs.OSYS_TOPIC = benchmark_config.osys_topic__name
-    GlobalDefs.OP_RESPONSE_TOPIC = benchmark_config.op_response_topic
-    GlobalDefs.OP_PURPOSE = benchmark_config.op_purpose
+    _set_global_config(benchmark_config)
     
     # Load client interface module
     module_name = benchmark_config.client_module_name
@@ -155,6 +281,20 @@ def run_tests(config, logfile, broker_address, port):
         console_log(ConsoleLogLevel.ERROR, f"Error: Failed to initialize logging: {e}")
         sys.exit(GlobalDefs.ExitCode.FAILED_TO_INIT_LOGGING)
 
+    # Start the local broker if requested
+    local_broker = None
+    if broker_address == LOCAL_BROKER_ADDRESS:
+        local_broker = LocalBroker(benchmark_config.method, port)
+        try:
+            local_broker.start()
+        except OSError as e:
+            console_log(ConsoleLogLevel.ERROR, f"Error: Failed to start local broker: {e}")
+            sys.exit(GlobalDefs.ExitCode.BAD_ARGUMENT)
+        broker_address = local_broker.address
+
+    # Clients loop messages back in-process instead of connecting to a broker
+    GlobalDefs.NULL_BROKER = broker_address == NULL_BROKER_ADDRESS
+
     # Create test executor
     console_log(ConsoleLogLevel.INFO, f"Connecting to broker: {broker_address}:{port}")
     console_log(ConsoleLogLevel.INFO, f"Using purpose management method: {benchmark_config.method.value}")
@@ -164,8 +304,19 @@ def run_tests(config, logfile, broker_address, port):
         broker_address,
         port,
         benchmark_config.method,
+        saturate
     )
 
+    # Serve live metrics if requested
+    live_metrics = None
+    if metrics_port is not None:
+        live_metrics = LiveMetricsServer(executor, metrics_port)
+        try:
+            live_metrics.start()
+        except OSError as e:
+            console_log(ConsoleLogLevel.ERROR, f"Error: Failed to start live metrics server: {e}")
+            sys.exit(GlobalDefs.ExitCode.BAD_ARGUMENT)
+
     # Run each test
     for test_config in benchmark_config.test_list:
         print("\n" + "-" * 80)
@@ -175,6 +326,10 @@ def run_tests(config, logfile, broker_address, port):
         executor.perform_test(test_config)
 
     # Shutdown
+    if live_metrics is not None:
+        live_metrics.shutdown()
+    if local_broker is not None:
+        local_broker.shutdown()
     GlobalDefs.LOGGING_MODULE.shutdown()
 
     print("\n" + "=" * 80)
@@ -182,6 +337,19 @@ def run_tests(config, logfile, broker_address, port):
     print(f"Results logged to: {logfile}")
     print("=" * 80)
 
+def _set_global_config(benchmark_config):
+    """Set the topics and purposes shared by every module from the configuration"""
+    GlobalDefs.REG_BY_MSG_REG_TOPIC = benchmark_config.reg_by_msg_reg_topic
+    GlobalDefs.REG_BY_TOPIC_PUB_REG_TOPIC = benchmark_config.reg_by_topic_pub_reg_topic
+    GlobalDefs.REG_BY_TOPIC_SUB_REG_TOPIC = benchmark_config.reg_by_topic_sub_reg_topic
+    GlobalDefs.OR_TOPIC = benchmark_config.or_topic_name
+    GlobalDefs.ORS_TOPIC = benchmark_config.ors_topic_name
+    GlobalDefs.ON_TOPIC = benchmark_config.on_topic_name
+    GlobalDefs.ONP_TOPIC = benchmark_config.onp_topic_name
+    GlobalDefs.OSYS_TOPIC = benchmark_config.osys_topic__name
+    GlobalDefs.OP_RESPONSE_TOPIC = benchmark_config.op_response_topic
+    GlobalDefs.OP_PURPOSE = benchmark_config.op_purpose
+
 def _load_client_module(module_name: str):
     """Load and validate the client interface module"""
     module = importlib.import_module(module_name)
@@ -190,7 +358,7 @@ def _load_client_module(module_name: str):
             raise AttributeError(f"Could not find required function: {function}")
     return module
 
-def analyze_results(logfile, outfile):
+def analyze_results(logfile, outfile, warmup_ms=0.0, cooldown_ms=0.0, steady_state=False, window_ms=1000.0):
 
     if outfile is None:
         # Use config file name by default
@@ -199,7 +367,7 @@ def analyze_results(logfile, outfile):
 
     # Run the metrics calculation
     print(f"Processing log file: {logfile}")
-    calculator = MetricsCalculator()
+    calculator = MetricsCalculator(warmup_ms / 1000.0, cooldown_ms / 1000.0, steady_state, window_ms / 1000.0)
     metrics = calculator.calculate_all_metrics(logfile)
 
     if metrics is None:
@@ -209,8 +377,189 @@ def analyze_results(logfile, outfile):
     # Save to CSV if they want that
     calculator.export_metrics_to_csv(metrics, outfile)
     print(f"Metrics exported to: {outfile}")
+
+    time_series_outfile = f"{path.splitext(outfile)[0]}_timeseries.csv"
+    calculator.export_time_series_to_csv(metrics, time_series_outfile)
+    print(f"Time series exported to: {time_series_outfile}")
     return 0
 
+"""Analyzes every log in a directory with a pool of worker processes
+
+Each log gets its own metrics and time series CSVs as the analyze subcommand writes them, and a
+log that fails gets an error report instead. Logs are named by their path relative to logs_dir,
+which is mirrored under outdir so logs with the same name in different subdirectories stay apart. All metrics of every analyzed log are
+also collected in one combined CSV, with a row per log and a column per metric.
+
+Parameters
+----------
+logs_dir : str
+    The directory to search for .log files, including subdirectories
+outdir : str, optional
+    The directory in which to store the results, 'results/<logs_dir name>' if not given
+jobs : int
+    The number of logs analyzed at once
+warmup_ms, cooldown_ms, steady_state, window_ms
+    The analysis options, as for the analyze subcommand
+
+Returns
+----------
+bool
+    True if every log was analyzed, false if any failed or none were found
+"""
+def analyze_directory(logs_dir, outdir, jobs, warmup_ms=0.0, cooldown_ms=0.0, steady_state=False, window_ms=1000.0) -> bool:
+    log_files = sorted(path.join(directory, name) for directory, _, names in os.walk(logs_dir)
+                       for name in names if name.endswith(".log"))
+    if not log_files:
+        console_log(ConsoleLogLevel.ERROR, f"No log files found in {logs_dir}")
+        return False
+
+    if outdir is None:
+        outdir = path.join("results", path.basename(path.normpath(logs_dir)))
+    os.makedirs(outdir, exist_ok=True)
+
+    print(f"Found {len(log_files)} log file(s) in {logs_dir}, analyzing {jobs} at once")
+    print(f"Output directory: {outdir}")
+
+    console = Console()
+    results: Dict[str, Tuple[Optional[List[List[str]]], float, Optional[str]]] = {}
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        TimeElapsedColumn(),
+        console=console
+    )
+
+    with progress, ProcessPoolExecutor(max_workers=jobs) as executor:
+        task = progress.add_task("Analyzing logs", total=len(log_files))
+        futures = {}
+        for logfile in log_files:
+            log_name = path.splitext(path.relpath(logfile, logs_dir))[0]
+            outfile = path.join(outdir, f"{log_name}_metrics.csv")
+            os.makedirs(path.dirname(outfile), exist_ok=True)
+            futures[executor.submit(_analyze_log_file, logfile, outfile, warmup_ms, cooldown_ms, steady_state, window_ms)] = log_name
+
+        for future in as_completed(futures):
+            log_name = futures[future]
+            try:
+                rows, duration_s, error = future.result()
+            except Exception:
+                # The worker itself died, e.g. it ran out of memory
+                rows, duration_s, error = None, 0.0, traceback.format_exc()
+
+            results[log_name] = (rows, duration_s, error)
+            if error is None:
+                progress.console.print(f"[green]✓ Complete[/green]: {log_name} ({duration_s:.1f}s)")
+            else:
+                error_file = path.join(outdir, f"{log_name}_error.txt")
+                with open(error_file, 'w') as f:
+                    f.write(error)
+                progress.console.print(f"[red]✗ Failed[/red]: {log_name} (see {error_file})")
+            progress.advance(task)
+
+    # One row per log with a column per metric, in the order the metrics were first exported
+    columns: Dict[str, None] = {}
+    for rows, _, _ in results.values():
+        for category, name, _ in rows or []:
+            columns[f"{category}: {name}"] = None
+
+    combined_file = path.join(outdir, "combined_metrics.csv")
+    with open(combined_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Log", "Status"] + list(columns))
+        for log_name, (rows, _, error) in sorted(results.items()):
+            values = {f"{category}: {name}": value for category, name, value in rows or []}
+            writer.writerow([log_name, "OK" if error is None else "FAILED"] + [values.get(column, "") for column in columns])
+
+    table = Table(title="Analysis Results")
+    table.add_column("Log")
+    table.add_column("Status")
+    table.add_column("Time (s)", justify="right")
+    for _, _, heading in SUMMARY_METRICS:
+        table.add_column(heading, justify="right")
+    for log_name, (rows, duration_s, error) in sorted(results.items()):
+        values = {(category, name): value for category, name, value in rows or []}
+        status = "[green]OK[/green]" if error is None else "[red]FAILED[/red]"
+        table.add_row(log_name, status, f"{duration_s:.1f}", *[values.get((category, name), "-") for category, name, _ in SUMMARY_METRICS])
+    console.print(table)
+
+    failed_count = sum(1 for _, _, error in results.values() if error is not None)
+    print(f"Analyzed {len(results) - failed_count}/{len(results)} log(s), combined results written to: {combined_file}")
+    return failed_count == 0
+
+"""Analyzes one log in a worker process of analyze_directory
+
+Console output of the analysis is kept out of the progress display and only reported if it fails.
+
+Parameters
+----------
+logfile : str
+    The log to analyze
+outfile : str
+    The metrics CSV to write, the time series is written next to it
+warmup_ms, cooldown_ms, steady_state, window_ms
+    The analysis options, as for the analyze subcommand
+
+Returns
+----------
+tuple[list[list[str]] | None, float, str | None]
+    The exported (category, name, value) metric rows, the analysis time in seconds and an error report, which is None on success
+"""
+def _analyze_log_file(logfile, outfile, warmup_ms, cooldown_ms, steady_state, window_ms) -> Tuple[Optional[List[List[str]]], float, Optional[str]]:
+    start_time = time.perf_counter()
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            calculator = MetricsCalculator(warmup_ms / 1000.0, cooldown_ms / 1000.0, steady_state, window_ms / 1000.0)
+            metrics = calculator.calculate_all_metrics(logfile)
+            if metrics is None:
+                return None, time.perf_counter() - start_time, f"Failed to calculate metrics for {logfile}\n{output.getvalue()}"
+
+            calculator.export_metrics_to_csv(metrics, outfile)
+            calculator.export_time_series_to_csv(metrics, f"{path.splitext(outfile)[0]}_timeseries.csv")
+    except Exception:
+        return None, time.perf_counter() - start_time, f"{traceback.format_exc()}\n{output.getvalue()}"
+
+    with open(outfile, newline='') as f:
+        rows = list(csv.reader(f))[1:]
+    return rows, time.perf_counter() - start_time, None
+
+def generate_log(config, logfile, settings: GeneratorSettings):
+    # Parse configuration
+    console_log(ConsoleLogLevel.INFO, f"Loading configuration from: {config}")
+    config_parser = ConfigParser()
+    try:
+        benchmark_config = config_parser.parse_config(config)
+    except Exception as e:
+        console_log(ConsoleLogLevel.ERROR, f"Failed to parse configuration: {e}")
+        sys.exit(GlobalDefs.ExitCode.MALFORMED_CONFIG)
+
+    _set_global_config(benchmark_config)
+
+    if logfile is None:
+        timestring = time.strftime("%Y-%m-%d_%H-%M-%S")
+        config_name = path.splitext(path.basename(config))[0]
+        logfile = f"{benchmark_config.log_output_dir}/{config_name}_synthetic_{timestring}.log"
+
+    console_log(ConsoleLogLevel.INFO, f"Generating log: {logfile}")
+    generator = LogGenerator(benchmark_config, settings)
+    try:
+        truth = generator.generate(logfile)
+    except OSError as e:
+        console_log(ConsoleLogLevel.ERROR, f"Error: Failed to write log: {e}")
+        sys.exit(GlobalDefs.ExitCode.FAILED_TO_INIT_LOGGING)
+
+    truth_file = f"{path.splitext(logfile)[0]}_truth.json"
+    generator.write_truth(truth, truth_file)
+
+    totals = truth["totals"]
+    print(f"Records written: {truth['records']}")
+    print(f"Deliveries expected: {totals['expected']}, received: {totals['received']}, lost: {totals['lost']}, "
+          f"duplicated: {totals['duplicates']}, false accepts: {totals['false_accepts']}")
+    print(f"Log written to: {logfile}")
+    print(f"Ground truth written to: {truth_file}")
+
 if __name__ == "__main__":
     try:
         exit_code = main()
@@ -220,6 +569,5 @@ if __name__ == "__main__":
         sys.exit(GlobalDefs.ExitCode.SIGINT_RECEIVED)
     except Exception as e:
         print(f"\n\nFatal error: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(GlobalDefs.ExitCode.UNKNOWN_ERROR)
\ No newline at end of file
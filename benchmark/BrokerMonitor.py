@@ -1,10 +1,33 @@
+import os
+import threading
 import time
 from statistics import mean, variance
 import requests
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import GlobalDefs
-from LoggingModule import console_log, ConsoleLogLevel
+from LoggingModule import console_log, ConsoleLogLevel, get_timestamp_ns
+
+REQUEST_TIMEOUT_S: float = 5.0
+PROC_DIR: str = "/proc"
+CGROUP_ROOT: str = "/sys/fs/cgroup"
+
+# Mosquitto's broker statistics, used when $SYS monitoring is enabled without a topic list
+DEFAULT_SYS_TOPICS: List[str] = [
+    "$SYS/broker/load/messages/received/1min",
+    "$SYS/broker/load/messages/sent/1min",
+    "$SYS/broker/load/publish/received/1min",
+    "$SYS/broker/load/publish/sent/1min",
+    "$SYS/broker/load/bytes/received/1min",
+    "$SYS/broker/load/bytes/sent/1min",
+    "$SYS/broker/messages/received",
+    "$SYS/broker/messages/sent",
+    "$SYS/broker/publish/messages/dropped",
+    "$SYS/broker/clients/connected",
+    "$SYS/broker/subscriptions/count",
+    "$SYS/broker/heap/current",
+    "$SYS/broker/store/messages/count",
+]
 
 
 @dataclass
@@ -13,40 +36,179 @@ class BrokerMetricsSample:
     timestamp: float
     cpu_usage_percent: Optional[float] = None
     mem_usage_percent: Optional[float] = None
+    timestamp_ns: int = 0
+    cpu_active_seconds: Optional[float] = None
+    mem_bytes: Optional[int] = None
+    voluntary_ctx_switches: Optional[int] = None
+    involuntary_ctx_switches: Optional[int] = None
+    open_fds: Optional[int] = None
+    net_rx_bytes_per_sec: Optional[float] = None
+    net_tx_bytes_per_sec: Optional[float] = None
+    tcp_retransmits: Optional[int] = None
+    tcp_sockets_inuse: Optional[int] = None
+    tcp_sockets_time_wait: Optional[int] = None
+    sockets_used: Optional[int] = None
 
 class BrokerMonitor:
-    """Monitors broker resource usage via Prometheus Node Exporter"""
+    """Monitors broker resource usage
+
+    Node Exporter reports host-wide usage. The process and cgroup backends read the
+    broker's own counters from /proc or cgroup v2, which requires running on the same
+    host as the broker but needs no exporter. The broker's $SYS statistics can be
+    collected alongside any backend, or on their own with the sys backend.
+    """
     
     last_cycle_cpu_active_time = None
     last_cycle_cpu_idle_time = None
+    last_cycle_time = None
+    last_cycle_ctx_switches = None
+    last_cycle_net_bytes = None
+    last_cycle_tcp_retransmits = None
 
-    def __init__(self, node_exporter_url: str = "http://localhost:9100/metrics"):
+    def __init__(self, node_exporter_url: str = "http://localhost:9100/metrics", interval_ms: float = 1000,
+                 backend: GlobalDefs.MonitorBackend = GlobalDefs.MonitorBackend.NODE_EXPORTER,
+                 pid: Optional[int] = None, process_name: Optional[str] = None, cgroup_path: Optional[str] = None,
+                 sys_topics: Optional[List[str]] = None, broker_address: Optional[str] = None, broker_port: int = 1883,
+                 client_id: str = "broker_monitor"):
         """Initialize broker monitor
 
         Parameters
         ----------
         node_exporter_url : str
             Node Exporter metrics endpoint URL
+        interval_ms : float, optional
+            Time between samples in ms (default is 1000)
+        backend : MonitorBackend, optional
+            Where the metrics are read from (default is Node Exporter)
+        pid : int, optional
+            The broker process for the process backend
+        process_name : str, optional
+            The broker process name for the process backend, used to find the process if no pid is given
+        cgroup_path : str, optional
+            The broker's cgroup for the cgroup backend, either absolute or relative to the cgroup v2 root
+        sys_topics : List[str], optional
+            The $SYS topic filters to collect, the sys backend uses the Mosquitto defaults if none are given
+        broker_address : str, optional
+            The broker to subscribe to for $SYS statistics
+        broker_port : int, optional
+            The port of the broker (default is 1883)
+        client_id : str, optional
+            The client ID of the $SYS subscriber
         """
         self.node_exporter_url = node_exporter_url
+        self.interval_ms = interval_ms
+        self.backend = backend
+        self.pid = pid
+        self.process_name = process_name
+        if cgroup_path is not None and not os.path.isabs(cgroup_path):
+            cgroup_path = os.path.join(CGROUP_ROOT, cgroup_path)
+        self.cgroup_path = cgroup_path
+        self.host_mem_total: Optional[int] = None
+
+        # Latest value of each $SYS topic, written by the client's network thread
+        if sys_topics is None and backend == GlobalDefs.MonitorBackend.SYS:
+            sys_topics = DEFAULT_SYS_TOPICS
+        self.sys_topics: List[str] = sys_topics if sys_topics is not None else []
+        self.broker_address = broker_address
+        self.broker_port = broker_port
+        self.client_id = client_id
+        self.sys_client = None
+        self.sys_values: Dict[str, float] = {}
+        self.sys_values_lock = threading.Lock()
+        self.sys_sample_count = 0
         self.samples: List[BrokerMetricsSample] = []
         self.is_monitoring = False
         self.last_sample_time = 0.0
-        console_log(ConsoleLogLevel.INFO, f"Initialized with URL: {node_exporter_url}", __name__)
+
+        # Sampling runs on its own thread so a slow endpoint never stalls the test loop
+        self.session: Optional[requests.Session] = None
+        self.sampler_thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.skipped_samples = 0
+        if self.backend == GlobalDefs.MonitorBackend.NODE_EXPORTER:
+            console_log(ConsoleLogLevel.INFO, f"Initialized with URL: {node_exporter_url}", __name__)
+        elif self.backend == GlobalDefs.MonitorBackend.PROCESS:
+            console_log(ConsoleLogLevel.INFO, f"Initialized for process {pid if pid is not None else process_name}", __name__)
+        elif self.backend == GlobalDefs.MonitorBackend.CGROUP:
+            console_log(ConsoleLogLevel.INFO, f"Initialized for cgroup {self.cgroup_path}", __name__)
+        if self.sys_topics:
+            console_log(ConsoleLogLevel.INFO, f"Collecting {len(self.sys_topics)} $SYS topic filter(s) from {broker_address}:{broker_port}", __name__)
 
     def start_monitoring(self):
-        """Start monitoring (allows samples to be collected)"""
+        """Start collecting samples on a background thread"""
+        if self.sampler_thread is not None:
+            return
+
         self.is_monitoring = True
         self.last_sample_time = time.time()
-        console_log(ConsoleLogLevel.INFO, f"Started monitoring", __name__)
+        self.skipped_samples = 0
+        self.sys_sample_count = 0
+        self.stop_event.clear()
+
+        # Keep the connection alive between samples
+        if self.backend == GlobalDefs.MonitorBackend.NODE_EXPORTER:
+            self.session = requests.Session()
+        elif self.backend != GlobalDefs.MonitorBackend.SYS:
+            self.host_mem_total = self._read_host_mem_total()
+
+        if self.sys_topics:
+            self._start_sys_client()
+
+        self.sampler_thread = threading.Thread(target=self._sample_loop, name="BrokerMonitor")
+        self.sampler_thread.daemon = True
+        self.sampler_thread.start()
+        console_log(ConsoleLogLevel.INFO, f"Started monitoring every {self.interval_ms} ms", __name__)
 
     def stop_monitoring(self):
-        """Stop monitoring"""
+        """Stop monitoring and wait for the sampler thread to finish"""
         self.is_monitoring = False
-        console_log(ConsoleLogLevel.INFO, f"Stopped monitoring (collected {len(self.samples)} samples)", __name__)
+        self.stop_event.set()
+
+        if self.sampler_thread is not None:
+            self.sampler_thread.join()
+            self.sampler_thread = None
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        if self.sys_client is not None:
+            GlobalDefs.CLIENT_MODULE.disconnect_client(self.sys_client)
+            self.sys_client.loop_stop()
+            self.sys_client = None
+
+        if self.skipped_samples > 0:
+            console_log(ConsoleLogLevel.WARNING, f"Skipped {self.skipped_samples} sample(s) because collection overran the interval", __name__)
+        if self.backend == GlobalDefs.MonitorBackend.SYS:
+            console_log(ConsoleLogLevel.INFO, f"Stopped monitoring (logged $SYS values {self.sys_sample_count} times)", __name__)
+        else:
+            console_log(ConsoleLogLevel.INFO, f"Stopped monitoring (collected {len(self.samples)} samples)", __name__)
+
+    def _sample_loop(self):
+        """Collect samples on a fixed schedule until monitoring is stopped
+
+        Sample times stay on the grid set by the first sample. If a collection
+        overruns one or more slots, those slots are skipped rather than sampled
+        back to back.
+        """
+        interval_s = self.interval_ms / 1000.0
+        next_sample_time = time.monotonic()
+
+        while not self.stop_event.is_set():
+            if self.backend != GlobalDefs.MonitorBackend.SYS:
+                self.collect_sample()
+            if self.sys_client is not None:
+                self.collect_sys_sample()
+
+            next_sample_time += interval_s
+            now = time.monotonic()
+            if now > next_sample_time:
+                missed = int((now - next_sample_time) // interval_s) + 1
+                self.skipped_samples += missed
+                next_sample_time += missed * interval_s
+
+            self.stop_event.wait(next_sample_time - now)
 
     def collect_sample(self) -> Optional[BrokerMetricsSample]:
-        """Collect current broker metrics from Node Exporter
+        """Collect current broker metrics from the configured backend
 
         Returns
         -------
@@ -57,43 +219,104 @@ class BrokerMonitor:
             return None
 
         try:
-            # Fetch metrics from Node Exporter
-            response = requests.get(self.node_exporter_url, timeout=5)
-            response.raise_for_status()
+            before_ns = get_timestamp_ns()
+            if self.backend == GlobalDefs.MonitorBackend.NODE_EXPORTER:
+                sample = self._collect_node_exporter()
+            elif self.backend == GlobalDefs.MonitorBackend.PROCESS:
+                sample = self._collect_process()
+            else:
+                sample = self._collect_cgroup()
+            after_ns = get_timestamp_ns()
 
-            # Parse Prometheus metrics format
-            sample = self._parse_prometheus_metrics(response.text)
+            # The counters are read somewhere within the collection, so use the midpoint
+            sample.timestamp_ns = (before_ns + after_ns) // 2
    
             self.samples.append(sample)
             self.last_sample_time = sample.timestamp
 
+            # Log every sample so the analyzer can align it with the messaging time series
+            GlobalDefs.LOGGING_MODULE.log_broker_sample(sample.timestamp_ns, sample.cpu_usage_percent,
+                                                        sample.mem_usage_percent, sample.cpu_active_seconds,
+                                                        sample.mem_bytes, sample.voluntary_ctx_switches,
+                                                        sample.involuntary_ctx_switches, sample.open_fds,
+                                                        sample.net_rx_bytes_per_sec, sample.net_tx_bytes_per_sec,
+                                                        sample.tcp_retransmits, sample.tcp_sockets_inuse,
+                                                        sample.tcp_sockets_time_wait, sample.sockets_used)
+
             return sample
 
         except requests.exceptions.RequestException as e:
             console_log(ConsoleLogLevel.ERROR, f"Failed to collect metrics: {e}", __name__)
             return None
+        except OSError as e:
+            console_log(ConsoleLogLevel.ERROR, f"Failed to collect metrics: {e}", __name__)
+
+            # The broker may have restarted, so find it again and restart the deltas
+            if self.backend == GlobalDefs.MonitorBackend.PROCESS and self.process_name is not None:
+                self.pid = None
+            self.last_cycle_cpu_active_time = None
+            self.last_cycle_time = None
+            self.last_cycle_ctx_switches = None
+            self.last_cycle_net_bytes = None
+            self.last_cycle_tcp_retransmits = None
+            return None
         except Exception as e:
             console_log(ConsoleLogLevel.ERROR, f"Unexpected error collecting metrics: {e}", __name__)
             return None
 
-    def should_collect_sample(self, interval_ms: float) -> bool:
-        """Check if enough time passed to collect another sample
-
-        Parameters
-        ----------
-        interval_ms : float
-            Minimum time between samples in ms
+    def collect_sys_sample(self) -> Dict[str, float]:
+        """Log the latest value of every $SYS topic received so far
 
         Returns
         -------
-        bool
-            True if should collect now
+        Dict[str, float]
+            The logged values by topic
         """
-        if not self.is_monitoring:
-            return False
+        timestamp = get_timestamp_ns()
+        with self.sys_values_lock:
+            values = dict(self.sys_values)
+
+        for topic, value in sorted(values.items()):
+            GlobalDefs.LOGGING_MODULE.log_broker_sys_sample(timestamp, topic, value)
+        if values:
+            self.sys_sample_count += 1
+        return values
+
+    def _start_sys_client(self):
+        """Connect a client that subscribes to the $SYS topics"""
+        if self.broker_address is None:
+            console_log(ConsoleLogLevel.ERROR, f"No broker address for $SYS statistics", __name__)
+            return
+
+        monitor = self
+
+        def on_connect(client, userdata, flags, reason_code, properties):
+            if reason_code.is_failure:
+                console_log(ConsoleLogLevel.ERROR, f"$SYS client failed to connect: {reason_code}", __name__)
+                return
+            for topic_filter in monitor.sys_topics:
+                GlobalDefs.CLIENT_MODULE.subscribe_to_system_topic(client, topic_filter)
+
+        def on_message(client, userdata, message):
+            # Only numeric statistics are kept, values such as the broker version are skipped
+            try:
+                value = float(message.payload.decode("utf-8").split()[0])
+            except (UnicodeDecodeError, ValueError, IndexError):
+                return
+            with monitor.sys_values_lock:
+                monitor.sys_values[message.topic] = value
 
-        elapsed_ms = (time.time() - self.last_sample_time) * 1000.0
-        return elapsed_ms >= interval_ms
+        self.sys_values = {}
+        self.sys_client = GlobalDefs.CLIENT_MODULE.create_v5_client(self.client_id)
+        self.sys_client.on_connect = on_connect
+        self.sys_client.on_message = on_message
+
+        result_code = GlobalDefs.CLIENT_MODULE.connect_client(self.sys_client, self.broker_address, self.broker_port)
+        if result_code != 0:
+            console_log(ConsoleLogLevel.ERROR, f"$SYS client failed to connect: {result_code}", __name__)
+            self.sys_client = None
+            return
+        self.sys_client.loop_start()
 
     def get_samples(self) -> List[BrokerMetricsSample]:
         """Get all collected samples"""
@@ -107,9 +330,6 @@ class BrokerMonitor:
         Tuple, Tuple
             Min/Max/Average/Variance values for cpu and mem respectively
         """
-        if not self.samples:
-            return ((-1, -1, -1, -1), (-1, -1, -1, -1))
-        
         cpu_metrics: List[float] = list()
         mem_metrics: List[float] = list()
 
@@ -118,11 +338,19 @@ class BrokerMonitor:
                 cpu_metrics.append(sample.cpu_usage_percent)
             if sample.mem_usage_percent is not None:
                 mem_metrics.append(sample.mem_usage_percent)
-                
-        cpu_tuple = (min(cpu_metrics), max(cpu_metrics), mean(cpu_metrics), variance(cpu_metrics))
-        mem_tuple = (min(mem_metrics), max(mem_metrics), mean(mem_metrics), variance(mem_metrics))
 
-        return cpu_tuple, mem_tuple
+        return self._summarize(cpu_metrics), self._summarize(mem_metrics)
+
+    def _summarize(self, values: List[float]) -> Tuple[float, float, float, float]:
+        """Get the min, max, average and variance of a metric, or -1 for each if it was never measured
+
+        Rates such as CPU usage need two readings, so a short run can have one value or none
+        """
+        if not values:
+            return (-1, -1, -1, -1)
+
+        spread = variance(values) if len(values) > 1 else 0.0
+        return (min(values), max(values), mean(values), spread)
 
     def clear_samples(self):
         """Clear all collected samples"""
@@ -130,6 +358,194 @@ class BrokerMonitor:
         self.samples = []
         console_log(ConsoleLogLevel.DEBUG, f"Cleared {sample_count} samples", __name__)
 
+    def _collect_node_exporter(self) -> BrokerMetricsSample:
+        """Fetch and parse host-wide metrics from Node Exporter"""
+        if self.session is None:
+            raise requests.exceptions.RequestException("No session")
+
+        response = self.session.get(self.node_exporter_url, timeout=REQUEST_TIMEOUT_S)
+        response.raise_for_status()
+        return self._parse_prometheus_metrics(response.text)
+
+    def _collect_process(self) -> BrokerMetricsSample:
+        """Read the broker process's own counters from /proc
+
+        Raises
+        ----------
+        OSError
+            If the process does not exist or cannot be read
+        """
+        if self.pid is None:
+            self.pid = self._find_process(self.process_name)
+
+        cpu_seconds, voluntary, involuntary, open_fds = self._read_process_counters(self.pid)
+        mem_bytes = self._read_process_rss(self.pid)
+        return self._build_sample(cpu_seconds, mem_bytes, self.host_mem_total, voluntary, involuntary, open_fds)
+
+    def _collect_cgroup(self) -> BrokerMetricsSample:
+        """Read the broker container's counters from its cgroup v2 directory
+
+        Context switches and open file descriptors are summed over the processes in the cgroup.
+
+        Raises
+        ----------
+        OSError
+            If the cgroup does not exist or cannot be read
+        """
+        cpu_seconds = 0.0
+        with open(os.path.join(self.cgroup_path, "cpu.stat")) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[0] == "usage_usec":
+                    cpu_seconds = int(parts[1]) / 1e6
+
+        with open(os.path.join(self.cgroup_path, "memory.current")) as f:
+            mem_bytes = int(f.read().strip())
+
+        # Without a limit the container may use all of the host's memory
+        mem_limit = self.host_mem_total
+        with open(os.path.join(self.cgroup_path, "memory.max")) as f:
+            limit_text = f.read().strip()
+            if limit_text != "max":
+                mem_limit = int(limit_text)
+
+        with open(os.path.join(self.cgroup_path, "cgroup.procs")) as f:
+            pids = [int(line) for line in f if line.strip()]
+
+        voluntary = 0
+        involuntary = 0
+        open_fds: Optional[int] = 0
+        for pid in pids:
+            try:
+                _, pid_voluntary, pid_involuntary, pid_fds = self._read_process_counters(pid)
+            except OSError:
+                # The process exited between listing and reading
+                continue
+            voluntary += pid_voluntary
+            involuntary += pid_involuntary
+            if open_fds is not None:
+                open_fds = None if pid_fds is None else open_fds + pid_fds
+
+        return self._build_sample(cpu_seconds, mem_bytes, mem_limit, voluntary, involuntary, open_fds)
+
+    def _build_sample(self, cpu_seconds: float, mem_bytes: int, mem_limit: Optional[int],
+                      voluntary: int, involuntary: int, open_fds: Optional[int]) -> BrokerMetricsSample:
+        """Turn cumulative counters into a sample of the change since the previous one
+
+        CPU usage is given as a percentage of one core, so a broker using several cores can exceed 100%.
+        """
+        now = time.monotonic()
+
+        cpu_usage_pct = None
+        delta_active = None
+        if self.last_cycle_cpu_active_time is not None and self.last_cycle_time is not None and now > self.last_cycle_time:
+            delta_active = cpu_seconds - self.last_cycle_cpu_active_time
+            cpu_usage_pct = (delta_active / (now - self.last_cycle_time)) * 100.0
+
+        delta_voluntary = None
+        delta_involuntary = None
+        if self.last_cycle_ctx_switches is not None:
+            delta_voluntary = voluntary - self.last_cycle_ctx_switches[0]
+            delta_involuntary = involuntary - self.last_cycle_ctx_switches[1]
+
+        self.last_cycle_cpu_active_time = cpu_seconds
+        self.last_cycle_time = now
+        self.last_cycle_ctx_switches = (voluntary, involuntary)
+
+        mem_usage_pct = None
+        if mem_limit:
+            mem_usage_pct = (mem_bytes / mem_limit) * 100.0
+
+        return BrokerMetricsSample(
+            timestamp=time.time(),
+            cpu_usage_percent=cpu_usage_pct,
+            mem_usage_percent=mem_usage_pct,
+            cpu_active_seconds=delta_active,
+            mem_bytes=mem_bytes,
+            voluntary_ctx_switches=delta_voluntary,
+            involuntary_ctx_switches=delta_involuntary,
+            open_fds=open_fds
+        )
+
+    def _find_process(self, process_name: Optional[str]) -> int:
+        """Find the lowest pid whose command name matches
+
+        Raises
+        ----------
+        OSError
+            If no process matches
+        """
+        if process_name is not None:
+            pids = sorted(int(entry) for entry in os.listdir(PROC_DIR) if entry.isdigit())
+            for pid in pids:
+                try:
+                    with open(os.path.join(PROC_DIR, str(pid), "comm")) as f:
+                        if f.read().strip() == process_name:
+                            return pid
+                except OSError:
+                    continue
+        raise FileNotFoundError(f"No process named {process_name}")
+
+    def _read_process_counters(self, pid: int) -> Tuple[float, int, int, Optional[int]]:
+        """Read the CPU time, context switches and open file descriptors of a process
+
+        Returns
+        -------
+        Tuple
+            CPU seconds, voluntary and involuntary context switches summed over all threads,
+            and open file descriptors or None if they may not be listed
+        """
+        process_dir = os.path.join(PROC_DIR, str(pid))
+
+        # The command name may contain spaces, so fields are counted from after its closing bracket
+        with open(os.path.join(process_dir, "stat")) as f:
+            stat_fields = f.read().rsplit(')', 1)[1].split()
+        clock_ticks = os.sysconf('SC_CLK_TCK')
+        cpu_seconds = (int(stat_fields[11]) + int(stat_fields[12])) / clock_ticks
+
+        # The process status only counts the main thread's switches
+        voluntary = 0
+        involuntary = 0
+        task_dir = os.path.join(process_dir, "task")
+        for task in os.listdir(task_dir):
+            try:
+                with open(os.path.join(task_dir, task, "status")) as f:
+                    for line in f:
+                        if line.startswith("voluntary_ctxt_switches:"):
+                            voluntary += int(line.split()[1])
+                        elif line.startswith("nonvoluntary_ctxt_switches:"):
+                            involuntary += int(line.split()[1])
+            except OSError:
+                # The thread exited while reading
+                continue
+
+        open_fds: Optional[int] = None
+        try:
+            open_fds = len(os.listdir(os.path.join(process_dir, "fd")))
+        except PermissionError:
+            pass
+
+        return cpu_seconds, voluntary, involuntary, open_fds
+
+    def _read_process_rss(self, pid: int) -> int:
+        """Read the resident set size of a process in bytes"""
+        with open(os.path.join(PROC_DIR, str(pid), "status")) as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def _read_host_mem_total(self) -> Optional[int]:
+        """Read the host's total memory in bytes, or None if unavailable"""
+        try:
+            with open(os.path.join(PROC_DIR, "meminfo")) as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return None
+
     def _parse_prometheus_metrics(self, text: str) -> BrokerMetricsSample:
         """Parse Prometheus metrics format
 
@@ -144,11 +560,19 @@ class BrokerMonitor:
             Sample of metrics
         """
         
+        now = time.monotonic()
+
         # Initialize counters for metrics that are on more than one line
         active_cpu_time = 0.0
         idle_cpu_time = 0.0
         mem_total = 0.0
         mem_free = 0.0
+        net_rx_bytes = 0.0
+        net_tx_bytes = 0.0
+        tcp_retransmits: Optional[float] = None
+        tcp_inuse: Optional[int] = None
+        tcp_time_wait: Optional[int] = None
+        sockets_used: Optional[int] = None
         
         for line in text.split('\n'):
             line = line.strip()
@@ -175,16 +599,52 @@ class BrokerMonitor:
                     
                 if parts[0].startswith("node_memory_MemTotal_bytes"):
                     mem_total = float(parts[1])
+
+                # Network throughput, loopback traffic never leaves the broker host
+                if parts[0].startswith("node_network_receive_bytes_total") and 'device="lo"' not in parts[0]:
+                    net_rx_bytes += float(parts[1])
+
+                if parts[0].startswith("node_network_transmit_bytes_total") and 'device="lo"' not in parts[0]:
+                    net_tx_bytes += float(parts[1])
+
+                # TCP retransmits and sockets
+                if parts[0] == "node_netstat_Tcp_RetransSegs":
+                    tcp_retransmits = float(parts[1])
+
+                if parts[0] == "node_sockstat_TCP_inuse":
+                    tcp_inuse = int(float(parts[1]))
+
+                if parts[0] == "node_sockstat_TCP_tw":
+                    tcp_time_wait = int(float(parts[1]))
+
+                if parts[0] == "node_sockstat_sockets_used":
+                    sockets_used = int(float(parts[1]))
                 
         # CPU usage must be calculated in terms of previous cycles since prometheus counts total time
         cpu_usage_pct = None
+        delta_active = None
         if self.last_cycle_cpu_active_time is not None and self.last_cycle_cpu_idle_time is not None:
             delta_active = active_cpu_time - self.last_cycle_cpu_active_time
             delta_idle = idle_cpu_time - self.last_cycle_cpu_idle_time
             cpu_usage_pct = (delta_active / (delta_active + delta_idle)) * 100.0
             
+        # Network counters are also totals, so rates are taken over the time since the previous cycle
+        rx_rate = None
+        tx_rate = None
+        retransmits = None
+        if self.last_cycle_time is not None and now > self.last_cycle_time:
+            interval_s = now - self.last_cycle_time
+            if self.last_cycle_net_bytes is not None:
+                rx_rate = max(0.0, net_rx_bytes - self.last_cycle_net_bytes[0]) / interval_s
+                tx_rate = max(0.0, net_tx_bytes - self.last_cycle_net_bytes[1]) / interval_s
+            if tcp_retransmits is not None and self.last_cycle_tcp_retransmits is not None:
+                retransmits = int(max(0.0, tcp_retransmits - self.last_cycle_tcp_retransmits))
+
         self.last_cycle_cpu_active_time = active_cpu_time
         self.last_cycle_cpu_idle_time = idle_cpu_time
+        self.last_cycle_time = now
+        self.last_cycle_net_bytes = (net_rx_bytes, net_tx_bytes)
+        self.last_cycle_tcp_retransmits = tcp_retransmits
         
         # Memory
         mem_usage_pct = (1.0 - (mem_free / mem_total)) * 100
@@ -192,17 +652,34 @@ class BrokerMonitor:
         sample = BrokerMetricsSample(
             timestamp=time.time(),
             cpu_usage_percent=cpu_usage_pct,
-            mem_usage_percent=mem_usage_pct
+            mem_usage_percent=mem_usage_pct,
+            cpu_active_seconds=delta_active,
+            mem_bytes=int(mem_total - mem_free),
+            net_rx_bytes_per_sec=rx_rate,
+            net_tx_bytes_per_sec=tx_rate,
+            tcp_retransmits=retransmits,
+            tcp_sockets_inuse=tcp_inuse,
+            tcp_sockets_time_wait=tcp_time_wait,
+            sockets_used=sockets_used
         )
 
         return sample
 
     def log_summary(self):
         """Log a summary of collected metrics"""
+
+        # The sys backend only logs $SYS values as they are sampled, so there is nothing to summarize
+        if self.backend == GlobalDefs.MonitorBackend.SYS:
+            if self.sys_sample_count == 0:
+                console_log(ConsoleLogLevel.WARNING, "No $SYS values received", __name__)
+            return
+
         if not self.samples:
             console_log(ConsoleLogLevel.WARNING, "No samples collected", __name__)
             return
 
         cpu_metrics, mem_metrics = self.calculate_metrics()
-        GlobalDefs.LOGGING_MODULE.log_cpu_metrics(cpu_metrics[0], cpu_metrics[1], cpu_metrics[2], cpu_metrics[3])
-        GlobalDefs.LOGGING_MODULE.log_mem_metrics(mem_metrics[0], mem_metrics[1], mem_metrics[2], mem_metrics[3])
+        if cpu_metrics[0] >= 0:
+            GlobalDefs.LOGGING_MODULE.log_cpu_metrics(cpu_metrics[0], cpu_metrics[1], cpu_metrics[2], cpu_metrics[3])
+        if mem_metrics[0] >= 0:
+            GlobalDefs.LOGGING_MODULE.log_mem_metrics(mem_metrics[0], mem_metrics[1], mem_metrics[2], mem_metrics[3])
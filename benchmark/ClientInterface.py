@@ -1,5 +1,6 @@
 import paho.mqtt.client as mqtt
 import MQTTClient
+import LoopbackClient
 from paho.mqtt.subscribeoptions import SubscribeOptions
 from paho.mqtt.reasoncodes import ReasonCode
 from paho.mqtt.enums import MQTTProtocolVersion, CallbackAPIVersion
@@ -23,8 +24,9 @@ paho.mqtt.client.Client
 """
 def create_v5_client(client_id: str) -> mqtt.Client:
 
-    # Instantiate client
-    mqtt_client = MQTTClient.MQTTClient(
+    # Instantiate client, talking to the in-process sink when there is no broker
+    client_class = LoopbackClient.LoopbackClient if GlobalDefs.NULL_BROKER else MQTTClient.MQTTClient
+    mqtt_client = client_class(
         callback_api_version=CallbackAPIVersion.VERSION2,
         client_id=client_id,
         protocol=MQTTProtocolVersion.MQTTv5,
@@ -135,7 +137,7 @@ def subscribe_with_purpose_filter(client: mqtt.Client, method: GlobalDefs.Purpos
         # We directly subscribe without care for purposes or duplicate subscriptions
         properties = mqtt.Properties(packetType=mqtt.PacketTypes.SUBSCRIBE)
         properties.SubscriptionIdentifier = SUBSCRIPTION_ID_COUNTER
-        result, mid = client.subscribe(topic_filter, options=subscribe_options)
+        result, mid = client.subscribe(topic_filter, properties=properties, options=subscribe_options)
         return_list.append((result, mid, SUBSCRIPTION_ID_COUNTER))
         SUBSCRIPTION_ID_COUNTER += 1
         
@@ -146,7 +148,7 @@ def subscribe_with_purpose_filter(client: mqtt.Client, method: GlobalDefs.Purpos
         
         # First we need to unsubscribe from all old purpose topics
         if existing_subscription:
-            old_described_purposes = GlobalDefs.find_described_purposes(previous_purpose_filter)
+            old_described_purposes = GlobalDefs.compile_purpose_filter(previous_purpose_filter).described_purposes
             
             # Convert the purpose list into topics
             old_topic_list = list()
@@ -162,7 +164,7 @@ def subscribe_with_purpose_filter(client: mqtt.Client, method: GlobalDefs.Purpos
                 result, mid = client.unsubscribe(topic, properties=unsub_properties)
 
         # Now find new purposes
-        described_purposes = GlobalDefs.find_described_purposes(purpose_filter)
+        described_purposes = GlobalDefs.compile_purpose_filter(purpose_filter).described_purposes
 
         # Convert the purpose list into topics
         topic_list = list()
@@ -207,7 +209,7 @@ def subscribe_with_purpose_filter(client: mqtt.Client, method: GlobalDefs.Purpos
             try:
                 properties = mqtt.Properties(packetType=mqtt.PacketTypes.SUBSCRIBE)
                 properties.SubscriptionIdentifier = SUBSCRIPTION_ID_COUNTER
-                result, mid = client.subscribe(topic_filter, options=subscribe_options)
+                result, mid = client.subscribe(topic_filter, properties=properties, options=subscribe_options)
                 return_list.append((result, mid, SUBSCRIPTION_ID_COUNTER))
             except Exception as e:
                 return_list.append((mqtt.MQTTErrorCode.MQTT_ERR_UNKNOWN, None, SUBSCRIPTION_ID_COUNTER))
@@ -239,6 +241,28 @@ def subscribe_for_operations(client: mqtt.Client, method: GlobalDefs.PurposeMana
     return subscribe_with_purpose_filter(client, method, topic_filter, GlobalDefs.OP_PURPOSE, 2)
 
 
+"""Attempts to SUBSCRIBE client to a broker system topic filter such as $SYS/#. These
+topics are published by the broker itself, so no purpose filter is attached regardless of
+the purpose management method
+
+Parameters
+----------
+client : paho.mqtt.client.Client
+    The client to subscribe with
+topic_filter : str
+    The system topic filter on which to subscribe
+qos : int, optional
+    The quality of service for the subscription
+
+Returns
+----------
+tuple[paho.mqtt.client.MQTTErrorCode, int | None]
+    A tuple containing the error code and (if successful) the message ID of the subscribe
+"""
+def subscribe_to_system_topic(client: mqtt.Client, topic_filter: str, qos: int = 0) -> Tuple[mqtt.MQTTErrorCode, Optional[int]]:
+    return client.subscribe(topic_filter, qos)
+
+
 """Attempts to register a purpose filter for publications to a topic (Used only for PM_2 and PM_3)
 
 Parameters
@@ -306,6 +330,10 @@ qos : int, optional
     The quality of service for the message
 payload : str, optional
     The payload to send within the message
+correlation_data : int, optional
+    The correlation data to attach to the message
+send_timestamp_ns : int, optional
+    The send timestamp to attach to the message as a user property
 
 Returns
 ----------
@@ -315,7 +343,8 @@ list[tuple[paho.mqtt.client.MQTTErrorCode, str]]
 """
 def publish_with_purpose(client: mqtt.Client, method: GlobalDefs.PurposeManagementMethod, 
                          topic: str, purpose: Optional[str] = None, qos: int = 0, 
-                         retain: bool = False, payload: str | None = None, correlation_data: int | None = None) -> List[Tuple[mqtt.MQTTMessageInfo, str]]:
+                         retain: bool = False, payload: str | None = None, correlation_data: int | None = None,
+                         send_timestamp_ns: int | None = None) -> List[Tuple[mqtt.MQTTMessageInfo, str]]:
     
     
     if purpose == None:
@@ -327,6 +356,9 @@ def publish_with_purpose(client: mqtt.Client, method: GlobalDefs.PurposeManageme
     properties.UserProperty = (GlobalDefs.PROPERTY_ID, client._client_id)
     properties.UserProperty = (GlobalDefs.PROPERTY_CONSENT, "1")
     
+    if send_timestamp_ns is not None:
+        properties.UserProperty = (GlobalDefs.PROPERTY_SEND_TIME, str(send_timestamp_ns))
+    
     if correlation_data is not None:
         required_bytes = ceil(correlation_data.bit_length() / 8.0)
         properties.CorrelationData = correlation_data.to_bytes(length=required_bytes, byteorder='big', signed=False)
@@ -342,7 +374,7 @@ def publish_with_purpose(client: mqtt.Client, method: GlobalDefs.PurposeManageme
     elif method == GlobalDefs.PurposeManagementMethod.PM_1:
         
         # Need to send message to each purpose topic
-        described_purposes = GlobalDefs.find_described_purposes(purpose)
+        described_purposes = GlobalDefs.compile_purpose_filter(purpose).described_purposes
 
         # Convert the purpose list into topics
         topic_list = list()
@@ -442,7 +474,7 @@ def publish_operation_response(client: mqtt.Client, method: GlobalDefs.PurposeMa
         properties.UserProperty = (GlobalDefs.PROPERTY_CONSENT, "1")
         
         # Need to send message to each purpose topic
-        described_purposes = GlobalDefs.find_described_purposes(GlobalDefs.OP_PURPOSE)
+        described_purposes = GlobalDefs.compile_purpose_filter(GlobalDefs.OP_PURPOSE).described_purposes
         
         # Convert the purpose list into topics
         topic_list = list()
@@ -510,7 +542,7 @@ def _handle_operation_publish(client: mqtt.Client, method: GlobalDefs.PurposeMan
         properties.UserProperty = (GlobalDefs.PROPERTY_CONSENT, "1")
         
         # Need to send message to each purpose topic
-        described_purposes = GlobalDefs.find_described_purposes(purpose)
+        described_purposes = GlobalDefs.compile_purpose_filter(purpose).described_purposes
         
         # Convert the purpose list into topics
         topic_list = list()
@@ -2,7 +2,7 @@ import yaml
 import os
 import sys
 from typing import List, Dict
-from GlobalDefs import ExitCode, PurposeManagementMethod
+from GlobalDefs import ExitCode, PurposeManagementMethod, SendTimestampMode, MonitorBackend
 import GlobalDefs
 from LoggingModule import console_log, ConsoleLogLevel
 
@@ -24,6 +24,14 @@ class TestConfiguration:
     monitor_broker: bool = False
     node_exporter_url: str = "http://localhost:9100/metrics"
     monitor_interval_ms: int = 1000
+    monitor_backend: MonitorBackend = MonitorBackend.NODE_EXPORTER
+    monitor_pid: int | None = None
+    monitor_process: str | None = None
+    monitor_cgroup_path: str | None = None
+    monitor_sys_topics: List[str] | None = None
+    
+    # In-band latency measurement
+    send_timestamp_mode: SendTimestampMode = SendTimestampMode.NONE
     
     # Event Scheduling
     scheduled_events: List = list()
@@ -195,6 +203,31 @@ class ConfigParser():
         test_config.monitor_broker = data.get('monitor_broker', False)
         test_config.node_exporter_url = data.get('node_exporter_url', 'http://localhost:9100/metrics')
         test_config.monitor_interval_ms = data.get('monitor_interval_ms', 1000)
+
+        monitor_backend = data.get('monitor_backend', MonitorBackend.NODE_EXPORTER.value)
+        try:
+            test_config.monitor_backend = MonitorBackend(monitor_backend)
+        except ValueError:
+            raise Exception(f"unknown monitor_backend '{monitor_backend}' found in config")
+
+        test_config.monitor_pid = data.get('monitor_pid', None)
+        test_config.monitor_process = data.get('monitor_process', None)
+        test_config.monitor_cgroup_path = data.get('monitor_cgroup_path', None)
+        test_config.monitor_sys_topics = data.get('monitor_sys_topics', None)
+        if test_config.monitor_sys_topics is not None and not isinstance(test_config.monitor_sys_topics, list):
+            raise Exception("monitor_sys_topics must be a list of topic filters in config")
+        if test_config.monitor_broker:
+            if test_config.monitor_backend == MonitorBackend.PROCESS and test_config.monitor_pid is None and test_config.monitor_process is None:
+                raise Exception("monitor_backend 'process' requires monitor_pid or monitor_process in config")
+            if test_config.monitor_backend == MonitorBackend.CGROUP and test_config.monitor_cgroup_path is None:
+                raise Exception("monitor_backend 'cgroup' requires monitor_cgroup_path in config")
+
+        # In-band send timestamp settings
+        send_timestamp_mode = data.get('send_timestamp_mode', SendTimestampMode.NONE.value)
+        try:
+            test_config.send_timestamp_mode = SendTimestampMode(send_timestamp_mode)
+        except ValueError:
+            raise Exception(f"unknown send_timestamp_mode '{send_timestamp_mode}' found in config")
         
         # Operational information
         # Ops not required, may be empty
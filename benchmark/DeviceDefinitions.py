@@ -1,8 +1,13 @@
 import paho.mqtt.client as mqtt
 import re
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Any
+from typing import Deque, Dict, Optional, Any
 from LoggingModule import console_log, ConsoleLogLevel
+from LatencyHistogram import LatencyHistogram
+
+# Number of recent in-band latencies each device keeps for live reporting
+RECENT_LATENCY_SAMPLES: int = 1024
 
 
 @dataclass
@@ -44,20 +49,32 @@ class DeviceInstance:
     mqtt_client: mqtt.Client
     mqtt_client_name: str
     is_connected: bool = False
+    clean_start: bool = True  # Whether the most recent connection asked the broker to discard the session
     is_publishing: bool = False
     current_purpose_filter: str = ""
     last_publish_time_ms: float = 0.0
     message_count: int = 0
     message_id_to_send_counter: Dict[int, int] = field(default_factory=dict)
     subscribed_topics: Dict[str, str] = field(default_factory=dict)  # topic_filter -> purpose_filter
+    latency_histogram: LatencyHistogram = field(default_factory=LatencyHistogram)  # In-band latencies in ns, written by the client's network thread
+
+    # Live counters, each only written by one thread (publish counts by the thread publishing for
+    # the device, everything else by the client's network thread) so they can be read without locks
+    publish_count: int = 0
+    publish_ack_count: int = 0
+    recv_count: int = 0
+    recv_bytes: int = 0
+    recent_latencies_ns: Deque[int] = field(default_factory=lambda: deque(maxlen=RECENT_LATENCY_SAMPLES))
 
-    def should_publish_now(self, current_time_ms: float) -> bool:
+    def should_publish_now(self, current_time_ms: float, ignore_period: bool = False) -> bool:
         """Check if device should publish based on publication period
 
         Parameters
         ----------
         current_time_ms : float
             Current time in ms since test start
+        ignore_period : bool, optional
+            Publish whenever connected and publishing, regardless of the period
 
         Returns
         -------
@@ -70,6 +87,9 @@ class DeviceInstance:
         if not isinstance(self.device_definition, PublisherDefinition):
             return False
 
+        if ignore_period:
+            return True
+
         elapsed_ms = current_time_ms - self.last_publish_time_ms
         return elapsed_ms >= self.device_definition.pub_period_ms
 
@@ -167,13 +187,15 @@ class DeviceManager:
         """Get all device instances"""
         return list(self.device_instances.values())
 
-    def get_publishers_ready_to_publish(self, current_time_ms: float) -> list[DeviceInstance]:
+    def get_publishers_ready_to_publish(self, current_time_ms: float, ignore_period: bool = False) -> list[DeviceInstance]:
         """Get all publishers that should publish now
 
         Parameters
         ----------
         current_time_ms : float
             Current time in ms since test start
+        ignore_period : bool, optional
+            Include every connected, publishing publisher regardless of its period
 
         Returns
         -------
@@ -181,7 +203,7 @@ class DeviceManager:
             Publishers due to publish
         """
         publishers = self.get_all_publishers()
-        return [pub for pub in publishers if pub.should_publish_now(current_time_ms)]
+        return [pub for pub in publishers if pub.should_publish_now(current_time_ms, ignore_period)]
 
     def clear(self):
         """Clear all definitions and instances"""
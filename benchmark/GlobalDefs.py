@@ -1,7 +1,8 @@
 from enum import Enum, IntEnum
+import functools
 import itertools
 from types import ModuleType
-from typing import TYPE_CHECKING, List  # Import List for compatibility
+from typing import TYPE_CHECKING, List, Optional  # Import List for compatibility
 
 # These provide type checking without cyclic imports
 if TYPE_CHECKING:
@@ -30,6 +31,27 @@ class C3RightsMethod(Enum):
     C3_1 = "Direct Publication"
     C3_2 = "Broker-Facilitated"
     
+# Where publishers embed their send timestamp for receive-side latency
+class SendTimestampMode(Enum):
+    NONE = "none"
+    PROPERTY = "property"
+    PAYLOAD = "payload"
+
+# Where broker resource usage is read from
+class MonitorBackend(Enum):
+    NODE_EXPORTER = "node_exporter"
+    PROCESS = "process"
+    CGROUP = "cgroup"
+    SYS = "sys"
+
+# What a packet on the wire is for, PUBLISH packets are classified by their topic
+class TrafficClass(Enum):
+    DATA = "DATA"
+    REGISTRATION = "REGISTRATION"
+    OP_REQUEST = "OP_REQUEST"
+    OP_RESPONSE = "OP_RESPONSE"
+    CONTROL = "CONTROL"
+
 ALL_PURPOSE_FILTER: str = "*"
 
 # Exit Code definitions
@@ -50,6 +72,9 @@ LOGGING_MODULE: 'ResultLogger'
 
 VERBOSE_LOGGING: bool = False
 
+# Set when running against the in-process loopback sink instead of a broker
+NULL_BROKER: bool = False
+
 # These should be assigned to based on the config file
 REG_BY_TOPIC_PUB_REG_TOPIC: str = ""
 REG_BY_TOPIC_SUB_REG_TOPIC: str= ""
@@ -62,6 +87,10 @@ PROPERTY_CONSENT: str = "DAP-Allow"
 PROPERTY_OPERATION: str = "DAP-Operation"
 PROPERTY_OP_INFO: str = "DAP-OpInfo"
 PROPERTY_OP_STATUS: str = "DAP-Status"
+PROPERTY_SEND_TIME: str = "BENCH-SendTime"
+
+# Size of the big-endian nanosecond send timestamp prefixed to payloads
+SEND_TIMESTAMP_BYTES: int = 8
 
 # Operational topics
 OR_TOPIC: str = "OR"
@@ -83,7 +112,30 @@ CLIENT_FUNCTIONS: List[str] = [
 ]
 
 ## UTILITY METHODS ##
-def find_described_purposes(purpose_filter: str) -> list[str]:
+
+# The most compiled purpose filters kept for reuse by compile_purpose_filter
+PURPOSE_FILTER_CACHE_SIZE: int = 4096
+
+class PurposeFilter:
+    """A purpose filter expanded once into the set of purposes it describes
+
+    Each '/' separated level is a purpose or a '{a,b}' choice of purposes, where a '.' choice
+    ends the purpose before that level. Checking whether a purpose is described is a set lookup.
+    """
+
+    def __init__(self, purpose_filter: str):
+        self.purpose_filter = purpose_filter
+        self.described_purposes: tuple[str, ...] = tuple(_expand_purpose_filter(purpose_filter))
+        self.described_purpose_set: frozenset[str] = frozenset(self.described_purposes)
+
+    def describes(self, purpose: str) -> bool:
+        return purpose in self.described_purpose_set
+
+    def intersects(self, other: 'PurposeFilter') -> bool:
+        """Check whether the two filters describe at least one common purpose"""
+        return not self.described_purpose_set.isdisjoint(other.described_purpose_set)
+
+def _expand_purpose_filter(purpose_filter: str) -> list[str]:
 
     # Break purpose filter into individual purposes
     filter_levels = purpose_filter.split('/')
@@ -107,6 +159,66 @@ def find_described_purposes(purpose_filter: str) -> list[str]:
 
     return described_purposes
 
+"""Gets the compiled form of a purpose filter, shared by every caller through a bounded LRU cache
+
+Parameters
+----------
+purpose_filter : str
+    The purpose filter to compile
+
+Returns
+----------
+PurposeFilter
+    The compiled filter, which must not be modified
+"""
+@functools.lru_cache(maxsize=PURPOSE_FILTER_CACHE_SIZE)
+def compile_purpose_filter(purpose_filter: str) -> PurposeFilter:
+    return PurposeFilter(purpose_filter)
+
+def find_described_purposes(purpose_filter: str) -> list[str]:
+    return list(compile_purpose_filter(purpose_filter).described_purposes)
+
 def purpose_described_by_filter(purpose: str, purpose_filter: str) -> bool:
-    purposes_described_by_filter = find_described_purposes(purpose_filter)
-    return (purpose in purposes_described_by_filter)
\ No newline at end of file
+    return compile_purpose_filter(purpose_filter).describes(purpose)
+
+"""Check whether a message purpose may be delivered to a subscription purpose filter
+
+A message or subscription that has not declared a purpose is not restricted, which
+matches a broker that has no purpose information for it.
+
+Parameters
+----------
+message_purpose : str or None
+    The purpose declared or registered for the message
+subscription_purpose : str or None
+    The purpose filter declared or registered for the subscription
+
+Returns
+----------
+bool
+    True if the message may be delivered
+"""
+def purpose_allowed(message_purpose: Optional[str], subscription_purpose: Optional[str]) -> bool:
+    if message_purpose is None or subscription_purpose is None:
+        return True
+
+    message_purposes = compile_purpose_filter(message_purpose)
+    subscription_purposes = compile_purpose_filter(subscription_purpose)
+    if message_purposes.describes(ALL_PURPOSE_FILTER) or subscription_purposes.describes(ALL_PURPOSE_FILTER):
+        return True
+    return message_purposes.intersects(subscription_purposes)
+
+def classify_publish_topic(topic: str) -> TrafficClass:
+
+    # Purpose registrations for PM_3 and PM_4
+    for reg_topic in (REG_BY_MSG_REG_TOPIC, REG_BY_TOPIC_PUB_REG_TOPIC, REG_BY_TOPIC_SUB_REG_TOPIC):
+        if reg_topic and topic.startswith(reg_topic):
+            return TrafficClass.REGISTRATION
+
+    first_level = topic.split('/', 1)[0]
+    if first_level == OP_RESPONSE_TOPIC:
+        return TrafficClass.OP_RESPONSE
+    if first_level in (OSYS_TOPIC, OR_TOPIC, ORS_TOPIC, ON_TOPIC, ONP_TOPIC):
+        return TrafficClass.OP_REQUEST
+
+    return TrafficClass.DATA
\ No newline at end of file
@@ -0,0 +1,128 @@
+from typing import Dict, Optional
+
+# Values below SUB_BUCKET_COUNT get exact buckets, larger values keep
+# SUB_BUCKET_BITS - 1 significant bits (relative error below 1/64)
+SUB_BUCKET_BITS: int = 7
+SUB_BUCKET_COUNT: int = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKET_COUNT: int = SUB_BUCKET_COUNT >> 1
+
+
+class LatencyHistogram:
+    """Streaming log-linear histogram of non-negative integer values (e.g. latencies in ns)
+
+    Recording is O(1) and memory is bounded by the number of occupied buckets, so a
+    histogram can be filled for the whole run without keeping individual samples.
+    A histogram is not synchronized and should only be written by a single thread.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count: int = 0
+        self.total: int = 0
+        self.min_value: Optional[int] = None
+        self.max_value: Optional[int] = None
+
+    def record(self, value: int):
+        """Record a single value
+
+        Parameters
+        ----------
+        value : int
+            The value to record, negative values are clamped to zero
+        """
+        if value < 0:
+            value = 0
+
+        index = _bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add all values recorded in another histogram to this one"""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        if other.max_value is not None and (self.max_value is None or other.max_value > self.max_value):
+            self.max_value = other.max_value
+
+    def mean(self) -> float:
+        """Get the exact mean of all recorded values"""
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, percent: float) -> float:
+        """Get an approximate percentile of the recorded values
+
+        Parameters
+        ----------
+        percent : float
+            The percentile to find in the range [0, 100]
+
+        Returns
+        -------
+        float
+            The midpoint of the bucket containing the percentile, clamped to the recorded range
+        """
+        if self.count == 0 or self.min_value is None or self.max_value is None:
+            return 0.0
+
+        target = max(1, round(self.count * percent / 100.0))
+        cumulative = 0
+        for index in sorted(self.buckets):
+            cumulative += self.buckets[index]
+            if cumulative >= target:
+                low, high = _bucket_range(index)
+                value = (low + high) / 2.0
+                return min(max(value, self.min_value), self.max_value)
+
+        return float(self.max_value)
+
+    def encode(self) -> str:
+        """Encode the histogram as a single log field"""
+        return ','.join(f"{index}:{count}" for index, count in sorted(self.buckets.items()))
+
+    @classmethod
+    def decode(cls, encoded_buckets: str, count: int, total: int,
+               min_value: Optional[int], max_value: Optional[int]) -> 'LatencyHistogram':
+        """Rebuild a histogram from its logged fields"""
+        histogram = cls()
+        if encoded_buckets:
+            for entry in encoded_buckets.split(','):
+                index, bucket_count = entry.split(':')
+                histogram.buckets[int(index)] = int(bucket_count)
+        histogram.count = count
+        histogram.total = total
+        histogram.min_value = min_value
+        histogram.max_value = max_value
+        return histogram
+
+
+def _bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+
+    # Keep the top bits of the value and count the discarded ones
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    top = value >> shift
+    return SUB_BUCKET_COUNT + (shift - 1) * HALF_SUB_BUCKET_COUNT + (top - HALF_SUB_BUCKET_COUNT)
+
+
+def _bucket_range(index: int) -> tuple[int, int]:
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+
+    offset = index - SUB_BUCKET_COUNT
+    shift = offset // HALF_SUB_BUCKET_COUNT + 1
+    top = offset % HALF_SUB_BUCKET_COUNT + HALF_SUB_BUCKET_COUNT
+    return top << shift, ((top + 1) << shift) - 1
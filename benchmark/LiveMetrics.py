@@ -0,0 +1,195 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import GlobalDefs
+from LoggingModule import console_log, ConsoleLogLevel
+
+# These provide type checking without cyclic imports
+if TYPE_CHECKING:
+    from TestExecutor import TestExecutor
+
+METRIC_PREFIX: str = "mqtt_dap_benchmark"
+LATENCY_QUANTILES: List[float] = [0.5, 0.9, 0.99]
+RATE_INTERVAL_S: float = 1.0
+
+
+class LiveMetricsServer:
+    """Serves live metrics of a running test in the Prometheus text format
+
+    The server only reads counters that are each written by a single benchmark
+    thread, so the test itself never takes a lock or parses logs for monitoring.
+    Rates are taken by a sampler thread on a fixed interval rather than between
+    scrapes, so any number of scrapers see the same rates.
+    """
+
+    def __init__(self, executor: 'TestExecutor', port: int, address: str = "127.0.0.1"):
+        """Initialize live metrics server
+
+        Parameters
+        ----------
+        executor : TestExecutor
+            The executor whose devices and main loop are exposed
+        port : int
+            The port on which to serve metrics
+        address : str, optional
+            The address on which to serve metrics (default is localhost only)
+        """
+        self.executor = executor
+        self.port = port
+        self.address = address
+        self.http_server: Optional[HTTPServer] = None
+        self.server_thread: Optional[threading.Thread] = None
+        self.sampler_thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+
+        # Rates over the latest sampling interval, replaced whole by the sampler thread so scrapes only read them
+        self.publish_rates: Dict[str, float] = {}
+        self.recv_rates: Dict[str, float] = {}
+
+    def start(self):
+        """Start serving metrics on a background thread
+
+        Raises
+        ----------
+        OSError
+            If the port cannot be bound
+        """
+        metrics_server = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+
+                body = metrics_server.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep scrapes out of the console output
+                return
+
+        self.http_server = HTTPServer((self.address, self.port), MetricsRequestHandler)
+        self.server_thread = threading.Thread(target=self.http_server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+        self.stop_event.clear()
+        self.sampler_thread = threading.Thread(target=self._sample_rates, name="LiveMetricsSampler")
+        self.sampler_thread.daemon = True
+        self.sampler_thread.start()
+        console_log(ConsoleLogLevel.INFO, f"Serving live metrics at http://{self.address}:{self.port}/metrics", __name__)
+
+    def shutdown(self):
+        """Stop serving metrics"""
+        self.stop_event.set()
+        if self.sampler_thread is not None:
+            self.sampler_thread.join()
+            self.sampler_thread = None
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+            self.http_server = None
+        if self.server_thread is not None:
+            self.server_thread.join()
+            self.server_thread = None
+
+    def _sample_rates(self):
+        """Derive publish and receive rates from the counters every RATE_INTERVAL_S until stopped"""
+        last_time = time.monotonic()
+        last_totals = self._get_message_totals()
+
+        while not self.stop_event.wait(RATE_INTERVAL_S):
+            now = time.monotonic()
+            totals = self._get_message_totals()
+
+            interval_s = now - last_time
+            if interval_s > 0:
+                publish_rates: Dict[str, float] = {}
+                recv_rates: Dict[str, float] = {}
+                for device_type, (published, received) in totals.items():
+                    last_published, last_received = last_totals.get(device_type, (0, 0))
+                    publish_rates[device_type] = max(0, published - last_published) / interval_s
+                    recv_rates[device_type] = max(0, received - last_received) / interval_s
+                self.publish_rates = publish_rates
+                self.recv_rates = recv_rates
+
+            last_time = now
+            last_totals = totals
+
+    def _get_message_totals(self) -> Dict[str, Tuple[int, int]]:
+        """Get the published and received message counts of every device type"""
+        totals: Dict[str, Tuple[int, int]] = {}
+        for device in self.executor.device_manager.get_all_instances():
+            published, received = totals.get(device.device_definition.id, (0, 0))
+            totals[device.device_definition.id] = (published + device.publish_count, received + device.recv_count)
+        return totals
+
+    def render(self) -> str:
+        """Render the current metrics in the Prometheus text exposition format
+
+        Returns
+        -------
+        str
+            The metrics page
+        """
+        # Aggregate the per-device counters by device type
+        published: Dict[str, int] = {}
+        acknowledged: Dict[str, int] = {}
+        received: Dict[str, int] = {}
+        received_bytes: Dict[str, int] = {}
+        connected: Dict[str, int] = {}
+        latencies_ns: Dict[str, List[int]] = {}
+
+        for device in self.executor.device_manager.get_all_instances():
+            device_type = device.device_definition.id
+            published[device_type] = published.get(device_type, 0) + device.publish_count
+            acknowledged[device_type] = acknowledged.get(device_type, 0) + device.publish_ack_count
+            received[device_type] = received.get(device_type, 0) + device.recv_count
+            received_bytes[device_type] = received_bytes.get(device_type, 0) + device.recv_bytes
+            connected[device_type] = connected.get(device_type, 0) + (1 if device.is_connected else 0)
+            latencies_ns.setdefault(device_type, []).extend(list(device.recent_latencies_ns))
+
+        lines: List[str] = []
+        self._add_metric(lines, "published_messages_total", "counter", "PUBLISH packets handed to the client", published)
+        self._add_metric(lines, "received_messages_total", "counter", "Messages delivered to the devices", received)
+        self._add_metric(lines, "received_payload_bytes_total", "counter", "Payload bytes delivered to the devices", received_bytes)
+        self._add_metric(lines, "publish_rate_per_second", "gauge", f"PUBLISH packets per second over the latest {RATE_INTERVAL_S} s", self.publish_rates)
+        self._add_metric(lines, "receive_rate_per_second", "gauge", f"Messages received per second over the latest {RATE_INTERVAL_S} s", self.recv_rates)
+        self._add_metric(lines, "inflight_messages", "gauge", "PUBLISH packets not yet acknowledged by the client",
+                         {device_type: max(0, published[device_type] - acknowledged[device_type]) for device_type in published})
+        self._add_metric(lines, "connected_devices", "gauge", "Devices currently connected to the broker", connected)
+
+        # Latency quantiles over the most recent in-band measurements of each device
+        lines.append(f"# HELP {METRIC_PREFIX}_latency_seconds Recent in-band message latency")
+        lines.append(f"# TYPE {METRIC_PREFIX}_latency_seconds summary")
+        for device_type, values in sorted(latencies_ns.items()):
+            if not values:
+                continue
+            values.sort()
+            for quantile in LATENCY_QUANTILES:
+                index = min(len(values) - 1, int(quantile * len(values)))
+                lines.append(f'{METRIC_PREFIX}_latency_seconds{{device_type="{device_type}",quantile="{quantile}"}} {values[index] / 1e9}')
+            lines.append(f'{METRIC_PREFIX}_latency_seconds_count{{device_type="{device_type}"}} {len(values)}')
+
+        # Process-wide values
+        queue_depth = GlobalDefs.LOGGING_MODULE.log_queue.qsize()
+        lines.append(f"# HELP {METRIC_PREFIX}_logger_queue_depth Log messages waiting to be written")
+        lines.append(f"# TYPE {METRIC_PREFIX}_logger_queue_depth gauge")
+        lines.append(f"{METRIC_PREFIX}_logger_queue_depth {queue_depth}")
+        lines.append(f"# HELP {METRIC_PREFIX}_main_loop_lag_seconds Time the most recent main loop iteration ran past its planned sleep")
+        lines.append(f"# TYPE {METRIC_PREFIX}_main_loop_lag_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_main_loop_lag_seconds {self.executor.main_loop_lag_ms / 1000.0}")
+
+        return '\n'.join(lines) + '\n'
+
+    def _add_metric(self, lines: List[str], name: str, metric_type: str, help_text: str, values: Dict[str, float] | Dict[str, int]):
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+        for device_type, value in sorted(values.items()):
+            lines.append(f'{METRIC_PREFIX}_{name}{{device_type="{device_type}"}} {value}')
@@ -0,0 +1,588 @@
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from paho.mqtt.client import topic_matches_sub
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties, VariableByteIntegers
+import GlobalDefs
+from LoggingModule import console_log, ConsoleLogLevel
+
+# Passing this as the broker address runs the benchmark against the local broker
+LOCAL_BROKER_ADDRESS: str = "local"
+LISTEN_ADDRESS: str = "127.0.0.1"
+
+# Client ID used by the broker for messages it publishes itself
+BROKER_CLIENT_ID: str = "Broker"
+
+# Operations the broker answers itself instead of forwarding to subscribers
+BROKER_ANSWERED_OPERATIONS: List[str] = ["Informed"]
+
+SYS_INTERVAL_S: float = 1.0
+MAX_QUEUED_MESSAGES: int = 1000
+
+# MQTT control packet types
+CONNECT: int = 1
+CONNACK: int = 2
+PUBLISH: int = 3
+PUBACK: int = 4
+PUBREC: int = 5
+PUBREL: int = 6
+PUBCOMP: int = 7
+SUBSCRIBE: int = 8
+SUBACK: int = 9
+UNSUBSCRIBE: int = 10
+UNSUBACK: int = 11
+PINGREQ: int = 12
+PINGRESP: int = 13
+DISCONNECT: int = 14
+
+# MQTT v5 reason codes
+SUCCESS: int = 0x00
+NO_SUBSCRIPTION_EXISTED: int = 0x11
+UNSUPPORTED_PROTOCOL_VERSION: int = 0x84
+SESSION_TAKEN_OVER: int = 0x8E
+TOPIC_FILTER_INVALID: int = 0x8F
+PACKET_ID_NOT_FOUND: int = 0x92
+
+SUBSCRIPTION_IDENTIFIER_PROPERTY: int = 11
+MQTT_V5: int = 5
+
+
+def _encode_string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return len(encoded).to_bytes(2, "big") + encoded
+
+def _decode_string(buffer: bytes, offset: int) -> Tuple[str, int]:
+    length = int.from_bytes(buffer[offset:offset + 2], "big")
+    return buffer[offset + 2:offset + 2 + length].decode("utf-8"), offset + 2 + length
+
+def _decode_binary(buffer: bytes, offset: int) -> Tuple[bytes, int]:
+    length = int.from_bytes(buffer[offset:offset + 2], "big")
+    return buffer[offset + 2:offset + 2 + length], offset + 2 + length
+
+def _decode_properties(packet_type: int, buffer: bytes, offset: int) -> Tuple[Properties, int]:
+    properties = Properties(packet_type)
+    _, length = properties.unpack(buffer[offset:])
+    return properties, offset + length
+
+def _build_packet(packet_type: int, flags: int, body: bytes) -> bytes:
+    return bytes([(packet_type << 4) | flags]) + VariableByteIntegers.encode(len(body)) + body
+
+def _get_user_property(properties: Properties, name: str) -> Optional[str]:
+    for property_name, value in getattr(properties, "UserProperty", []):
+        if property_name == name:
+            return value
+    return None
+
+def _valid_topic_filter(topic_filter: str) -> bool:
+    if not topic_filter:
+        return False
+    levels = topic_filter.split('/')
+    for index, level in enumerate(levels):
+        if '#' in level and (level != '#' or index != len(levels) - 1):
+            return False
+        if '+' in level and level != '+':
+            return False
+    return True
+
+
+@dataclass
+class Subscription:
+    """A subscription held by a session"""
+    topic_filter: str
+    qos: int
+    no_local: bool = False
+    subscription_id: Optional[int] = None
+    purpose_filter: Optional[str] = None
+
+
+@dataclass
+class Session:
+    """The state the broker keeps for a client ID"""
+    client_id: str
+    writer: Optional[asyncio.StreamWriter] = None
+    expiry_interval: int = 0
+    subscriptions: Dict[str, Subscription] = field(default_factory=dict)
+    next_packet_id: int = 1
+    outgoing_inflight: Dict[int, List] = field(default_factory=dict)  # Packet ID -> [packet, sent before]
+    incoming_qos2: Set[int] = field(default_factory=set)
+    dropped_count: int = 0
+
+    def allocate_packet_id(self) -> int:
+        while self.next_packet_id in self.outgoing_inflight:
+            self.next_packet_id = self.next_packet_id % 65535 + 1
+        packet_id = self.next_packet_id
+        self.next_packet_id = self.next_packet_id % 65535 + 1
+        return packet_id
+
+
+class LocalBroker:
+    """A minimal MQTT v5 broker implementing the DAP behaviour the benchmark exercises
+
+    The broker runs an asyncio event loop on its own thread, so all broker state is only
+    touched by that thread. It supports QoS 0-2, persistent sessions, subscription
+    identifiers and no local, but not retained messages, will messages, topic aliases,
+    shared subscriptions or authentication.
+
+    Purposes are handled per purpose management method:
+    - PM_0: A plain MQTT broker without any DAP processing
+    - PM_1: Purposes are part of the topics, so plain MQTT routing applies
+    - PM_2: The DAP-MP and DAP-SP user properties of each PUBLISH and SUBSCRIBE
+    - PM_3: Message purposes registered on the purpose management topic, DAP-SP on SUBSCRIBE
+    - PM_4: Message and subscription purposes registered on the MP and SP registration topics
+
+    For PM_2 to PM_4, operational requests published to $OSYS are answered by the broker
+    for the Informed operation and otherwise forwarded on ORS/<client> to every subscriber
+    that has received data from the requesting client.
+    """
+
+    def __init__(self, method: GlobalDefs.PurposeManagementMethod, port: int, address: str = LISTEN_ADDRESS):
+        """Initialize local broker
+
+        Parameters
+        ----------
+        method : PurposeManagementMethod
+            The purpose management method to implement
+        port : int
+            The port on which to listen
+        address : str, optional
+            The address on which to listen (default is localhost only)
+        """
+        self.method = method
+        self.port = port
+        self.address = address
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.broker_thread: Optional[threading.Thread] = None
+        self.started_event = threading.Event()
+        self.start_error: Optional[BaseException] = None
+
+        self.sessions: Dict[str, Session] = {}
+        self.message_purposes: Dict[Tuple[str, str], str] = {}       # (client, topic) -> registered message purpose
+        self.subscription_purposes: Dict[Tuple[str, str], str] = {}  # (client, topic filter) -> registered purpose filter
+        self.delivery_history: Dict[str, Set[str]] = {}              # Publishing client -> clients it delivered data to
+        self.next_assigned_id = 1
+
+        self.messages_received = 0
+        self.messages_sent = 0
+
+    def start(self):
+        """Start the broker on a background thread
+
+        Raises
+        ----------
+        OSError
+            If the port cannot be bound
+        """
+        self.broker_thread = threading.Thread(target=self._run, name="LocalBroker")
+        self.broker_thread.daemon = True
+        self.broker_thread.start()
+        self.started_event.wait()
+
+        if self.start_error is not None:
+            self.broker_thread.join()
+            self.broker_thread = None
+            raise self.start_error
+
+        console_log(ConsoleLogLevel.INFO, f"Local broker for {self.method.value} listening on {self.address}:{self.port}", __name__)
+
+    def shutdown(self):
+        """Stop the broker and close all connections"""
+        if self.loop is not None and self.broker_thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.broker_thread.join()
+            self.broker_thread = None
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.address, self.port))
+        except OSError as e:
+            self.start_error = e
+            self.started_event.set()
+            self.loop.close()
+            return
+
+        sys_task = self.loop.create_task(self._publish_sys_statistics())
+        self.started_event.set()
+        self.loop.run_forever()
+
+        # Close everything once stopped
+        sys_task.cancel()
+        self.server.close()
+        for session in self.sessions.values():
+            if session.writer is not None:
+                session.writer.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session: Optional[Session] = None
+        try:
+            while True:
+                header = await reader.readexactly(1)
+                remaining_length = await self._read_remaining_length(reader)
+                body = await reader.readexactly(remaining_length) if remaining_length > 0 else b""
+                packet_type = header[0] >> 4
+                flags = header[0] & 0x0F
+
+                # The first packet must be a CONNECT
+                if session is None:
+                    if packet_type != CONNECT:
+                        break
+                    session = self._handle_connect(body, writer)
+                    if session is None:
+                        break
+                    continue
+
+                # The session was taken over by a newer connection
+                if session.writer is not writer:
+                    break
+
+                if packet_type == PUBLISH:
+                    self._handle_publish(session, flags, body)
+                elif packet_type == PUBACK or packet_type == PUBCOMP:
+                    session.outgoing_inflight.pop(int.from_bytes(body[0:2], "big"), None)
+                elif packet_type == PUBREC:
+                    self._handle_pubrec(session, body)
+                elif packet_type == PUBREL:
+                    packet_id = int.from_bytes(body[0:2], "big")
+                    reason = SUCCESS if packet_id in session.incoming_qos2 else PACKET_ID_NOT_FOUND
+                    session.incoming_qos2.discard(packet_id)
+                    writer.write(_build_packet(PUBCOMP, 0, body[0:2] + bytes([reason])))
+                elif packet_type == SUBSCRIBE:
+                    self._handle_subscribe(session, body)
+                elif packet_type == UNSUBSCRIBE:
+                    self._handle_unsubscribe(session, body)
+                elif packet_type == PINGREQ:
+                    writer.write(_build_packet(PINGRESP, 0, b""))
+                elif packet_type == DISCONNECT:
+                    self._handle_disconnect(session, body)
+                    break
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            console_log(ConsoleLogLevel.ERROR, f"Closing connection after error: {e}", __name__)
+        finally:
+            if session is not None and session.writer is writer:
+                self._end_connection(session)
+            writer.close()
+
+    async def _read_remaining_length(self, reader: asyncio.StreamReader) -> int:
+        multiplier = 1
+        value = 0
+        while True:
+            encoded_byte = (await reader.readexactly(1))[0]
+            value += (encoded_byte & 0x7F) * multiplier
+            if encoded_byte & 0x80 == 0:
+                return value
+            multiplier *= 128
+
+    def _handle_connect(self, body: bytes, writer: asyncio.StreamWriter) -> Optional[Session]:
+        _, offset = _decode_string(body, 0)
+        protocol_version = body[offset]
+        connect_flags = body[offset + 1]
+        offset += 4  # Version, flags and keep alive
+
+        if protocol_version != MQTT_V5:
+            writer.write(_build_packet(CONNACK, 0, bytes([0, UNSUPPORTED_PROTOCOL_VERSION])))
+            return None
+
+        properties, offset = _decode_properties(PacketTypes.CONNECT, body, offset)
+        client_id, offset = _decode_string(body, offset)
+
+        # Will messages and credentials are parsed past but not used
+        if connect_flags & 0x04:
+            _, offset = _decode_properties(PacketTypes.WILLMESSAGE, body, offset)
+            _, offset = _decode_string(body, offset)
+            _, offset = _decode_binary(body, offset)
+
+        connack_properties = Properties(PacketTypes.CONNACK)
+        connack_properties.RetainAvailable = 0
+        connack_properties.SharedSubscriptionAvailable = 0
+        connack_properties.TopicAliasMaximum = 0
+        if not client_id:
+            client_id = f"local-broker-client-{self.next_assigned_id}"
+            self.next_assigned_id += 1
+            connack_properties.AssignedClientIdentifier = client_id
+
+        # Resume the previous session unless asked for a clean start
+        clean_start = bool(connect_flags & 0x02)
+        session = self.sessions.get(client_id)
+        if session is not None and session.writer is not None:
+            session.writer.write(_build_packet(DISCONNECT, 0, bytes([SESSION_TAKEN_OVER, 0])))
+            session.writer.close()
+            session.writer = None
+        session_present = session is not None and not clean_start
+        if not session_present:
+            session = Session(client_id=client_id)
+            self.sessions[client_id] = session
+
+        session.expiry_interval = getattr(properties, "SessionExpiryInterval", 0)
+        session.writer = writer
+
+        writer.write(_build_packet(CONNACK, 0, bytes([1 if session_present else 0, SUCCESS]) + connack_properties.pack()))
+
+        # Send anything queued or unacknowledged while the client was away
+        for entry in session.outgoing_inflight.values():
+            packet = entry[0]
+            if entry[1] and packet[0] >> 4 == PUBLISH:
+                packet = bytes([packet[0] | 0x08]) + packet[1:]
+            writer.write(packet)
+            entry[1] = True
+
+        return session
+
+    def _handle_disconnect(self, session: Session, body: bytes):
+        # The client may change the session expiry when disconnecting
+        if len(body) > 1:
+            properties, _ = _decode_properties(PacketTypes.DISCONNECT, body, 1)
+            if hasattr(properties, "SessionExpiryInterval"):
+                session.expiry_interval = properties.SessionExpiryInterval
+
+    def _end_connection(self, session: Session):
+        session.writer = None
+
+        # Sessions without an expiry interval end with the connection
+        if session.expiry_interval == 0:
+            self.sessions.pop(session.client_id, None)
+
+    def _handle_pubrec(self, session: Session, body: bytes):
+        packet_id = int.from_bytes(body[0:2], "big")
+        pubrel = _build_packet(PUBREL, 0x02, body[0:2] + bytes([SUCCESS if packet_id in session.outgoing_inflight else PACKET_ID_NOT_FOUND]))
+        if packet_id in session.outgoing_inflight:
+            session.outgoing_inflight[packet_id] = [pubrel, True]
+        if session.writer is not None:
+            session.writer.write(pubrel)
+
+    def _handle_publish(self, session: Session, flags: int, body: bytes):
+        qos = (flags >> 1) & 0x03
+        topic, offset = _decode_string(body, 0)
+        packet_id = 0
+        if qos > 0:
+            packet_id = int.from_bytes(body[offset:offset + 2], "big")
+            offset += 2
+        properties, offset = _decode_properties(PacketTypes.PUBLISH, body, offset)
+        payload = body[offset:]
+
+        # Acknowledge first, a repeated QoS 2 packet ID is acknowledged but not routed again
+        duplicate = False
+        if qos == 1:
+            session.writer.write(_build_packet(PUBACK, 0, packet_id.to_bytes(2, "big") + bytes([SUCCESS])))
+        elif qos == 2:
+            duplicate = packet_id in session.incoming_qos2
+            session.incoming_qos2.add(packet_id)
+            session.writer.write(_build_packet(PUBREC, 0, packet_id.to_bytes(2, "big") + bytes([SUCCESS])))
+        if duplicate:
+            return
+
+        self.messages_received += 1
+
+        if self.method != GlobalDefs.PurposeManagementMethod.PM_0:
+            if self._handle_registration(session, topic, properties):
+                return
+            if self.method != GlobalDefs.PurposeManagementMethod.PM_1 and topic == GlobalDefs.OSYS_TOPIC:
+                self._handle_operation_request(session, qos, properties, payload)
+                return
+
+        # Find the purpose the message is sent for
+        message_purpose: Optional[str] = None
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_2:
+            message_purpose = _get_user_property(properties, GlobalDefs.PROPERTY_MP)
+        elif self.method == GlobalDefs.PurposeManagementMethod.PM_3 or self.method == GlobalDefs.PurposeManagementMethod.PM_4:
+            message_purpose = self.message_purposes.get((session.client_id, topic))
+
+        # Topic aliases are per connection and are not forwarded
+        if hasattr(properties, "TopicAlias"):
+            delattr(properties, "TopicAlias")
+
+        record_history = GlobalDefs.classify_publish_topic(topic) == GlobalDefs.TrafficClass.DATA
+        self._route(topic, payload, qos, properties, session.client_id, message_purpose, record_history)
+
+    def _handle_registration(self, session: Session, topic: str, properties: Properties) -> bool:
+        """Store a purpose registration, returning whether the message was one"""
+
+        # PM_3 registrations carry "<purpose>:<topic>" in the DAP-MP property
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_3 and GlobalDefs.REG_BY_MSG_REG_TOPIC and topic == GlobalDefs.REG_BY_MSG_REG_TOPIC:
+            registration = _get_user_property(properties, GlobalDefs.PROPERTY_MP)
+            if registration is not None and ':' in registration:
+                purpose, registered_topic = registration.split(':', 1)
+                self.message_purposes[(session.client_id, registered_topic)] = purpose
+            return True
+
+        # PM_4 registrations are encoded in the topic as <reg topic>/<topic>[<purpose>]
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_4:
+            for reg_topic, is_subscription in ((GlobalDefs.REG_BY_TOPIC_PUB_REG_TOPIC, False), (GlobalDefs.REG_BY_TOPIC_SUB_REG_TOPIC, True)):
+                if not reg_topic or not topic.startswith(f"{reg_topic}/"):
+                    continue
+
+                registration = topic[len(reg_topic) + 1:]
+                purpose_start = registration.rfind('[')
+                if purpose_start > 0 and registration.endswith(']'):
+                    registered_topic = registration[:purpose_start]
+                    purpose = registration[purpose_start + 1:-1]
+                    if is_subscription:
+                        registered_topic = registered_topic.replace("HASH", "#").replace("PLUS", "+")
+                        self.subscription_purposes[(session.client_id, registered_topic)] = purpose
+                    else:
+                        self.message_purposes[(session.client_id, registered_topic)] = purpose
+                return True
+
+        return False
+
+    def _handle_operation_request(self, session: Session, qos: int, properties: Properties, payload: bytes):
+        operation = _get_user_property(properties, GlobalDefs.PROPERTY_OPERATION)
+        if operation is None:
+            return
+
+        # The broker knows the purposes of its own records, so it answers these itself
+        if operation in BROKER_ANSWERED_OPERATIONS:
+            response_topic = getattr(properties, "ResponseTopic", None)
+            if response_topic:
+                response_properties = Properties(PacketTypes.PUBLISH)
+                response_properties.UserProperty = (GlobalDefs.PROPERTY_OPERATION, operation)
+                response_properties.UserProperty = (GlobalDefs.PROPERTY_OP_STATUS, "Success")
+                response_properties.UserProperty = (GlobalDefs.PROPERTY_ID, BROKER_CLIENT_ID)
+                if hasattr(properties, "CorrelationData"):
+                    response_properties.CorrelationData = properties.CorrelationData
+                self._route(response_topic, b"", qos, response_properties, BROKER_CLIENT_ID, GlobalDefs.OP_PURPOSE, False)
+            return
+
+        # Forward the request to every subscriber that received data from the requester
+        if _get_user_property(properties, GlobalDefs.PROPERTY_ID) is None:
+            properties.UserProperty = (GlobalDefs.PROPERTY_ID, session.client_id)
+        for subscriber_id in sorted(self.delivery_history.get(session.client_id, ())):
+            self._route(f"{GlobalDefs.ORS_TOPIC}/{subscriber_id}", payload, qos, properties, BROKER_CLIENT_ID, GlobalDefs.OP_PURPOSE, False)
+
+    def _handle_subscribe(self, session: Session, body: bytes):
+        packet_id = body[0:2]
+        properties, offset = _decode_properties(PacketTypes.SUBSCRIBE, body, 2)
+        subscription_ids = getattr(properties, "SubscriptionIdentifier", [])
+        subscription_id = subscription_ids[0] if subscription_ids else None
+
+        # The subscription purpose is declared on the SUBSCRIBE for PM_2 and PM_3
+        purpose_filter: Optional[str] = None
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_2 or self.method == GlobalDefs.PurposeManagementMethod.PM_3:
+            purpose_filter = _get_user_property(properties, GlobalDefs.PROPERTY_SP)
+
+        reason_codes = bytearray()
+        while offset < len(body):
+            topic_filter, offset = _decode_string(body, offset)
+            options = body[offset]
+            offset += 1
+
+            if not _valid_topic_filter(topic_filter):
+                reason_codes.append(TOPIC_FILTER_INVALID)
+                continue
+
+            qos = min(options & 0x03, 2)
+            session.subscriptions[topic_filter] = Subscription(
+                topic_filter=topic_filter,
+                qos=qos,
+                no_local=bool(options & 0x04),
+                subscription_id=subscription_id,
+                purpose_filter=purpose_filter
+            )
+            reason_codes.append(qos)
+
+        session.writer.write(_build_packet(SUBACK, 0, packet_id + b"\x00" + bytes(reason_codes)))
+
+    def _handle_unsubscribe(self, session: Session, body: bytes):
+        packet_id = body[0:2]
+        _, offset = _decode_properties(PacketTypes.UNSUBSCRIBE, body, 2)
+
+        reason_codes = bytearray()
+        while offset < len(body):
+            topic_filter, offset = _decode_string(body, offset)
+            if session.subscriptions.pop(topic_filter, None) is not None:
+                reason_codes.append(SUCCESS)
+            else:
+                reason_codes.append(NO_SUBSCRIPTION_EXISTED)
+
+        session.writer.write(_build_packet(UNSUBACK, 0, packet_id + b"\x00" + bytes(reason_codes)))
+
+    def _route(self, topic: str, payload: bytes, qos: int, properties: Properties, sender_id: str,
+               message_purpose: Optional[str], record_history: bool):
+        """Deliver a message to every session with a matching, permitted subscription"""
+
+        # The properties are packed once and only the subscription identifiers differ per client
+        packed_properties = properties.pack()
+        _, length_size = VariableByteIntegers.decode(packed_properties)
+        shared_properties = packed_properties[length_size:]
+        encoded_topic = _encode_string(topic)
+
+        for session in list(self.sessions.values()):
+            # A connection can be lost before its reader notices
+            if session.writer is not None and session.writer.is_closing():
+                self._end_connection(session)
+                if session.client_id not in self.sessions:
+                    continue
+
+            matched: List[Subscription] = []
+            for subscription in session.subscriptions.values():
+                if subscription.no_local and session.client_id == sender_id:
+                    continue
+                if not topic_matches_sub(subscription.topic_filter, topic):
+                    continue
+
+                subscription_purpose = subscription.purpose_filter
+                if self.method == GlobalDefs.PurposeManagementMethod.PM_4:
+                    subscription_purpose = self.subscription_purposes.get((session.client_id, subscription.topic_filter))
+                if not GlobalDefs.purpose_allowed(message_purpose, subscription_purpose):
+                    continue
+
+                matched.append(subscription)
+
+            if not matched:
+                continue
+
+            delivery_qos = min(qos, max(subscription.qos for subscription in matched))
+            client_properties = shared_properties
+            for subscription in matched:
+                if subscription.subscription_id is not None:
+                    client_properties += bytes([SUBSCRIPTION_IDENTIFIER_PROPERTY]) + VariableByteIntegers.encode(subscription.subscription_id)
+
+            if self._deliver(session, encoded_topic, payload, delivery_qos, client_properties) and record_history:
+                self.delivery_history.setdefault(sender_id, set()).add(session.client_id)
+
+    def _deliver(self, session: Session, encoded_topic: bytes, payload: bytes, qos: int, properties: bytes) -> bool:
+        """Send a PUBLISH to a session, or queue it if the client is away, returning whether it was accepted"""
+        if qos == 0:
+            # QoS 0 messages are not queued for clients that are away
+            if session.writer is None:
+                return False
+            variable_header = encoded_topic
+        else:
+            if session.writer is None and len(session.outgoing_inflight) >= MAX_QUEUED_MESSAGES:
+                session.dropped_count += 1
+                return False
+            packet_id = session.allocate_packet_id()
+            variable_header = encoded_topic + packet_id.to_bytes(2, "big")
+
+        packet = _build_packet(PUBLISH, qos << 1, variable_header + VariableByteIntegers.encode(len(properties)) + properties + payload)
+        if qos > 0:
+            session.outgoing_inflight[packet_id] = [packet, session.writer is not None]
+        if session.writer is not None:
+            session.writer.write(packet)
+            self.messages_sent += 1
+        return True
+
+    async def _publish_sys_statistics(self):
+        """Publish broker statistics on $SYS like Mosquitto does"""
+        while True:
+            await asyncio.sleep(SYS_INTERVAL_S)
+
+            statistics = {
+                "$SYS/broker/clients/connected": sum(1 for session in self.sessions.values() if session.writer is not None),
+                "$SYS/broker/messages/received": self.messages_received,
+                "$SYS/broker/messages/sent": self.messages_sent,
+                "$SYS/broker/subscriptions/count": sum(len(session.subscriptions) for session in self.sessions.values()),
+                "$SYS/broker/store/messages/count": sum(len(session.outgoing_inflight) for session in self.sessions.values()),
+            }
+            for topic, value in statistics.items():
+                self._route(topic, str(value).encode("utf-8"), 0, Properties(PacketTypes.PUBLISH), BROKER_CLIENT_ID, None, False)
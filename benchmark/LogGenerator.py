@@ -0,0 +1,582 @@
+import heapq
+import itertools
+import json
+import random
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from paho.mqtt.client import topic_matches_sub
+
+import GlobalDefs
+from ConfigParser import BenchmarkConfiguration, TestConfiguration
+from LocalBroker import BROKER_ANSWERED_OPERATIONS, BROKER_CLIENT_ID
+from LoggingModule import ResultLogger, console_log, ConsoleLogLevel, get_timestamp_ns
+
+# The executor waits this long after a test before disconnecting, and again before the next test
+TEARDOWN_MS: int = 2000
+
+# The executor loop notices a due publication up to this late
+LOOP_JITTER_NS: int = 1_000_000
+
+
+def _encode_purpose_topic(topic: str, purpose: str) -> str:
+    """Get the topic PM1 encodes a purpose in"""
+    return f"{topic}/[{purpose.replace('/', '|')}]"
+
+
+@dataclass
+class GeneratorSettings:
+    """Tunable parameters of a synthetic log"""
+    seed: int = 0
+    device_scale: float = 1.0  # Multiplies the count of every device instance entry
+    rate_scale: float = 1.0  # Divides every publication period
+    duration_ms: Optional[int] = None  # Overrides the test duration
+    op_send_rate_ms: Optional[int] = None  # Overrides the operational request period, 0 disables requests
+    purpose_change_ms: int = 0  # Period of extra purpose changes on top of the scheduled ones, 0 disables them
+    purpose_change_fraction: float = 0.5  # Share of devices given a new purpose on each extra change
+    latency_ms: float = 2.0  # Average delivery latency, each delivery takes 50-150% of it
+    loss: float = 0.0  # Probability that an allowed delivery is dropped
+    duplicate: float = 0.0  # Probability that a delivered message is delivered twice
+    false_accept: float = 0.0  # Probability that a delivery the purposes do not allow is made anyway
+    op_leakage: float = 0.0  # Probability that an operational request reaches an irrelevant subscriber
+
+
+@dataclass
+class SubscriberTruth:
+    """What was delivered to one subscriber"""
+    expected: int = 0  # Deliveries the purposes allowed while subscribed, including lost ones
+    received: int = 0  # RECV records, including duplicates and false accepts
+    lost: int = 0
+    duplicates: int = 0
+    false_accepts: int = 0
+    false_accept_rate: float = 0.0
+    false_reject_rate: float = 0.0
+
+
+@dataclass
+class OperationTruth:
+    """What happened to the requests of one operation type"""
+    category: str = ""
+    requests: int = 0
+    relevant_recipients: int = 0  # Subscribers that had received data from the requester
+    irrelevant_recipients: int = 0
+    responses: int = 0
+    broker_responses: int = 0
+
+
+@dataclass
+class SimDevice:
+    """State of one simulated device instance"""
+    client_id: str
+    instance_id: str
+    device_def_id: str
+    is_publisher: bool
+    topic: str  # Publication topic or subscription topic filter
+    pub_period_ns: int
+    min_payload_bytes: int
+    max_payload_bytes: int
+    purpose_filter: str
+    connected: bool = False
+    has_session: bool = False
+    publishing: bool = False
+    publish_generation: int = 0
+    message_count: int = 0
+    data_subscriptions: List[Tuple[int, str]] = field(default_factory=list)  # (subscription identifier, purpose filter routed on)
+    op_subscriptions: Dict[str, int] = field(default_factory=dict)  # Topic -> subscription identifier
+    pending_deliveries: Dict[int, list] = field(default_factory=dict)  # Deliveries in flight to this device
+
+
+class _LineWriter:
+    """Stands in for the ResultLogger queue to write log lines straight to a file"""
+
+    def __init__(self, file_handle):
+        self.file_handle = file_handle
+        self.line_count = 0
+
+    def put(self, message):
+        self.file_handle.write(message + '\n')
+        self.line_count += 1
+
+
+class LogGenerator:
+    """Writes the log a benchmark run of a configuration would produce against an ideal broker
+
+    Instead of running clients, the generator replays the scheduled events, publication periods
+    and operational requests of each test in simulated time and writes the records through the
+    ResultLogger, so the log is read by the analyzer exactly like a real one. Deliveries follow the
+    purpose management method of the configuration: PM0 ignores purposes, PM1 encodes them in
+    topics and PM2-PM4 filter on them, with operational requests forwarded as by the local broker.
+    Faults are injected at the configured rates and everything that was delivered, lost or leaked
+    is returned as ground truth to check the analyzer against.
+
+    Persistent sessions are not replayed, so nothing is delivered to a disconnected subscriber.
+    """
+
+    def __init__(self, benchmark_config: BenchmarkConfiguration, settings: GeneratorSettings):
+        self.benchmark_config = benchmark_config
+        self.method = benchmark_config.method
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+
+        self.logger = ResultLogger()
+        self.my_id = benchmark_config.this_node_name
+
+        # Subscription identifiers are counted per process across tests, as by the client interface
+        self.next_sub_id = 1
+
+        # Simulation state of the current test
+        self.actions: List[list] = []
+        self.action_counter = itertools.count()
+        self.running = False
+        self.test_config: Optional[TestConfiguration] = None
+        self.devices: List[SimDevice] = []
+        self.subscribers: List[SimDevice] = []
+        self.delivery_history: Dict[str, set] = {}
+        self.topic_matches: Dict[Tuple[str, str], bool] = {}
+
+        # Ground truth over all tests
+        self.publish_count = 0
+        self.publish_record_count = 0
+        self.subscriber_truth: Dict[str, SubscriberTruth] = {}
+        self.operation_truth: Dict[str, OperationTruth] = {}
+
+    def generate(self, log_path: str) -> Dict[str, Any]:
+        """Write the log of every test in the configuration
+
+        Parameters
+        ----------
+        log_path : str
+            The path of the log to write, which must not exist
+
+        Returns
+        ----------
+        dict
+            The ground truth of the log
+        """
+        path = Path(log_path)
+        if path.exists():
+            raise FileExistsError(f"Log file {log_path} already exists")
+        path.parent.mkdir(exist_ok=True, parents=True)
+
+        with open(path, 'w') as file_handle:
+            writer = _LineWriter(file_handle)
+            self.logger.log_queue = writer
+            self.logger.log_clock_anchor()
+            self.logger.log_seed(self.settings.seed)
+
+            start_ns = get_timestamp_ns()
+            for test_config in self.benchmark_config.test_list:
+                console_log(ConsoleLogLevel.INFO, f"Generating test: {test_config.name}", __name__)
+                start_ns = self._generate_test(test_config, start_ns) + TEARDOWN_MS * 1_000_000
+
+        return self._build_truth(log_path, writer.line_count)
+
+    def write_truth(self, truth: Dict[str, Any], truth_path: str):
+        with open(truth_path, 'w') as f:
+            json.dump(truth, f, indent=2)
+
+    ###################################
+    #   SIMULATION
+    ###################################
+    def _generate_test(self, test_config: TestConfiguration, start_ns: int) -> int:
+        """Simulate one test from its start time and return the time its last record was written"""
+        self.test_config = test_config
+        self.devices = self._create_devices(test_config)
+        self.subscribers = [device for device in self.devices if not device.is_publisher]
+        self.delivery_history = {}
+        self.actions = []
+        self.running = True
+
+        self.logger.log_pm_method(self.method.value)
+
+        duration_ms = self.settings.duration_ms if self.settings.duration_ms is not None else test_config.test_duration_ms
+        end_ns = start_ns + int(duration_ms * 1_000_000)
+
+        # Scheduled events run before anything else due at the same time, as in the executor loop
+        for event in test_config.scheduled_events:
+            self._schedule(start_ns + int(event['time_ms'] * 1_000_000), self._handle_event, event)
+
+        if self.settings.purpose_change_ms > 0:
+            change_ns = start_ns + int(self.settings.purpose_change_ms * 1_000_000)
+            while change_ns < end_ns:
+                self._schedule(change_ns, self._handle_random_purpose_changes)
+                change_ns += int(self.settings.purpose_change_ms * 1_000_000)
+
+        op_send_rate_ms = self.settings.op_send_rate_ms if self.settings.op_send_rate_ms is not None else test_config.op_send_rate
+        if op_send_rate_ms > 0 and test_config.all_operations:
+            self._schedule(start_ns + int(op_send_rate_ms * 1_000_000), self._send_operational_requests, int(op_send_rate_ms * 1_000_000))
+
+        self._schedule(end_ns, self._end_test)
+
+        last_ns = start_ns
+        while self.actions:
+            action = heapq.heappop(self.actions)
+            if action[4]:
+                continue
+            action[4] = True
+            last_ns = action[0]
+            action[2](action[0], *action[3])
+
+        return last_ns
+
+    def _create_devices(self, test_config: TestConfiguration) -> List[SimDevice]:
+        devices = []
+        for instance_config in test_config.device_instances_config:
+            device_def = test_config.device_definitions[instance_config['device_def_id']]
+            count = max(1, round(instance_config.get('count', 1) * self.settings.device_scale))
+
+            for i in range(count):
+                instance_id = f"{instance_config['instance_id']}_{i}" if count > 1 else instance_config['instance_id']
+                is_publisher = device_def['type'] == 'publisher'
+                devices.append(SimDevice(
+                    client_id=instance_id,
+                    instance_id=instance_id,
+                    device_def_id=instance_config['device_def_id'],
+                    is_publisher=is_publisher,
+                    topic=device_def['topic'] if is_publisher else device_def['topic_filter'],
+                    pub_period_ns=int(device_def['pub_period_ms'] * 1_000_000 / self.settings.rate_scale) if is_publisher else 0,
+                    min_payload_bytes=device_def.get('min_payload_bytes', 0),
+                    max_payload_bytes=device_def.get('max_payload_bytes', 0),
+                    purpose_filter=instance_config['purpose_filter']
+                ))
+        return devices
+
+    def _schedule(self, time_ns: int, callback: Callable, *args) -> list:
+        action = [time_ns, next(self.action_counter), callback, args, False]
+        heapq.heappush(self.actions, action)
+        return action
+
+    def _next_publish_ns(self, now_ns: int, device: SimDevice) -> int:
+        return now_ns + device.pub_period_ns + self.random.randrange(LOOP_JITTER_NS)
+
+    def _latency_ns(self) -> int:
+        return int(self.settings.latency_ms * 1_000_000 * self.random.uniform(0.5, 1.5))
+
+    def _find_devices(self, device_ids: List[str]) -> List[SimDevice]:
+        """Get the devices created from the given instance ids, as the device manager does"""
+        found = []
+        for device_id in device_ids:
+            found += [device for device in self.devices if re.search(f"^{device_id}(_\\d+)?$", device.instance_id) is not None]
+        return found
+
+    def _handle_event(self, now_ns: int, event: Dict):
+        if not self.running:
+            return
+
+        event_type = event['type']
+        if event_type == "connect_all":
+            for device in self.devices:
+                self._connect_device(now_ns, device, True)
+        elif event_type == "disconnect_all":
+            for device in self.devices:
+                self._disconnect_device(now_ns, device)
+        elif event_type == "connect" or event_type == "reconnect":
+            for device in self._find_devices(event.get('devices', [])):
+                self._connect_device(now_ns, device, event_type == "connect")
+        elif event_type == "disconnect":
+            for device in self._find_devices(event.get('devices', [])):
+                self._disconnect_device(now_ns, device)
+        elif event_type == "start_publishing" or event_type == "start_publishing_all":
+            devices = self.devices if event_type == "start_publishing_all" else self._find_devices(event.get('devices', []))
+            for device in devices:
+                if device.is_publisher and not device.publishing:
+                    device.publishing = True
+                    device.publish_generation += 1
+                    self._schedule(self._next_publish_ns(now_ns, device), self._publish_from_device, device, device.publish_generation)
+        elif event_type == "stop_publishing" or event_type == "stop_publishing_all":
+            devices = self.devices if event_type == "stop_publishing_all" else self._find_devices(event.get('devices', []))
+            for device in devices:
+                device.publishing = False
+        elif event_type == "change_purpose":
+            for device in self._find_devices(event.get('devices', [])):
+                self._change_purpose(now_ns, device, event['new_purpose'])
+
+    def _handle_random_purpose_changes(self, now_ns: int):
+        if not self.running:
+            return
+
+        purposes = list(self.test_config.purpose_definitions.keys())
+        if not purposes:
+            purposes = sorted({device.purpose_filter for device in self.devices})
+
+        change_count = round(len(self.devices) * self.settings.purpose_change_fraction)
+        for device in self.random.sample(self.devices, change_count):
+            candidates = [purpose for purpose in purposes if purpose != device.purpose_filter] or purposes
+            self._change_purpose(now_ns, device, self.random.choice(candidates))
+
+    def _end_test(self, now_ns: int):
+        self.running = False
+        self._schedule(now_ns + TEARDOWN_MS * 1_000_000, self._disconnect_all_devices)
+
+    def _disconnect_all_devices(self, now_ns: int):
+        for device in self.devices:
+            self._disconnect_device(now_ns, device)
+
+    def _connect_device(self, now_ns: int, device: SimDevice, clean_start: bool):
+        if device.connected:
+            return
+
+        session_present = not clean_start and device.has_session
+        device.connected = True
+        device.has_session = True
+
+        # Everything else happens once the CONNACK arrives
+        self._schedule(now_ns + self._latency_ns(), self._on_connect, device, clean_start, session_present)
+
+    def _on_connect(self, now_ns: int, device: SimDevice, clean_start: bool, session_present: bool):
+        if not device.connected:
+            return
+
+        self.logger.log_connect(now_ns, self.my_id, device.client_id, clean_start, session_present)
+
+        if device.is_publisher:
+            op_topics = [GlobalDefs.ON_TOPIC, f"{GlobalDefs.ONP_TOPIC}/{device.client_id}"]
+        else:
+            self._subscribe_device(now_ns, device, False)
+            op_topics = [GlobalDefs.OR_TOPIC, f"{GlobalDefs.ORS_TOPIC}/{device.client_id}"]
+        op_topics.append(f"{GlobalDefs.OP_RESPONSE_TOPIC}/{device.client_id}")
+
+        device.op_subscriptions = {}
+        for topic in op_topics:
+            device.op_subscriptions[topic] = self._new_sub_id()
+            self.logger.log_op_subscribe(now_ns, self.my_id, device.client_id, topic, GlobalDefs.OP_PURPOSE, device.op_subscriptions[topic])
+
+        # Subscribers register their C1 data with an enhanced broker
+        if not device.is_publisher and self.method not in (GlobalDefs.PurposeManagementMethod.PM_0, GlobalDefs.PurposeManagementMethod.PM_1):
+            for operation in self.test_config.c1_reg_operations:
+                corr_data = device.message_count
+                device.message_count += 1
+                self.logger.log_operation_publish(now_ns, self.my_id, device.client_id, corr_data, GlobalDefs.OSYS_TOPIC, GlobalDefs.OP_PURPOSE,
+                                                  operation, self.test_config.all_operations.get(operation, "UNKNOWN"))
+
+    def _disconnect_device(self, now_ns: int, device: SimDevice):
+        if not device.connected:
+            return
+
+        self._flush_deliveries(now_ns, device)
+        device.connected = False
+        device.data_subscriptions = []
+        device.op_subscriptions = {}
+        self.logger.log_disconnect(now_ns, self.my_id, device.client_id)
+
+    def _new_sub_id(self) -> int:
+        sub_id = self.next_sub_id
+        self.next_sub_id += 1
+        return sub_id
+
+    def _subscribe_device(self, now_ns: int, device: SimDevice, existing_subscription: bool):
+        """Subscribe to the device's topic filter with its current purpose filter"""
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_1:
+            # One subscription per described purpose, replacing the old ones
+            device.data_subscriptions = [(self._new_sub_id(), purpose) for purpose in GlobalDefs.compile_purpose_filter(device.purpose_filter).described_purposes]
+        elif self.method == GlobalDefs.PurposeManagementMethod.PM_4 and existing_subscription and device.data_subscriptions:
+            # Only the purpose registration changes, so the subscription keeps its identifier
+            device.data_subscriptions = [(device.data_subscriptions[0][0], device.purpose_filter)]
+        else:
+            device.data_subscriptions = [(self._new_sub_id(), device.purpose_filter)]
+
+        for sub_id, _ in device.data_subscriptions:
+            self.logger.log_subscribe(now_ns, self.my_id, device.client_id, device.topic, device.purpose_filter, sub_id)
+
+    def _change_purpose(self, now_ns: int, device: SimDevice, new_purpose: str):
+        old_purpose = device.purpose_filter
+        device.purpose_filter = new_purpose
+        self.logger.log_purpose_change(now_ns, self.my_id, device.client_id, device.device_def_id, old_purpose, new_purpose)
+
+        # Messages in flight were routed on the old subscription, so they arrive before it ends
+        if not device.is_publisher and device.connected:
+            self._flush_deliveries(now_ns, device)
+            self._subscribe_device(now_ns, device, True)
+
+    def _flush_deliveries(self, now_ns: int, device: SimDevice):
+        """Complete every delivery in flight to a device just before its subscriptions change"""
+        for action in sorted(device.pending_deliveries.values()):
+            if not action[4]:
+                action[4] = True
+                action[2](now_ns - 1, *action[3])
+        device.pending_deliveries.clear()
+
+    def _schedule_delivery(self, time_ns: int, device: SimDevice, callback: Callable, *args):
+        key = next(self.action_counter)
+        device.pending_deliveries[key] = self._schedule(time_ns, callback, device, key, *args)
+
+    def _topic_matches(self, topic_filter: str, topic: str) -> bool:
+        matched = self.topic_matches.get((topic_filter, topic))
+        if matched is None:
+            matched = topic_matches_sub(topic_filter, topic)
+            self.topic_matches[(topic_filter, topic)] = matched
+        return matched
+
+    def _publish_from_device(self, now_ns: int, device: SimDevice, generation: int):
+        if not self.running or not device.publishing or generation != device.publish_generation:
+            return
+
+        # Publishing resumes on the same period once the device reconnects
+        self._schedule(self._next_publish_ns(now_ns, device), self._publish_from_device, device, generation)
+        if not device.connected:
+            return
+
+        corr_data = device.message_count
+        device.message_count += 1
+        payload_size = self.random.randint(device.min_payload_bytes, device.max_payload_bytes)
+        self.publish_count += 1
+
+        # PM1 publishes once per described purpose on purpose-encoding topics
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_1:
+            records = [(_encode_purpose_topic(device.topic, purpose), purpose) for purpose in GlobalDefs.compile_purpose_filter(device.purpose_filter).described_purposes]
+        else:
+            records = [(device.topic, device.purpose_filter)]
+
+        for topic, purpose in records:
+            self.logger.log_publish(now_ns, self.my_id, device.client_id, corr_data, device.topic, device.purpose_filter, "DATA", payload_size)
+            self.publish_record_count += 1
+
+            for subscriber in self.subscribers:
+                if subscriber.connected and subscriber.data_subscriptions and self._topic_matches(subscriber.topic, device.topic):
+                    self._route(now_ns, device, subscriber, topic, purpose, corr_data, payload_size)
+
+    def _route(self, now_ns: int, publisher: SimDevice, subscriber: SimDevice, topic: str, purpose: str, corr_data: int, payload_size: int):
+        """Decide whether and how one published record reaches a subscriber"""
+        truth = self.subscriber_truth.setdefault(subscriber.client_id, SubscriberTruth())
+        allowed = GlobalDefs.compile_purpose_filter(purpose).intersects(GlobalDefs.compile_purpose_filter(subscriber.purpose_filter))
+
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_0:
+            # Purposes are not managed, so everything on a matching topic is delivered
+            sub_id = subscriber.data_subscriptions[0][0]
+            delivered = True
+        elif self.method == GlobalDefs.PurposeManagementMethod.PM_1:
+            sub_ids = [sub_id for sub_id, sub_purpose in subscriber.data_subscriptions if sub_purpose == purpose]
+            sub_id = sub_ids[0] if sub_ids else subscriber.data_subscriptions[0][0]
+            delivered = bool(sub_ids)
+        else:
+            sub_id = subscriber.data_subscriptions[0][0]
+            delivered = allowed
+
+        if allowed:
+            truth.expected += 1
+            self.delivery_history.setdefault(publisher.client_id, set()).add(subscriber.client_id)
+            if self.random.random() < self.settings.loss:
+                truth.lost += 1
+                return
+        elif not delivered and self.random.random() < self.settings.false_accept:
+            delivered = True
+
+        if not delivered:
+            return
+
+        if not allowed:
+            truth.false_accepts += 1
+
+        recv_ns = now_ns + self._latency_ns()
+        self._schedule_delivery(recv_ns, subscriber, self._on_message_recv, publisher.client_id, corr_data, topic, sub_id, payload_size)
+        if self.random.random() < self.settings.duplicate:
+            truth.duplicates += 1
+            self._schedule_delivery(recv_ns + self._latency_ns(), subscriber, self._on_message_recv, publisher.client_id, corr_data, topic, sub_id, payload_size)
+
+    def _on_message_recv(self, now_ns: int, subscriber: SimDevice, key: int, sending_client_id: str, corr_data: int, topic: str, sub_id: int, payload_size: int):
+        subscriber.pending_deliveries.pop(key, None)
+        self.subscriber_truth[subscriber.client_id].received += 1
+        self.logger.log_recv(now_ns, self.my_id, subscriber.client_id, sending_client_id, corr_data, topic, "DATA", sub_id, payload_size)
+
+    def _send_operational_requests(self, now_ns: int, period_ns: int):
+        if not self.running:
+            return
+        self._schedule(now_ns + period_ns, self._send_operational_requests, period_ns)
+
+        publishers = [device for device in self.devices if device.is_publisher and device.connected]
+        if not publishers:
+            return
+
+        for operation, category in self.test_config.all_operations.items():
+            self._send_operational_request(now_ns, self.random.choice(publishers), operation, category)
+
+    def _send_operational_request(self, now_ns: int, publisher: SimDevice, operation: str, category: str):
+        truth = self.operation_truth.setdefault(operation, OperationTruth(category=category))
+        truth.requests += 1
+
+        corr_data = publisher.message_count
+        publisher.message_count += 1
+        request_topic = GlobalDefs.OR_TOPIC if self.method == GlobalDefs.PurposeManagementMethod.PM_1 else GlobalDefs.OSYS_TOPIC
+        self.logger.log_operation_publish(now_ns, self.my_id, publisher.client_id, corr_data, request_topic, GlobalDefs.OP_PURPOSE, operation, category)
+
+        # Without purpose management nobody subscribes to the system topic
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_0:
+            return
+
+        # The broker answers the operations it holds the records for
+        if self.method != GlobalDefs.PurposeManagementMethod.PM_1 and operation in BROKER_ANSWERED_OPERATIONS:
+            truth.broker_responses += 1
+            self._schedule(now_ns + self._latency_ns(), self._on_operation_response_recv, publisher, BROKER_CLIENT_ID, operation, category, corr_data)
+            return
+
+        relevant = self.delivery_history.get(publisher.client_id, set())
+        for subscriber in self.subscribers:
+            if not subscriber.connected:
+                continue
+
+            if self.method == GlobalDefs.PurposeManagementMethod.PM_1:
+                # Requests are broadcast to every subscriber on the request topic
+                topic = _encode_purpose_topic(GlobalDefs.OR_TOPIC, GlobalDefs.OP_PURPOSE)
+                sub_id = subscriber.op_subscriptions[GlobalDefs.OR_TOPIC]
+            elif subscriber.client_id in relevant or self.random.random() < self.settings.op_leakage:
+                topic = f"{GlobalDefs.ORS_TOPIC}/{subscriber.client_id}"
+                sub_id = subscriber.op_subscriptions[topic]
+            else:
+                continue
+
+            if subscriber.client_id in relevant:
+                truth.relevant_recipients += 1
+            else:
+                truth.irrelevant_recipients += 1
+            self._schedule(now_ns + self._latency_ns(), self._on_operation_recv, subscriber, publisher, topic, sub_id, operation, category, corr_data)
+
+    def _on_operation_recv(self, now_ns: int, subscriber: SimDevice, publisher: SimDevice, topic: str, sub_id: int, operation: str, category: str, corr_data: int):
+        if not subscriber.connected:
+            return
+
+        self.logger.log_operation_recv(now_ns, self.my_id, subscriber.client_id, publisher.client_id, corr_data, topic, operation, category, "OP", sub_id)
+
+        # Respond right away on the response topic of the requester
+        response_topic = f"{GlobalDefs.OP_RESPONSE_TOPIC}/{publisher.client_id}"
+        self.logger.log_operation_response_publish(now_ns, self.my_id, subscriber.client_id, corr_data, response_topic, GlobalDefs.OP_PURPOSE, operation, category)
+        self.operation_truth[operation].responses += 1
+        self._schedule(now_ns + self._latency_ns(), self._on_operation_response_recv, publisher, subscriber.client_id, operation, category, corr_data)
+
+    def _on_operation_response_recv(self, now_ns: int, publisher: SimDevice, sending_client_id: str, operation: str, category: str, corr_data: int):
+        if not publisher.connected:
+            return
+
+        topic = f"{GlobalDefs.OP_RESPONSE_TOPIC}/{publisher.client_id}"
+        sub_id = publisher.op_subscriptions[topic]
+        if self.method == GlobalDefs.PurposeManagementMethod.PM_1:
+            topic = _encode_purpose_topic(topic, GlobalDefs.OP_PURPOSE)
+        self.logger.log_operation_response_recv(now_ns, self.my_id, publisher.client_id, sending_client_id, corr_data, topic, operation, category, "Success", sub_id)
+
+    ###################################
+    #   GROUND TRUTH
+    ###################################
+    def _build_truth(self, log_path: str, line_count: int) -> Dict[str, Any]:
+        totals = SubscriberTruth()
+        for truth in self.subscriber_truth.values():
+            truth.false_accept_rate = truth.false_accepts / truth.received if truth.received > 0 else 0.0
+            truth.false_reject_rate = truth.lost / truth.expected if truth.expected > 0 else 0.0
+            totals.expected += truth.expected
+            totals.received += truth.received
+            totals.lost += truth.lost
+            totals.duplicates += truth.duplicates
+            totals.false_accepts += truth.false_accepts
+        totals.false_accept_rate = totals.false_accepts / totals.received if totals.received > 0 else 0.0
+        totals.false_reject_rate = totals.lost / totals.expected if totals.expected > 0 else 0.0
+
+        return {
+            "log": log_path,
+            "pm_method": self.method.value,
+            "settings": asdict(self.settings),
+            "records": line_count,
+            "publishes": self.publish_count,
+            "publish_records": self.publish_record_count,
+            "totals": asdict(totals),
+            "subscribers": {client_id: asdict(truth) for client_id, truth in sorted(self.subscriber_truth.items())},
+            "operations": {operation: asdict(truth) for operation, truth in self.operation_truth.items()},
+        }
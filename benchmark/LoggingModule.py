@@ -1,12 +1,15 @@
 import threading
 import queue
 import sys
+import time
 from enum import Enum
 from pathlib import Path
 from typing import TextIO
 from GlobalDefs import ExitCode
 import GlobalDefs
+from LatencyHistogram import LatencyHistogram
 
+CLOCK_ANCHOR_LABEL: str = "CLOCK_ANCHOR"
 SEED_LABEL: str = "SET_SEED"
 PM_METHOD_LABEL: str = "SET_PURPOSE_MANAGEMENT_METHOD"
 CPU_METRICS_LABEL: str = "CPU_METRICS"
@@ -21,6 +24,12 @@ RECV_LABEL: str = "RECV"
 OP_RECV_LABEL: str = "RECV_OP"
 OP_RESP_PUBLISH_LABEL: str = "PUBLISH_OP_RESP"
 OP_RESP_RECV_LABEL: str = "RECV_OP_RESP"
+LATENCY_HISTOGRAM_LABEL: str = "LATENCY_HISTOGRAM"
+PURPOSE_CHANGE_LABEL: str = "PURPOSE_CHANGE"
+WIRE_BYTES_LABEL: str = "WIRE_BYTES"
+BROKER_SAMPLE_LABEL: str = "BROKER_SAMPLE"
+BROKER_SYS_LABEL: str = "BROKER_SYS"
+CALIBRATION_LABEL: str = "CALIBRATION"
 SEPARATOR: str = "@@"
 
 class ConsoleLogLevel(Enum):
@@ -35,6 +44,20 @@ def console_log(level: ConsoleLogLevel, message: str, component: str | None = No
             component = "General"
         print(f"[{level.value} : {component}] {message}")
 
+"""Returns the current value of the clock used for all result log timestamps
+
+The clock is the high-resolution performance counter in integer nanoseconds. It is
+monotonic, so it cannot be stepped by NTP, but its zero point is arbitrary. Each log
+therefore begins with a CLOCK_ANCHOR record pairing it with the wall clock.
+
+Returns
+----------
+int
+    The current performance counter value in nanoseconds
+"""
+def get_timestamp_ns() -> int:
+    return time.perf_counter_ns()
+
 class ResultLogger:
 
     running: bool = False
@@ -88,6 +111,9 @@ class ResultLogger:
             self.running = True
         except Exception:
             raise
+
+        # Anchor the monotonic log timestamps to the wall clock once per run
+        self.log_clock_anchor()
         
         return
 
@@ -133,6 +159,14 @@ class ResultLogger:
 
         return
     
+    def log_clock_anchor(self):
+        # Bracket the wall clock read so the anchor error is at most half the read time
+        before_ns = get_timestamp_ns()
+        wall_ns = time.time_ns()
+        after_ns = get_timestamp_ns()
+        message = f"{CLOCK_ANCHOR_LABEL}{SEPARATOR}{wall_ns}{SEPARATOR}{(before_ns + after_ns) // 2}"
+        self.log_queue.put(message)
+
     def log_seed(self, seed):
         message = f"{SEED_LABEL}{SEPARATOR}{seed}"
         self.log_queue.put(message)
@@ -145,18 +179,44 @@ class ResultLogger:
         message = f"{MEM_METRICS_LABEL}{SEPARATOR}{min}{SEPARATOR}{max}{SEPARATOR}{average}{SEPARATOR}{variance}"
         self.log_queue.put(message)
         
+    def log_broker_sample(self, timestamp, cpu_usage_percent, mem_usage_percent, cpu_active_seconds,
+                          mem_bytes, voluntary_ctx_switches, involuntary_ctx_switches, open_fds,
+                          net_rx_bytes_per_sec, net_tx_bytes_per_sec, tcp_retransmits,
+                          tcp_sockets_inuse, tcp_sockets_time_wait, sockets_used):
+        # Values the monitor could not determine are left empty
+        fields = [cpu_usage_percent, mem_usage_percent, cpu_active_seconds, mem_bytes,
+                  voluntary_ctx_switches, involuntary_ctx_switches, open_fds,
+                  net_rx_bytes_per_sec, net_tx_bytes_per_sec, tcp_retransmits,
+                  tcp_sockets_inuse, tcp_sockets_time_wait, sockets_used]
+        message = f"{BROKER_SAMPLE_LABEL}{SEPARATOR}{timestamp}"
+        for value in fields:
+            message += f"{SEPARATOR}{'' if value is None else value}"
+        self.log_queue.put(message)
+        
+    def log_broker_sys_sample(self, timestamp, topic, value):
+        message = f"{BROKER_SYS_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{topic}{SEPARATOR}{value}"
+        self.log_queue.put(message)
+        
+    def log_calibration(self, timestamp, benchmark_id, pm_method, saturate, duration_s, publish_count, recv_count):
+        message = f"{CALIBRATION_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{pm_method}{SEPARATOR}{int(saturate)}{SEPARATOR}{duration_s}{SEPARATOR}{publish_count}{SEPARATOR}{recv_count}"
+        self.log_queue.put(message)
+        
     def log_pm_method(self, pm_method):
         message = f"{PM_METHOD_LABEL}{SEPARATOR}{pm_method}"
         self.log_queue.put(message)
     
-    def log_connect(self, timestamp, benchmark_id, client_id):
-        message = f"{CONNECT_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}"
+    def log_connect(self, timestamp, benchmark_id, client_id, clean_start, session_present):
+        message = f"{CONNECT_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{int(clean_start)}{SEPARATOR}{int(session_present)}"
         self.log_queue.put(message)
         
     def log_disconnect(self, timestamp, benchmark_id, client_id):
         message = f"{DISCONNECT_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}"
         self.log_queue.put(message)
 
+    def log_purpose_change(self, timestamp, benchmark_id, client_id, device_type, old_purpose, new_purpose):
+        message = f"{PURPOSE_CHANGE_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{device_type}{SEPARATOR}{old_purpose}{SEPARATOR}{new_purpose}"
+        self.log_queue.put(message)
+
     def log_subscribe(self, timestamp, benchmark_id, client_id, topic_filter, purpose_filter, sub_id):
         message = f"{SUBSCRIBE_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{topic_filter}{SEPARATOR}{purpose_filter}{SEPARATOR}{sub_id}"
         self.log_queue.put(message)
@@ -165,16 +225,16 @@ class ResultLogger:
         message = f"{OP_SUBSCRIBE_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{topic_filter}{SEPARATOR}{purpose_filter}{SEPARATOR}{sub_id}"
         self.log_queue.put(message)
 
-    def log_publish(self, timestamp, benchmark_id, client_id, corr_data, topic_name, purpose, msg_type):
-        message = f"{PUBLISH_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{topic_name}{SEPARATOR}{purpose}{SEPARATOR}{msg_type}{SEPARATOR}{corr_data}"
+    def log_publish(self, timestamp, benchmark_id, client_id, corr_data, topic_name, purpose, msg_type, payload_size):
+        message = f"{PUBLISH_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{topic_name}{SEPARATOR}{purpose}{SEPARATOR}{msg_type}{SEPARATOR}{corr_data}{SEPARATOR}{payload_size}"
         self.log_queue.put(message)
         
     def log_operation_publish(self, timestamp, benchmark_id, client_id, corr_data, topic_name, purpose, op_type, op_category):
         message = f"{OP_PUBLISH_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{topic_name}{SEPARATOR}{purpose}{SEPARATOR}{op_type}{SEPARATOR}{op_category}{SEPARATOR}{corr_data}"
         self.log_queue.put(message)
         
-    def log_recv(self, timestamp, benchmark_id, recv_client_id, sending_client_id, corr_data, topic_name, msg_type, sub_id):
-        message = f"{RECV_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{recv_client_id}{SEPARATOR}{sending_client_id}{SEPARATOR}{topic_name}{SEPARATOR}{sub_id}{SEPARATOR}{msg_type}{SEPARATOR}{corr_data}"
+    def log_recv(self, timestamp, benchmark_id, recv_client_id, sending_client_id, corr_data, topic_name, msg_type, sub_id, payload_size):
+        message = f"{RECV_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{recv_client_id}{SEPARATOR}{sending_client_id}{SEPARATOR}{topic_name}{SEPARATOR}{sub_id}{SEPARATOR}{msg_type}{SEPARATOR}{corr_data}{SEPARATOR}{payload_size}"
         self.log_queue.put(message)
         
     def log_operation_recv(self, timestamp, benchmark_id, recv_client_id, sending_client_id, corr_data, topic_name, op_type, op_category, op_status, sub_id):
@@ -188,3 +248,11 @@ class ResultLogger:
     def log_operation_response_recv(self, timestamp, benchmark_id, recv_client_id, sending_client_id, corr_data, topic_name, op_type, op_category, op_status, sub_id):
         message = f"{OP_RESP_RECV_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{recv_client_id}{SEPARATOR}{sending_client_id}{SEPARATOR}{topic_name}{SEPARATOR}{sub_id}{SEPARATOR}{op_type}{SEPARATOR}{op_category}{SEPARATOR}{op_status}{SEPARATOR}{corr_data}"
         self.log_queue.put(message)
+        
+    def log_latency_histogram(self, timestamp, benchmark_id, client_id, histogram: LatencyHistogram):
+        message = f"{LATENCY_HISTOGRAM_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{histogram.count}{SEPARATOR}{histogram.total}{SEPARATOR}{histogram.min_value}{SEPARATOR}{histogram.max_value}{SEPARATOR}{histogram.encode()}"
+        self.log_queue.put(message)
+
+    def log_wire_bytes(self, timestamp, benchmark_id, client_id, direction, packet_type, traffic_class, packet_count, total_bytes, payload_bytes):
+        message = f"{WIRE_BYTES_LABEL}{SEPARATOR}{timestamp}{SEPARATOR}{benchmark_id}{SEPARATOR}{client_id}{SEPARATOR}{direction}{SEPARATOR}{packet_type}{SEPARATOR}{packet_count}{SEPARATOR}{total_bytes}{SEPARATOR}{payload_bytes}{SEPARATOR}{traffic_class}"
+        self.log_queue.put(message)
@@ -0,0 +1,312 @@
+import copy
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from paho.mqtt.client import MQTT_LOG_ERR, ConnectFlags, DisconnectFlags, MQTTMessage, MQTTMessageInfo, topic_matches_sub
+from paho.mqtt.enums import MQTTErrorCode
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+from paho.mqtt.reasoncodes import ReasonCode
+import GlobalDefs
+from MQTTClient import MQTTClient
+
+# Passing this as the broker address runs the benchmark against the loopback sink
+NULL_BROKER_ADDRESS: str = "null"
+
+# Queued to end a callback thread, after a disconnect only if the client has not connected again
+DISCONNECTED: object = object()
+STOP: object = object()
+
+
+def _get_user_property(properties: Optional[Properties], name: str) -> Optional[str]:
+    for property_name, value in getattr(properties, "UserProperty", []):
+        if property_name == name:
+            return value
+    return None
+
+
+@dataclass
+class LoopbackSubscription:
+    """A subscription held by a loopback client"""
+    qos: int
+    subscription_id: Optional[int] = None
+    no_local: bool = False
+    purpose_filter: Optional[str] = None
+
+
+class LoopbackSink:
+    """An in-process stand-in for a broker that routes messages between loopback clients
+
+    Messages are matched against the subscriptions of every attached client and handed
+    straight to the receiving clients. As with a DAP broker, a message is only delivered
+    on subscriptions whose purpose filter, declared in DAP-SP or registered under PM4,
+    allows the purpose it declares in DAP-MP or was registered for under PM3 and PM4, and
+    subscriptions with noLocal set never receive their own client's messages. Sessions,
+    retained messages and the routing of operation requests are ignored, so the only
+    cost left is that of the benchmark itself and the deliveries of the PM method.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients: Dict[str, 'LoopbackClient'] = {}
+        self.message_purposes: Dict[Tuple[str, str], str] = {}  # (client, topic) -> purpose registered under PM3 or PM4
+        self.subscription_purposes: Dict[Tuple[str, str], str] = {}  # (client, topic filter) -> purpose filter registered under PM4
+
+        # (topic, sender, message purpose) -> [(client, subscription identifiers, highest QoS)], cleared when any subscription changes
+        self.routes: Dict[Tuple[str, str, Optional[str]], List[Tuple['LoopbackClient', List[int], int]]] = {}
+
+    def attach(self, client: 'LoopbackClient', clean_start: bool):
+        with self.lock:
+            if clean_start:
+                client.subscriptions.clear()
+            self.clients[client.client_name] = client
+            self.routes.clear()
+
+    def detach(self, client: 'LoopbackClient'):
+        with self.lock:
+            if self.clients.get(client.client_name) is client:
+                del self.clients[client.client_name]
+            self.routes.clear()
+
+    # Subscriptions are only changed under the lock, so a route is never built from a dict
+    # being changed or cached after the change that should have cleared it
+
+    def add_subscription(self, client: 'LoopbackClient', topic_filter: str, subscription: LoopbackSubscription):
+        with self.lock:
+            client.subscriptions[topic_filter] = subscription
+            self.routes.clear()
+
+    def remove_subscriptions(self, client: 'LoopbackClient', topic_filters: List[str]) -> List[bool]:
+        """Remove subscriptions of a client, returning whether each one existed"""
+        with self.lock:
+            existed = [client.subscriptions.pop(topic_filter, None) is not None for topic_filter in topic_filters]
+            self.routes.clear()
+            return existed
+
+    def register(self, client: 'LoopbackClient', topic: str, properties: Optional[Properties]) -> bool:
+        """Store a purpose registration like a DAP broker, returning whether the message was one"""
+
+        # PM3 registrations carry "<purpose>:<topic>" in the DAP-MP property
+        if GlobalDefs.REG_BY_MSG_REG_TOPIC and topic == GlobalDefs.REG_BY_MSG_REG_TOPIC:
+            registration = _get_user_property(properties, GlobalDefs.PROPERTY_MP)
+            if registration is not None and ':' in registration:
+                purpose, registered_topic = registration.split(':', 1)
+                with self.lock:
+                    self.message_purposes[(client.client_name, registered_topic)] = purpose
+                    self.routes.clear()
+            return True
+
+        # PM4 registrations are encoded in the topic as <reg topic>/<topic>[<purpose>]
+        for reg_topic, is_subscription in ((GlobalDefs.REG_BY_TOPIC_PUB_REG_TOPIC, False), (GlobalDefs.REG_BY_TOPIC_SUB_REG_TOPIC, True)):
+            if not reg_topic or not topic.startswith(f"{reg_topic}/"):
+                continue
+
+            registration = topic[len(reg_topic) + 1:]
+            purpose_start = registration.rfind('[')
+            if purpose_start > 0 and registration.endswith(']'):
+                registered_topic = registration[:purpose_start]
+                purpose = registration[purpose_start + 1:-1]
+                with self.lock:
+                    if is_subscription:
+                        registered_topic = registered_topic.replace("HASH", "#").replace("PLUS", "+")
+                        self.subscription_purposes[(client.client_name, registered_topic)] = purpose
+                    else:
+                        self.message_purposes[(client.client_name, registered_topic)] = purpose
+                    self.routes.clear()
+            return True
+
+        return False
+
+    def get_route(self, topic: str, sender: 'LoopbackClient', declared_purpose: Optional[str]) -> List[Tuple['LoopbackClient', List[int], int]]:
+        """Get the clients a message is delivered to with their subscription identifiers and QoS"""
+        with self.lock:
+            route_key = (topic, sender.client_name, declared_purpose)
+            route = self.routes.get(route_key)
+            if route is None:
+                message_purpose = declared_purpose
+                if message_purpose is None:
+                    message_purpose = self.message_purposes.get((sender.client_name, topic))
+
+                route = []
+                for client in self.clients.values():
+                    subscription_ids: List[int] = []
+                    max_qos = -1
+                    for topic_filter, subscription in client.subscriptions.items():
+                        if subscription.no_local and client is sender:
+                            continue
+                        if not topic_matches_sub(topic_filter, topic):
+                            continue
+
+                        subscription_purpose = subscription.purpose_filter
+                        if subscription_purpose is None:
+                            subscription_purpose = self.subscription_purposes.get((client.client_name, topic_filter))
+                        if not GlobalDefs.purpose_allowed(message_purpose, subscription_purpose):
+                            continue
+
+                        max_qos = max(max_qos, subscription.qos)
+                        if subscription.subscription_id is not None:
+                            subscription_ids.append(subscription.subscription_id)
+                    if max_qos >= 0:
+                        route.append((client, subscription_ids, max_qos))
+                self.routes[route_key] = route
+            return route
+
+
+# Shared by every loopback client in the process
+SINK: LoopbackSink = LoopbackSink()
+
+
+class LoopbackClient(MQTTClient):
+    """A client that talks to the loopback sink instead of a broker
+
+    Every request is acknowledged immediately and every published message is delivered
+    to the matching loopback clients. As with the network loop of a real client, callbacks
+    run on a thread per client started by loop_start, so they are never invoked from within
+    publish or subscribe. Nothing is encoded, so no wire bytes are counted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.client_name = self._client_id.decode("utf-8")
+        self.subscriptions: Dict[str, LoopbackSubscription] = {}  # Topic filter -> subscription
+        self.connected = False
+        self.pending_callbacks: queue.SimpleQueue = queue.SimpleQueue()
+        self.callback_thread: Optional[threading.Thread] = None
+        self.callback_thread_lock = threading.Lock()
+
+    def connect(self, host: str, port: int = 1883, keepalive: int = 60, bind_address: str = "", bind_port: int = 0,
+                clean_start: Any = True, properties: Optional[Properties] = None) -> MQTTErrorCode:
+        self.connected = True
+        SINK.attach(self, clean_start is True)
+        self._queue_callback(self.on_connect, ConnectFlags(session_present=False),
+                             ReasonCode(PacketTypes.CONNACK, "Success"), Properties(PacketTypes.CONNACK))
+        return MQTTErrorCode.MQTT_ERR_SUCCESS
+
+    def disconnect(self, reasoncode: Optional[ReasonCode] = None, properties: Optional[Properties] = None) -> MQTTErrorCode:
+        if not self.connected:
+            return MQTTErrorCode.MQTT_ERR_NO_CONN
+
+        self.connected = False
+        SINK.detach(self)
+        self._queue_callback(self.on_disconnect, DisconnectFlags(is_disconnect_packet_from_server=False),
+                             ReasonCode(PacketTypes.DISCONNECT, "Normal disconnection"), Properties(PacketTypes.DISCONNECT))
+
+        # Stop the callback thread once everything before the disconnect has been handled
+        self.pending_callbacks.put(DISCONNECTED)
+        return MQTTErrorCode.MQTT_ERR_SUCCESS
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    def loop_start(self) -> MQTTErrorCode:
+        with self.callback_thread_lock:
+            if self.callback_thread is not None:
+                return MQTTErrorCode.MQTT_ERR_INVAL
+
+            self.callback_thread = threading.Thread(target=self._run_callbacks, name=f"loopback-{self.client_name}")
+            self.callback_thread.daemon = True
+            self.callback_thread.start()
+        return MQTTErrorCode.MQTT_ERR_SUCCESS
+
+    def loop_stop(self) -> MQTTErrorCode:
+        callback_thread = self.callback_thread
+        if callback_thread is None:
+            return MQTTErrorCode.MQTT_ERR_INVAL
+
+        self.pending_callbacks.put(STOP)
+        if callback_thread is not threading.current_thread():
+            callback_thread.join()
+        return MQTTErrorCode.MQTT_ERR_SUCCESS
+
+    def publish(self, topic: str, payload: Any = None, qos: int = 0, retain: bool = False,
+                properties: Optional[Properties] = None) -> MQTTMessageInfo:
+        message_info = MQTTMessageInfo(self._mid_generate())
+        if not self.connected:
+            message_info.rc = MQTTErrorCode.MQTT_ERR_NO_CONN
+            return message_info
+
+        if payload is None:
+            payload = b""
+        elif isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        elif isinstance(payload, (int, float)):
+            payload = str(payload).encode("ascii")
+        else:
+            payload = bytes(payload)
+
+        message_info.rc = MQTTErrorCode.MQTT_ERR_SUCCESS
+        message_info._set_as_published()
+        self._queue_callback(self.on_publish, message_info.mid,
+                             ReasonCode(PacketTypes.PUBACK, "Success"), Properties(PacketTypes.PUBACK))
+
+        # Registrations are kept by the sink instead of being delivered
+        if SINK.register(self, topic, properties):
+            return message_info
+
+        encoded_topic = topic.encode("utf-8")
+        for client, subscription_ids, max_qos in SINK.get_route(topic, self, _get_user_property(properties, GlobalDefs.PROPERTY_MP)):
+            message = MQTTMessage(topic=encoded_topic)
+            message.payload = payload
+            message.qos = min(qos, max_qos)
+            message.properties = copy.copy(properties) if properties is not None else Properties(PacketTypes.PUBLISH)
+            if subscription_ids:
+                message.properties.SubscriptionIdentifier = subscription_ids
+            client._queue_callback(client.on_message, message)
+
+        return message_info
+
+    def subscribe(self, topic: Any, qos: int = 0, options: Any = None,
+                  properties: Optional[Properties] = None) -> Tuple[MQTTErrorCode, Optional[int]]:
+        if not self.connected:
+            return MQTTErrorCode.MQTT_ERR_NO_CONN, None
+
+        no_local = False
+        if options is not None:
+            qos = options.QoS
+            no_local = options.noLocal
+        subscription_id = None
+        if properties is not None and hasattr(properties, "SubscriptionIdentifier"):
+            subscription_id = properties.SubscriptionIdentifier
+            if isinstance(subscription_id, list):
+                subscription_id = subscription_id[0]
+
+        SINK.add_subscription(self, topic, LoopbackSubscription(qos=qos, subscription_id=subscription_id, no_local=no_local,
+                                                                purpose_filter=_get_user_property(properties, GlobalDefs.PROPERTY_SP)))
+
+        mid = self._mid_generate()
+        self._queue_callback(self.on_subscribe, mid, [ReasonCode(PacketTypes.SUBACK, identifier=qos)], Properties(PacketTypes.SUBACK))
+        return MQTTErrorCode.MQTT_ERR_SUCCESS, mid
+
+    def unsubscribe(self, topic: Any, properties: Optional[Properties] = None) -> Tuple[MQTTErrorCode, Optional[int]]:
+        if not self.connected:
+            return MQTTErrorCode.MQTT_ERR_NO_CONN, None
+
+        topics = topic if isinstance(topic, list) else [topic]
+        reason_codes = [ReasonCode(PacketTypes.UNSUBACK, "Success" if existed else "No subscription found")
+                        for existed in SINK.remove_subscriptions(self, topics)]
+
+        mid = self._mid_generate()
+        self._queue_callback(self.on_unsubscribe, mid, reason_codes, Properties(PacketTypes.UNSUBACK))
+        return MQTTErrorCode.MQTT_ERR_SUCCESS, mid
+
+    def _queue_callback(self, callback: Optional[Callable], *args):
+        if callback is not None:
+            self.pending_callbacks.put((callback, args))
+
+    def _run_callbacks(self):
+        while True:
+            item = self.pending_callbacks.get()
+            if item is DISCONNECTED or item is STOP:
+                with self.callback_thread_lock:
+                    if item is STOP or not self.connected:
+                        self.callback_thread = None
+                        return
+                continue
+
+            callback, args = item
+            try:
+                callback(self, self._userdata, *args)
+            except Exception as e:
+                self._easy_log(MQTT_LOG_ERR, "Caught exception in loopback callback: %s", e)
@@ -1,10 +1,118 @@
 import selectors
+import threading
 from contextlib import suppress
-from paho.mqtt.client import Client
+from dataclasses import dataclass
+from typing import Dict, Tuple
+from paho.mqtt.client import Client, MQTTMessageInfo, MQTTv5
 from paho.mqtt.enums import MQTTErrorCode
+import GlobalDefs
+
+OUTGOING: str = "OUT"
+INCOMING: str = "IN"
+
+PACKET_TYPE_NAMES: Dict[int, str] = {
+    1: "CONNECT", 2: "CONNACK", 3: "PUBLISH", 4: "PUBACK", 5: "PUBREC", 6: "PUBREL", 7: "PUBCOMP",
+    8: "SUBSCRIBE", 9: "SUBACK", 10: "UNSUBSCRIBE", 11: "UNSUBACK", 12: "PINGREQ", 13: "PINGRESP",
+    14: "DISCONNECT", 15: "AUTH"
+}
+PUBLISH_PACKET_TYPE: int = 3
+
+
+@dataclass
+class PacketStats:
+    """Bytes on the wire for one packet type, traffic class and direction"""
+    packet_count: int = 0
+    total_bytes: int = 0
+    payload_bytes: int = 0  # Application payload of PUBLISH packets, everything else is header
+
 
 class MQTTClient(Client): 
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Packets are queued by both the publishing thread and the network thread,
+        # while received packets are only handled by the network thread
+        self.wire_stats: Dict[Tuple[str, str, str], PacketStats] = {}
+        self.wire_stats_lock = threading.Lock()
+
+    def _packet_queue(self, command: int, packet: bytes, mid: int, qos: int, info: MQTTMessageInfo | None = None) -> MQTTErrorCode:
+        # The packet is fully encoded here, including the fixed header
+        payload_bytes = 0
+        traffic_class = GlobalDefs.TrafficClass.CONTROL
+        if command >> 4 == PUBLISH_PACKET_TYPE:
+            remaining_length_bytes = 1
+            while packet[remaining_length_bytes] & 0x80:
+                remaining_length_bytes += 1
+            # The command argument lacks the flags, so take the QoS from the encoded packet
+            variable_part = packet[1 + remaining_length_bytes:]
+            payload_bytes = self._get_publish_payload_size(packet[0], variable_part)
+            traffic_class = self._classify_publish(variable_part)
+
+        with self.wire_stats_lock:
+            self._record_packet(OUTGOING, command, traffic_class, len(packet), payload_bytes)
+
+        return super()._packet_queue(command, packet, mid, qos, info)
+
+    def _packet_handle(self) -> MQTTErrorCode:
+        # The fixed header has been consumed, so add back the command byte and remaining length bytes
+        command = self._in_packet['command']
+        total_bytes = 1 + len(self._in_packet['remaining_count']) + self._in_packet['remaining_length']
+
+        payload_bytes = 0
+        traffic_class = GlobalDefs.TrafficClass.CONTROL
+        if command >> 4 == PUBLISH_PACKET_TYPE:
+            payload_bytes = self._get_publish_payload_size(command, self._in_packet['packet'])
+            traffic_class = self._classify_publish(self._in_packet['packet'])
+
+        with self.wire_stats_lock:
+            self._record_packet(INCOMING, command, traffic_class, total_bytes, payload_bytes)
+
+        return super()._packet_handle()
+
+    def get_wire_stats(self) -> Dict[Tuple[str, str, str], PacketStats]:
+        """Get a copy of the byte counts keyed by (direction, packet type, traffic class)"""
+        with self.wire_stats_lock:
+            return {key: PacketStats(stats.packet_count, stats.total_bytes, stats.payload_bytes)
+                    for key, stats in self.wire_stats.items()}
+
+    def _record_packet(self, direction: str, command: int, traffic_class: GlobalDefs.TrafficClass, total_bytes: int, payload_bytes: int):
+        key = (direction, PACKET_TYPE_NAMES.get(command >> 4, "UNKNOWN"), traffic_class.value)
+        stats = self.wire_stats.get(key)
+        if stats is None:
+            stats = PacketStats()
+            self.wire_stats[key] = stats
+
+        stats.packet_count += 1
+        stats.total_bytes += total_bytes
+        stats.payload_bytes += payload_bytes
+
+    def _classify_publish(self, variable_part: bytes | bytearray) -> GlobalDefs.TrafficClass:
+        topic_length = int.from_bytes(variable_part[0:2], byteorder='big')
+        topic = bytes(variable_part[2:2 + topic_length]).decode('utf-8', errors='replace')
+        return GlobalDefs.classify_publish_topic(topic)
+
+    def _get_publish_payload_size(self, command: int, variable_part: bytes | bytearray) -> int:
+        # Skip the topic name and the packet identifier which is only present for QoS > 0
+        position = 2 + int.from_bytes(variable_part[0:2], byteorder='big')
+        if (command & 0x06) >> 1 > 0:
+            position += 2
+
+        # Skip the properties, prefixed by their length as a variable byte integer
+        if self._protocol == MQTTv5:
+            properties_length = 0
+            multiplier = 1
+            while True:
+                byte_value = variable_part[position]
+                position += 1
+                properties_length += (byte_value & 0x7F) * multiplier
+                multiplier *= 128
+                if not byte_value & 0x80:
+                    break
+            position += properties_length
+
+        return max(0, len(variable_part) - position)
+
     def _loop(self, timeout: float = 1.0) -> MQTTErrorCode:
         if timeout < 0.0:
             raise ValueError("Invalid timeout.")
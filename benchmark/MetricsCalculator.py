@@ -1,22 +1,109 @@
+import bisect
+import heapq
+import itertools
+import math
 import statistics
 import sys
-from paho.mqtt.client import topic_matches_sub
 from dataclasses import dataclass, field
 from typing import Dict, List, Set, Optional, Tuple, Any
 from pathlib import Path
 import GlobalDefs
+from LatencyHistogram import LatencyHistogram
+from SequenceTracker import SequenceTracker
+from TopicFilterTrie import TopicFilterTrie
 from LoggingModule import (
-    SEPARATOR, PM_METHOD_LABEL, CPU_METRICS_LABEL, MEM_METRICS_LABEL,
+    SEPARATOR, CLOCK_ANCHOR_LABEL, PM_METHOD_LABEL, CPU_METRICS_LABEL, MEM_METRICS_LABEL,
     CONNECT_LABEL, DISCONNECT_LABEL, SUBSCRIBE_LABEL, OP_SUBSCRIBE_LABEL, PUBLISH_LABEL,
-    OP_PUBLISH_LABEL, RECV_LABEL, OP_RECV_LABEL, OP_RESP_RECV_LABEL
+    OP_PUBLISH_LABEL, RECV_LABEL, OP_RECV_LABEL, OP_RESP_RECV_LABEL, LATENCY_HISTOGRAM_LABEL,
+    PURPOSE_CHANGE_LABEL, WIRE_BYTES_LABEL, BROKER_SAMPLE_LABEL, BROKER_SYS_LABEL, CALIBRATION_LABEL
 )
 
+# Steady-state detection bins deliveries into fixed windows and looks for the first and
+# last run of consecutive windows whose throughput and latency stay near the run median
+STEADY_STATE_WINDOW_S: float = 1.0
+STEADY_STATE_MIN_WINDOWS: int = 5
+STEADY_STATE_THROUGHPUT_TOLERANCE: float = 0.2
+STEADY_STATE_LATENCY_TOLERANCE: float = 0.5
+
+# Subscription identifiers logged when a delivery or subscription did not carry one
+MISSING_SUB_IDS: Set[str] = {"-1", "UNKNOWN", "None", ""}
+
+
+"""Get a percentile of sorted values using the nearest-rank method
+
+Parameters
+----------
+sorted_values : List[float]
+    The values in ascending order, must not be empty
+percent : float
+    The percentile to find in the range [0, 100]
+
+Returns
+----------
+float
+    The smallest value with at least percent of the values at or below it
+"""
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100.0))
+    return sorted_values[rank - 1]
+
+"""Get the Pearson correlation coefficient of paired values
+
+Parameters
+----------
+x_values : List[float]
+    The first value of each pair
+y_values : List[float]
+    The second value of each pair, the same length as x_values
+
+Returns
+----------
+float or None
+    The correlation in the range [-1, 1], or None if fewer than two pairs or either side is constant
+"""
+def _correlation(x_values: List[float], y_values: List[float]) -> Optional[float]:
+    if len(x_values) < 2:
+        return None
+    x_mean = statistics.mean(x_values)
+    y_mean = statistics.mean(y_values)
+    covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_values, y_values))
+    x_spread = math.sqrt(sum((x - x_mean) ** 2 for x in x_values))
+    y_spread = math.sqrt(sum((y - y_mean) ** 2 for y in y_values))
+    if x_spread == 0 or y_spread == 0:
+        return None
+    return covariance / (x_spread * y_spread)
+
+"""Get the time segment a timestamp falls in between sorted boundaries
+
+Odd segments are the boundaries themselves and even segments the open intervals around them,
+so anything inclusive of its start and end boundaries covers a contiguous range of segments
+
+Parameters
+----------
+boundaries : List[float]
+    The segment boundaries in ascending order without duplicates
+timestamp : float
+    The time to locate
+
+Returns
+----------
+int
+    2 * i + 1 if the timestamp is boundary i, else 2 * i where i boundaries precede it
+"""
+def _get_time_segment(boundaries: List[float], timestamp: float) -> int:
+    position = bisect.bisect_left(boundaries, timestamp)
+    if position < len(boundaries) and boundaries[position] == timestamp:
+        return 2 * position + 1
+    return 2 * position
+
 @dataclass
 class ConnectEvent:
     """Client connection event"""
     timestamp: float
     benchmark_id: str
     client_id: str
+    clean_start: bool = True
+    session_present: bool = False
     
 @dataclass
 class DisconnectEvent:
@@ -35,6 +122,7 @@ class PublishEvent:
     purpose: str
     msg_type: str
     corr_data: int
+    payload_size: int = 0
 
 
 @dataclass
@@ -48,6 +136,7 @@ class RecvEvent:
     sub_id: str
     msg_type: str
     corr_data: int
+    payload_size: int = 0
 
 
 @dataclass
@@ -114,6 +203,36 @@ class OperationRespRecvEvent:
     corr_data: int
 
 
+@dataclass
+class PurposeChangeEvent:
+    """Purpose change applied to a device"""
+    timestamp: float
+    benchmark_id: str
+    client_id: str
+    device_type: str
+    old_purpose: str
+    new_purpose: str
+
+
+@dataclass
+class BrokerSampleEvent:
+    """Broker resource usage at one point in the run"""
+    timestamp: float
+    cpu_usage_percent: Optional[float] = None
+    mem_usage_percent: Optional[float] = None
+    cpu_active_seconds: Optional[float] = None
+    mem_bytes: Optional[int] = None
+    voluntary_ctx_switches: Optional[int] = None
+    involuntary_ctx_switches: Optional[int] = None
+    open_fds: Optional[int] = None
+    net_rx_bytes_per_sec: Optional[float] = None
+    net_tx_bytes_per_sec: Optional[float] = None
+    tcp_retransmits: Optional[int] = None
+    tcp_sockets_inuse: Optional[int] = None
+    tcp_sockets_time_wait: Optional[int] = None
+    sockets_used: Optional[int] = None
+
+
 @dataclass
 class BrokerStats:
     """Broker resource usage stats"""
@@ -138,6 +257,107 @@ class MessagingStats:
     avg_header_size_bytes: float = 0.0
     non_data_msg_count: int = 0
     total_data_msg_count: int = 0
+    inband_latency_count: int = 0
+    inband_latency_min_ms: float = 0.0
+    inband_latency_max_ms: float = 0.0
+    inband_latency_avg_ms: float = 0.0
+    inband_latency_p50_ms: float = 0.0
+    inband_latency_p99_ms: float = 0.0
+    latency_crosscheck_delta_ms: float = 0.0
+    window_start_s: float = 0.0
+    window_end_s: float = 0.0
+    steady_state_detected: bool = False
+
+
+@dataclass
+class TimeSeriesWindow:
+    """Messaging performance within one window of the run"""
+    start_s: float
+    publish_count: int = 0
+    recv_count: int = 0
+    publish_rate: float = 0.0
+    recv_rate: float = 0.0
+    publish_bytes_per_sec: float = 0.0
+    recv_bytes_per_sec: float = 0.0
+    latency_p50_ms: float = 0.0
+    latency_p90_ms: float = 0.0
+    latency_p99_ms: float = 0.0
+    latency_max_ms: float = 0.0
+    connect_count: int = 0
+    disconnect_count: int = 0
+    op_request_count: int = 0
+    purpose_change_count: int = 0
+    cpu_usage_percent: Optional[float] = None
+    mem_usage_percent: Optional[float] = None
+    net_rx_bytes_per_sec: Optional[float] = None
+    net_tx_bytes_per_sec: Optional[float] = None
+    tcp_retransmits: Optional[int] = None
+
+
+@dataclass
+class BrokerResourceStats:
+    """Broker resource samples aligned with the messaging time series"""
+    sample_count: int = 0
+    aligned_window_count: int = 0
+    cpu_latency_p99_correlation: Optional[float] = None
+    cpu_recv_rate_correlation: Optional[float] = None
+    net_latency_p99_correlation: Optional[float] = None
+    cpu_seconds: float = 0.0
+    cpu_us_per_publish: float = 0.0
+    cpu_us_per_delivery: float = 0.0
+    mem_bytes_avg: float = 0.0
+    mem_bytes_max: int = 0
+    voluntary_ctx_switches: int = 0
+    involuntary_ctx_switches: int = 0
+    ctx_switches_per_sec: float = 0.0
+    ctx_switches_per_delivery: float = 0.0
+    open_fds_max: Optional[int] = None
+    network_sampled: bool = False
+    net_rx_bytes_per_sec_avg: float = 0.0
+    net_rx_bytes_per_sec_max: float = 0.0
+    net_tx_bytes_per_sec_avg: float = 0.0
+    net_tx_bytes_per_sec_max: float = 0.0
+    tcp_retransmits: int = 0
+    tcp_retransmits_per_sec: float = 0.0
+    tcp_sockets_inuse_max: int = 0
+    tcp_sockets_time_wait_max: int = 0
+    sockets_used_max: int = 0
+
+
+@dataclass
+class BrokerSysTopicStats:
+    """Values a broker published to one $SYS topic during the measurement window"""
+    topic: str
+    sample_count: int = 0
+    min_value: float = 0.0
+    max_value: float = 0.0
+    avg_value: float = 0.0
+    change: float = 0.0
+
+
+@dataclass
+class CalibrationStats:
+    """Rates the benchmark reached against the loopback sink, without a broker"""
+    pm_method: str = ""
+    saturate: bool = False
+    duration_s: float = 0.0
+    publish_count: int = 0
+    recv_count: int = 0
+    publish_rate: float = 0.0
+    recv_rate: float = 0.0
+
+
+@dataclass
+class PurposePropagationStats:
+    """Purpose change propagation delays for one device type"""
+    device_type: str
+    change_count: int = 0
+    new_purpose_observed: int = 0
+    new_purpose_delay_avg_ms: float = 0.0
+    new_purpose_delay_max_ms: float = 0.0
+    old_purpose_observed: int = 0
+    old_purpose_delay_avg_ms: float = 0.0
+    old_purpose_delay_max_ms: float = 0.0
 
 
 @dataclass
@@ -149,6 +369,7 @@ class SubscriberPurposeCorrectness:
     expected_msg_count: int = 0
     bad_reject: int = 0
     total_recv_count: int = 0
+    wrong_sub_recv_count: int = 0
     false_accept: float = 0.0
     false_reject: float = 0.0
 
@@ -168,6 +389,84 @@ class OPCorrectnessMetrics:
     completion: float = 0.0
 
 
+@dataclass
+class OPLatencyStats:
+    """Operational request round-trip latency for one op type or category"""
+    request_count: int = 0
+    answered_count: int = 0
+    response_count: int = 0
+    first_response_avg_ms: float = 0.0
+    first_response_p50_ms: float = 0.0
+    first_response_p99_ms: float = 0.0
+    first_response_max_ms: float = 0.0
+    last_response_avg_ms: float = 0.0
+    last_response_p50_ms: float = 0.0
+    last_response_p99_ms: float = 0.0
+    last_response_max_ms: float = 0.0
+    fan_in_rate_avg: float = 0.0
+
+
+@dataclass
+class ReconnectStats:
+    """Recovery of persistent sessions after reconnecting with clean start disabled"""
+    reconnect_count: int = 0
+    session_present_count: int = 0
+    first_msg_count: int = 0
+    first_msg_avg_ms: float = 0.0
+    first_msg_max_ms: float = 0.0
+    replayed_msg_count: int = 0
+    replayed_msg_avg: float = 0.0
+    drain_rate_avg: float = 0.0
+    duplicate_count: int = 0
+
+
+@dataclass
+class SequenceStats:
+    """Loss, duplicates and reordering seen in the expected data publishes of each publisher to subscriber stream"""
+    stream_count: int = 0
+    expected_count: int = 0
+    received_count: int = 0
+    lost_count: int = 0
+    repeat_count: int = 0
+    reorder_count: int = 0
+    max_reorder_distance: int = 0
+    out_of_window_count: int = 0
+    unexpected_count: int = 0
+
+
+@dataclass
+class WireStats:
+    """Bytes on the wire as counted by the clients"""
+    total_bytes: int = 0
+    sent_bytes: int = 0
+    received_bytes: int = 0
+    payload_bytes: int = 0
+    header_bytes: int = 0
+    control_bytes: int = 0
+    bytes_per_sec: float = 0.0
+    header_payload_ratio: float = 0.0
+    control_plane_share: float = 0.0
+    packet_type_bytes: Dict[str, int] = field(default_factory=dict)  # "<direction> <packet type>[ <traffic class>]" -> total bytes
+
+
+@dataclass
+class AmplificationStats:
+    """Packets sent per logical data message and cost per useful delivery"""
+    logical_msg_count: int = 0
+    data_publish_count: int = 0
+    amplification_factor: float = 0.0
+    delivery_count: int = 0
+    useful_delivery_count: int = 0
+    fan_out_avg: float = 0.0
+    registration_msg_count: int = 0
+    op_request_msg_count: int = 0
+    op_response_msg_count: int = 0
+    control_msg_count: int = 0
+    control_msgs_per_data_msg: float = 0.0
+    packets_per_useful_delivery: float = 0.0
+    bytes_per_useful_delivery: float = 0.0
+
+
 @dataclass
 class TestMetrics:
     """Test metrics"""
@@ -177,6 +476,17 @@ class TestMetrics:
     messaging_stats: MessagingStats = field(default_factory=MessagingStats)
     purpose_correctness_per_sub: Dict[str, SubscriberPurposeCorrectness] = field(default_factory=dict)
     op_correctness: List[OPCorrectnessMetrics] = field(default_factory=list)
+    time_series: List[TimeSeriesWindow] = field(default_factory=list)
+    purpose_propagation: Dict[str, PurposePropagationStats] = field(default_factory=dict)
+    op_latency_by_type: Dict[str, OPLatencyStats] = field(default_factory=dict)
+    op_latency_by_category: Dict[str, OPLatencyStats] = field(default_factory=dict)
+    reconnect_stats: ReconnectStats = field(default_factory=ReconnectStats)
+    sequence_stats: SequenceStats = field(default_factory=SequenceStats)
+    wire_stats: Optional[WireStats] = None
+    amplification_stats: AmplificationStats = field(default_factory=AmplificationStats)
+    broker_resource_stats: BrokerResourceStats = field(default_factory=BrokerResourceStats)
+    broker_sys_stats: Dict[str, BrokerSysTopicStats] = field(default_factory=dict)
+    calibration: Optional[CalibrationStats] = None
 
 
 class MetricsCalculator:
@@ -191,16 +501,53 @@ class MetricsCalculator:
     op_publish_events: List[OperationPublishEvent]
     op_recv_events: List[OperationRecvEvent]
     op_resp_recv_events: List[OperationRespRecvEvent]
+    purpose_change_events: List[PurposeChangeEvent]
+    broker_sample_events: List[BrokerSampleEvent]
     
     client_subscription_periods: Dict[str, Dict[str, List[Tuple[float, float | None]]]] # Map of clients -> topic:purpose -> valid ranges of time
 
     pm_method: Optional[str] = None
+    clock_anchor_wall_ns: Optional[int] = None
+    clock_anchor_ns: Optional[int] = None
     cpu_metrics: Optional[Tuple[float, float, float, float]] = None
     mem_metrics: Optional[Tuple[float, float, float, float]] = None
 
     subscriber_subscriptions: Dict[str, List[SubscribeEvent]]
+    subscription_index: Optional[TopicFilterTrie] # Every subscription by topic filter, built once the log is parsed
+    topic_subscriptions: Dict[str, Dict[str, List[SubscribeEvent]]] # Map of topic -> subscriber -> subscriptions matching the topic
+    subscriptions_by_id: Dict[Tuple[str, str], List[SubscribeEvent]] # Map of (client, subscription identifier) -> subscriptions using it
+    publish_segments: Optional[Tuple[List[float], Dict[Tuple[str, str], int], Dict[Tuple[int, int], List[PublishEvent]], Dict[Tuple[str, int], List[Tuple[PublishEvent, int, int]]]]] # Data publishes grouped by time segment and topic and purpose, built once the subscription periods are parsed
+    subscriber_masks: Dict[str, Tuple[List[int], List[int]]] # Map of subscriber -> (live subscription bits per segment, eligible subscription bits per publish key)
+    latency_histograms: Dict[str, LatencyHistogram] # Map of receiving clients -> in-band latencies in ns
+    wire_bytes: Dict[Tuple[str, str, str, str], Tuple[int, int, int]] # Map of (client, direction, packet type, traffic class) -> (packets, total bytes, payload bytes)
+    broker_sys_samples: Dict[str, List[Tuple[float, float]]] # Map of $SYS topic -> (timestamp, value) samples
+    calibration_records: List[Tuple[str, str, bool, float, int, int]] # (benchmark id, PM method, saturate, duration, published, received)
+
+    warmup_s: float
+    cooldown_s: float
+    detect_steady_state: bool
+    time_series_window_s: float
+
+    def __init__(self, warmup_s: float = 0.0, cooldown_s: float = 0.0, detect_steady_state: bool = False,
+                 time_series_window_s: float = 1.0):
+        """Initialize the calculator
+
+        Parameters
+        ----------
+        warmup_s : float, optional
+            Time after the first logged event excluded from messaging metrics (default is 0)
+        cooldown_s : float, optional
+            Time before the last logged event excluded from messaging metrics (default is 0)
+        detect_steady_state : bool, optional
+            Whether to further narrow the messaging window to where throughput and latency are stable (default is False)
+        time_series_window_s : float, optional
+            The length of each window of the time series (default is 1 second)
+        """
+        self.warmup_s = warmup_s
+        self.cooldown_s = cooldown_s
+        self.detect_steady_state = detect_steady_state
+        self.time_series_window_s = time_series_window_s
 
-    def __init__(self):
         self.connect_events = []
         self.disconnect_events = []
         self.publish_events = []
@@ -210,10 +557,21 @@ class MetricsCalculator:
         self.op_publish_events = []
         self.op_recv_events = []
         self.op_resp_recv_events = []
+        self.purpose_change_events = []
+        self.broker_sample_events = []
         
         self.client_subscription_periods = {}
 
         self.subscriber_subscriptions = {}
+        self.subscription_index = None
+        self.topic_subscriptions = {}
+        self.subscriptions_by_id = {}
+        self.publish_segments = None
+        self.subscriber_masks = {}
+        self.latency_histograms = {}
+        self.wire_bytes = {}
+        self.broker_sys_samples = {}
+        self.calibration_records = []
 
     def parse_log_file(self, log_file_path: str) -> bool:
         """Parse log file and extract events"""
@@ -236,7 +594,12 @@ class MetricsCalculator:
                 event: Any
 
                 try:
-                    if label == PM_METHOD_LABEL:
+                    if label == CLOCK_ANCHOR_LABEL:
+                        # CLOCK_ANCHOR@@wall_ns@@timestamp_ns
+                        self.clock_anchor_wall_ns = int(parts[1])
+                        self.clock_anchor_ns = int(parts[2])
+
+                    elif label == PM_METHOD_LABEL:
                         self.pm_method = parts[1]
 
                     elif label == CPU_METRICS_LABEL:
@@ -256,54 +619,58 @@ class MetricsCalculator:
                         )
                         
                     elif label == CONNECT_LABEL:
-                        # CONNECT@@timestamp@@benchmark_id@@client_id
+                        # CONNECT@@timestamp@@benchmark_id@@client_id[@@clean_start@@session_present]
                         event = ConnectEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             benchmark_id=parts[2],
-                            client_id=parts[3]
+                            client_id=parts[3],
+                            clean_start=parts[4] != "0" if len(parts) > 4 else True,
+                            session_present=parts[5] == "1" if len(parts) > 5 else False
                         )
                         self.connect_events.append(event)
                         
                     elif label == DISCONNECT_LABEL:
                         # DISCONNECT@@timestamp@@benchmark_id@@client_id
                         event = DisconnectEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             benchmark_id=parts[2],
                             client_id=parts[3]
                         )
                         self.disconnect_events.append(event)
 
                     elif label == PUBLISH_LABEL:
-                        # PUBLISH@@timestamp@@benchmark_id@@client_id@@topic@@purpose@@msg_type@@corr_data
+                        # PUBLISH@@timestamp@@benchmark_id@@client_id@@topic@@purpose@@msg_type@@corr_data[@@payload_size]
                         event = PublishEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             benchmark_id=parts[2],
                             client_id=parts[3],
                             topic=parts[4],
                             purpose=parts[5],
                             msg_type=parts[6],
-                            corr_data=int(parts[7])
+                            corr_data=int(parts[7]),
+                            payload_size=int(parts[8]) if len(parts) > 8 else 0
                         )
                         self.publish_events.append(event)
 
                     elif label == RECV_LABEL:
-                        # RECV@@timestamp@@benchmark_id@@recv_client@@sending_client@@topic@@sub_id@@msg_type@@corr_data
+                        # RECV@@timestamp@@benchmark_id@@recv_client@@sending_client@@topic@@sub_id@@msg_type@@corr_data[@@payload_size]
                         event = RecvEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             benchmark_id=parts[2],
                             recv_client_id=parts[3],
                             sending_client_id=parts[4],
                             topic=parts[5],
                             sub_id=parts[6],
                             msg_type=parts[7],
-                            corr_data=int(parts[8])
+                            corr_data=int(parts[8]),
+                            payload_size=int(parts[9]) if len(parts) > 9 else 0
                         )
                         self.recv_events.append(event)
 
                     elif label == SUBSCRIBE_LABEL:
                         # SUBSCRIBE@@timestamp@@benchmark_id@@client_id@@topic_filter@@purpose_filter@@sub_id
                         event = SubscribeEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             end_timestamp=sys.float_info.max,
                             benchmark_id=parts[2],
                             client_id=parts[3],
@@ -321,7 +688,7 @@ class MetricsCalculator:
                     elif label == OP_SUBSCRIBE_LABEL:
                         # SUBSCRIBE_OP@@timestamp@@benchmark_id@@client_id@@topic_filter@@purpose_filter@@sub_id
                         event = OperationSubscribeEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             benchmark_id=parts[2],
                             client_id=parts[3],
                             topic_filter=parts[4],
@@ -333,7 +700,7 @@ class MetricsCalculator:
                     elif label == OP_PUBLISH_LABEL:
                         # PUBLISH_OP@@timestamp@@benchmark_id@@client_id@@topic@@purpose@@op_type@@op_category@@corr_data
                         event = OperationPublishEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             benchmark_id=parts[2],
                             client_id=parts[3],
                             topic=parts[4],
@@ -347,7 +714,7 @@ class MetricsCalculator:
                     elif label == OP_RECV_LABEL:
                         # RECV_OP@@timestamp@@benchmark_id@@recv_client@@sending_client@@topic@@sub_id@@op_type@@op_category@@op_status@@corr_data
                         event = OperationRecvEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             benchmark_id=parts[2],
                             recv_client_id=parts[3],
                             sending_client_id=parts[4],
@@ -363,7 +730,7 @@ class MetricsCalculator:
                     elif label == OP_RESP_RECV_LABEL:
                         # RECV_OP_RESP@@timestamp@@benchmark_id@@recv_client@@sending_client@@topic@@sub_id@@op_type@@op_category@@op_status@@corr_data
                         event = OperationRespRecvEvent(
-                            timestamp=float(parts[1]),
+                            timestamp=self._parse_timestamp(parts[1]),
                             benchmark_id=parts[2],
                             recv_client_id=parts[3],
                             sending_client_id=parts[4],
@@ -376,6 +743,66 @@ class MetricsCalculator:
                         )
                         self.op_resp_recv_events.append(event)
 
+                    elif label == PURPOSE_CHANGE_LABEL:
+                        # PURPOSE_CHANGE@@timestamp@@benchmark_id@@client_id@@device_type@@old_purpose@@new_purpose
+                        event = PurposeChangeEvent(
+                            timestamp=self._parse_timestamp(parts[1]),
+                            benchmark_id=parts[2],
+                            client_id=parts[3],
+                            device_type=parts[4],
+                            old_purpose=parts[5],
+                            new_purpose=parts[6]
+                        )
+                        self.purpose_change_events.append(event)
+
+                    elif label == WIRE_BYTES_LABEL:
+                        # WIRE_BYTES@@timestamp@@benchmark_id@@client_id@@direction@@packet_type@@packets@@total_bytes@@payload_bytes[@@traffic_class]
+                        if len(parts) > 9:
+                            traffic_class = parts[9]
+                        else:
+                            traffic_class = GlobalDefs.TrafficClass.DATA.value if parts[5] == "PUBLISH" else GlobalDefs.TrafficClass.CONTROL.value
+                        self.wire_bytes[(parts[3], parts[4], parts[5], traffic_class)] = (int(parts[6]), int(parts[7]), int(parts[8]))
+
+                    elif label == BROKER_SAMPLE_LABEL:
+                        # BROKER_SAMPLE@@timestamp@@cpu_pct@@mem_pct@@cpu_active_seconds[@@mem_bytes@@voluntary_ctx@@involuntary_ctx@@open_fds
+                        #   @@net_rx_bytes_per_sec@@net_tx_bytes_per_sec@@tcp_retransmits@@tcp_inuse@@tcp_time_wait@@sockets_used]
+                        # Unknown values are empty
+                        event = BrokerSampleEvent(
+                            timestamp=self._parse_timestamp(parts[1]),
+                            cpu_usage_percent=float(parts[2]) if parts[2] else None,
+                            mem_usage_percent=float(parts[3]) if parts[3] else None,
+                            cpu_active_seconds=float(parts[4]) if len(parts) > 4 and parts[4] else None,
+                            mem_bytes=int(parts[5]) if len(parts) > 5 and parts[5] else None,
+                            voluntary_ctx_switches=int(parts[6]) if len(parts) > 6 and parts[6] else None,
+                            involuntary_ctx_switches=int(parts[7]) if len(parts) > 7 and parts[7] else None,
+                            open_fds=int(parts[8]) if len(parts) > 8 and parts[8] else None,
+                            net_rx_bytes_per_sec=float(parts[9]) if len(parts) > 9 and parts[9] else None,
+                            net_tx_bytes_per_sec=float(parts[10]) if len(parts) > 10 and parts[10] else None,
+                            tcp_retransmits=int(parts[11]) if len(parts) > 11 and parts[11] else None,
+                            tcp_sockets_inuse=int(parts[12]) if len(parts) > 12 and parts[12] else None,
+                            tcp_sockets_time_wait=int(parts[13]) if len(parts) > 13 and parts[13] else None,
+                            sockets_used=int(parts[14]) if len(parts) > 14 and parts[14] else None
+                        )
+                        self.broker_sample_events.append(event)
+
+                    elif label == BROKER_SYS_LABEL:
+                        # BROKER_SYS@@timestamp@@topic@@value
+                        self.broker_sys_samples.setdefault(parts[2], []).append((self._parse_timestamp(parts[1]), float(parts[3])))
+
+                    elif label == CALIBRATION_LABEL:
+                        # CALIBRATION@@timestamp@@benchmark_id@@pm_method@@saturate@@duration_s@@publish_count@@recv_count
+                        self.calibration_records.append((parts[2], parts[3], parts[4] == "1", float(parts[5]), int(parts[6]), int(parts[7])))
+
+                    elif label == LATENCY_HISTOGRAM_LABEL:
+                        # LATENCY_HISTOGRAM@@timestamp@@benchmark_id@@client_id@@count@@total@@min@@max@@buckets
+                        self.latency_histograms[parts[3]] = LatencyHistogram.decode(
+                            parts[8],
+                            count=int(parts[4]),
+                            total=int(parts[5]),
+                            min_value=int(parts[6]),
+                            max_value=int(parts[7])
+                        )
+
                 except (IndexError, ValueError) as e:
                     print(f"Error parsing line: {line}")
                     print(f"Error: {e}")
@@ -383,6 +810,22 @@ class MetricsCalculator:
 
         return True
     
+    def _parse_timestamp(self, value: str) -> float:
+        """Convert a logged timestamp to seconds
+
+        Logs with a clock anchor record integer nanoseconds from a monotonic counter, which
+        are converted to seconds since the anchor. Older logs record wall clock seconds directly.
+        """
+        if self.clock_anchor_ns is None:
+            return float(value)
+        return (int(value) - self.clock_anchor_ns) / 1e9
+
+    def to_wall_time(self, timestamp: float) -> float:
+        """Convert a parsed event timestamp back to wall clock seconds since the epoch"""
+        if self.clock_anchor_wall_ns is None:
+            return timestamp
+        return self.clock_anchor_wall_ns / 1e9 + timestamp
+
     def _parse_subscription_periods(self) -> None:        
         for client_id, sub_list in self.subscriber_subscriptions.items():
             
@@ -436,21 +879,142 @@ class MetricsCalculator:
 
         return stats
 
+    def _get_run_bounds(self) -> Tuple[float, float]:
+        """Get the timestamps of the first and last messaging or connection event of the run"""
+        timestamps = [event.timestamp for events in (self.connect_events, self.disconnect_events,
+                                                    self.publish_events, self.recv_events,
+                                                    self.op_publish_events)
+                      for event in events]
+        if not timestamps:
+            return 0.0, 0.0
+        return min(timestamps), max(timestamps)
+
+    def find_measurement_window(self) -> Tuple[float, float, bool]:
+        """Find the time range over which messaging metrics are calculated
+
+        The warm-up and cool-down are first cut from the run, then the steady-state
+        detector narrows the remainder if enabled.
+
+        Returns
+        -------
+        Tuple[float, float, bool]
+            The start and end timestamps of the window and whether a steady state was detected
+        """
+        run_start, run_end = self._get_run_bounds()
+        window_start = run_start + self.warmup_s
+        window_end = run_end - self.cooldown_s
+        if window_end < window_start:
+            print(f"Warning: Warm-up and cool-down cover the whole run, using the full run instead")
+            return run_start, run_end, False
+
+        if self.detect_steady_state:
+            steady_window = self._detect_steady_state(window_start, window_end)
+            if steady_window is not None:
+                return steady_window[0], steady_window[1], True
+            print(f"Warning: No steady state found, using the full measurement window")
+
+        return window_start, window_end, False
+
+    def _detect_steady_state(self, window_start: float, window_end: float) -> Optional[Tuple[float, float]]:
+        """Find the range in which windowed throughput and latency have stabilised
+
+        Deliveries are binned into windows of STEADY_STATE_WINDOW_S. A window is stable when its
+        delivery count and mean latency are within tolerance of the medians over all windows.
+        The steady state runs from the first to the last run of STEADY_STATE_MIN_WINDOWS stable windows.
+
+        Parameters
+        ----------
+        window_start : float
+            The earliest timestamp to consider
+        window_end : float
+            The latest timestamp to consider
+
+        Returns
+        -------
+        Optional[Tuple[float, float]]
+            The start and end timestamps of the steady state, or None if there is none
+        """
+        window_count = int((window_end - window_start) / STEADY_STATE_WINDOW_S)
+        if window_count < STEADY_STATE_MIN_WINDOWS:
+            return None
+
+        publish_map = self._get_publish_time_map()
+        recv_counts = [0] * window_count
+        latency_sums = [0.0] * window_count
+        latency_counts = [0] * window_count
+        for recv_event in self.recv_events:
+            index = int((recv_event.timestamp - window_start) / STEADY_STATE_WINDOW_S)
+            if index < 0 or index >= window_count:
+                continue
+            recv_counts[index] += 1
+            key = (recv_event.sending_client_id, recv_event.corr_data)
+            if key in publish_map:
+                latency_sums[index] += recv_event.timestamp - publish_map[key]
+                latency_counts[index] += 1
+
+        median_recv_count = statistics.median(recv_counts)
+        if median_recv_count == 0:
+            return None
+
+        window_latencies = [latency_sums[i] / latency_counts[i] for i in range(window_count) if latency_counts[i] > 0]
+        median_latency = statistics.median(window_latencies) if window_latencies else 0.0
+
+        stable: List[bool] = []
+        for i in range(window_count):
+            throughput_stable = abs(recv_counts[i] - median_recv_count) <= STEADY_STATE_THROUGHPUT_TOLERANCE * median_recv_count
+            # Windows without matched deliveries give no latency evidence either way
+            latency_stable = (latency_counts[i] == 0 or
+                              abs(latency_sums[i] / latency_counts[i] - median_latency) <= STEADY_STATE_LATENCY_TOLERANCE * median_latency)
+            stable.append(throughput_stable and latency_stable)
+
+        # Find the first and last runs of consecutive stable windows
+        first_index: Optional[int] = None
+        last_index: Optional[int] = None
+        run_length = 0
+        for i in range(window_count):
+            run_length = run_length + 1 if stable[i] else 0
+            if run_length >= STEADY_STATE_MIN_WINDOWS:
+                if first_index is None:
+                    first_index = i - STEADY_STATE_MIN_WINDOWS + 1
+                last_index = i
+
+        if first_index is None or last_index is None:
+            return None
+
+        return (window_start + first_index * STEADY_STATE_WINDOW_S,
+                window_start + (last_index + 1) * STEADY_STATE_WINDOW_S)
+
+    def _get_publish_time_map(self) -> Dict[Tuple[str, int], float]:
+        """Map (client_id, corr_data) of each publish to its timestamp"""
+        publish_map: Dict[Tuple[str, int], float] = {}
+        for pub_event in self.publish_events:
+            key = (pub_event.client_id, pub_event.corr_data)
+            publish_map[key] = pub_event.timestamp
+        return publish_map
+
     def calculate_messaging_stats(self) -> MessagingStats:
-        """Calculate messaging performance"""
+        """Calculate messaging performance within the measurement window"""
         stats = MessagingStats()
 
+        # Only consider messages within the measurement window
+        run_start, _ = self._get_run_bounds()
+        window_start, window_end, stats.steady_state_detected = self.find_measurement_window()
+        stats.window_start_s = window_start - run_start
+        stats.window_end_s = window_end - run_start
+        window_limited = self.warmup_s > 0 or self.cooldown_s > 0 or stats.steady_state_detected
+
+        recv_events = [e for e in self.recv_events if window_start <= e.timestamp <= window_end]
+        publish_events = [e for e in self.publish_events if window_start <= e.timestamp <= window_end]
+        op_publish_events = [e for e in self.op_publish_events if window_start <= e.timestamp <= window_end]
+
         # Calculate latencies by matching publish and recv events
         latencies: List[float] = []
 
         # Create mapping of (client_id, corr_data) to publish timestamp
-        publish_map: Dict[Tuple[str, int], float] = {}
-        for pub_event in self.publish_events:
-            key = (pub_event.client_id, pub_event.corr_data)
-            publish_map[key] = pub_event.timestamp
+        publish_map = self._get_publish_time_map()
 
         # Match recv events with publish events
-        for recv_event in self.recv_events:
+        for recv_event in recv_events:
             key = (recv_event.sending_client_id, recv_event.corr_data)
             if key in publish_map:
                 latency_ms = (recv_event.timestamp - publish_map[key]) * 1000.0
@@ -464,22 +1028,52 @@ class MetricsCalculator:
             if len(latencies) > 1:
                 stats.latency_variance_ms = statistics.variance(latencies)
 
-        # Calculate throughput
-        stats.total_data_msg_count = len(self.recv_events)
-        if self.recv_events:
-            test_duration_s = (
-                self.recv_events[-1].timestamp - self.recv_events[0].timestamp
-            )
+        # Summarize latencies measured in-band by the receivers, these histograms are
+        # logged once per test so they always cover the whole run
+        if self.latency_histograms:
+            inband_latencies = LatencyHistogram()
+            for histogram in self.latency_histograms.values():
+                inband_latencies.merge(histogram)
+
+            stats.inband_latency_count = inband_latencies.count
+            stats.inband_latency_min_ms = (inband_latencies.min_value or 0) / 1e6
+            stats.inband_latency_max_ms = (inband_latencies.max_value or 0) / 1e6
+            stats.inband_latency_avg_ms = inband_latencies.mean() / 1e6
+            stats.inband_latency_p50_ms = inband_latencies.percentile(50) / 1e6
+            stats.inband_latency_p99_ms = inband_latencies.percentile(99) / 1e6
+
+            # The log join is kept as a cross-check of the in-band measurement
+            if latencies and not window_limited:
+                stats.latency_crosscheck_delta_ms = stats.inband_latency_avg_ms - stats.latency_avg_ms
+
+        # Calculate throughput, over the whole window if it was limited
+        stats.total_data_msg_count = len(recv_events)
+        if recv_events:
+            if window_limited:
+                test_duration_s = window_end - window_start
+            else:
+                test_duration_s = (
+                    recv_events[-1].timestamp - recv_events[0].timestamp
+                )
             if test_duration_s > 0:
-                stats.throughput_msgs_per_sec = len(self.recv_events) / test_duration_s
+                stats.throughput_msgs_per_sec = len(recv_events) / test_duration_s
 
         # Count non-data messages
-        stats.non_data_msg_count = len(self.op_publish_events)
+        stats.non_data_msg_count = len(op_publish_events)
+
+        # Use the header size of data messages measured by the clients if they
+        # logged it, these counts are totals for the whole run
+        sent_publishes = [value for (_, direction, packet_type, traffic_class), value in self.wire_bytes.items()
+                          if direction == "OUT" and packet_type == "PUBLISH" and traffic_class == GlobalDefs.TrafficClass.DATA.value]
+        sent_publish_count = sum(packets for packets, _, _ in sent_publishes)
+        if sent_publish_count > 0:
+            stats.avg_header_size_bytes = sum(total - payload for _, total, payload in sent_publishes) / sent_publish_count
+            return stats
 
         # Calculate average header size (estimate based on MQTT v5)
         # This is a simplified estimation
         header_sizes: List[int] = []
-        for pub_event in self.publish_events:
+        for pub_event in publish_events:
             # MQTT v5 fixed header: ~2-5 bytes
             # Variable header for PUBLISH: topic length + topic + properties
             # Properties: purpose (user property) + correlation data
@@ -496,77 +1090,650 @@ class MetricsCalculator:
 
         return stats
 
+    def calculate_wire_stats(self) -> Optional[WireStats]:
+        """Calculate bytes on the wire from the per-client packet counts
+
+        Every packet is counted by both the client sending it and the client receiving it, with
+        the broker in between, so the totals are the bytes crossing the clients' connections.
+        Data PUBLISH packets are the data plane and everything else, including registrations,
+        operational messages and acknowledgements, is the control plane.
+
+        Returns
+        -------
+        Optional[WireStats]
+            The byte counts, or None if the log has no packet counts
+        """
+        if not self.wire_bytes:
+            return None
+
+        stats = WireStats()
+        for (_, direction, packet_type, traffic_class), (_, total_bytes, payload_bytes) in self.wire_bytes.items():
+            stats.total_bytes += total_bytes
+            stats.payload_bytes += payload_bytes
+            if direction == "OUT":
+                stats.sent_bytes += total_bytes
+            else:
+                stats.received_bytes += total_bytes
+            if traffic_class != GlobalDefs.TrafficClass.DATA.value:
+                stats.control_bytes += total_bytes
+
+            if packet_type == "PUBLISH":
+                type_key = f"{direction} {packet_type} {traffic_class}"
+            else:
+                type_key = f"{direction} {packet_type}"
+            stats.packet_type_bytes[type_key] = stats.packet_type_bytes.get(type_key, 0) + total_bytes
+
+        stats.header_bytes = stats.total_bytes - stats.payload_bytes
+        if stats.payload_bytes > 0:
+            stats.header_payload_ratio = stats.header_bytes / stats.payload_bytes
+        if stats.total_bytes > 0:
+            stats.control_plane_share = stats.control_bytes / stats.total_bytes
+
+        run_start, run_end = self._get_run_bounds()
+        if run_end > run_start:
+            stats.bytes_per_sec = stats.total_bytes / (run_end - run_start)
+
+        return stats
+
+    def calculate_amplification_stats(self) -> AmplificationStats:
+        """Attribute the packets of the run to the logical data messages they serve
+
+        A logical message is one call to publish data, which PM_1 expands to one PUBLISH per
+        described purpose. A useful delivery is a logical message reaching a subscriber, however
+        many copies arrive. Control messages are all sent packets other than data PUBLISH packets.
+        Without packet counts in the log only the log-based values are filled in.
+
+        Returns
+        -------
+        AmplificationStats
+            The amplification and cost per useful delivery
+        """
+        stats = AmplificationStats()
+
+        logical_msgs: Set[Tuple[str, int]] = set((e.client_id, e.corr_data) for e in self.publish_events)
+        useful_deliveries: Set[Tuple[str, str, int]] = set(
+            (e.recv_client_id, e.sending_client_id, e.corr_data) for e in self.recv_events
+        )
+        stats.logical_msg_count = len(logical_msgs)
+        stats.data_publish_count = len(self.publish_events)
+        stats.delivery_count = len(self.recv_events)
+        stats.useful_delivery_count = len(useful_deliveries)
+        stats.op_request_msg_count = len([e for e in self.op_publish_events if not e.topic.startswith(GlobalDefs.OP_RESPONSE_TOPIC)])
+        stats.op_response_msg_count = len(self.op_publish_events) - stats.op_request_msg_count
+        stats.control_msg_count = len(self.op_publish_events)
+
+        if self.wire_bytes:
+            total_packets = 0
+            total_bytes = 0
+            sent_by_class: Dict[str, int] = {}
+            for (_, direction, packet_type, traffic_class), (packets, packet_bytes, _) in self.wire_bytes.items():
+                total_packets += packets
+                total_bytes += packet_bytes
+                if direction == "OUT":
+                    sent_by_class[traffic_class] = sent_by_class.get(traffic_class, 0) + packets
+
+            stats.data_publish_count = sent_by_class.get(GlobalDefs.TrafficClass.DATA.value, 0)
+            stats.registration_msg_count = sent_by_class.get(GlobalDefs.TrafficClass.REGISTRATION.value, 0)
+            stats.op_request_msg_count = sent_by_class.get(GlobalDefs.TrafficClass.OP_REQUEST.value, 0)
+            stats.op_response_msg_count = sent_by_class.get(GlobalDefs.TrafficClass.OP_RESPONSE.value, 0)
+            stats.control_msg_count = sum(sent_by_class.values()) - stats.data_publish_count
+
+            if stats.useful_delivery_count > 0:
+                stats.packets_per_useful_delivery = total_packets / stats.useful_delivery_count
+                stats.bytes_per_useful_delivery = total_bytes / stats.useful_delivery_count
+
+        if stats.logical_msg_count > 0:
+            stats.amplification_factor = stats.data_publish_count / stats.logical_msg_count
+            stats.fan_out_avg = stats.useful_delivery_count / stats.logical_msg_count
+            stats.control_msgs_per_data_msg = stats.control_msg_count / stats.logical_msg_count
+
+        return stats
+
+    def calculate_time_series(self) -> List[TimeSeriesWindow]:
+        """Calculate messaging performance per window of the run
+
+        Every event list is binned in a single pass by its offset from the start of the run,
+        publications and connection events by send time and deliveries by receive time.
+
+        Returns
+        -------
+        List[TimeSeriesWindow]
+            The windows from the start to the end of the run
+        """
+        run_start, run_end = self._get_run_bounds()
+        window_s = self.time_series_window_s
+        if window_s <= 0 or not (self.publish_events or self.recv_events):
+            return []
+
+        window_count = int((run_end - run_start) / window_s) + 1
+        windows = [TimeSeriesWindow(start_s=i * window_s) for i in range(window_count)]
+        publish_bytes = [0] * window_count
+        recv_bytes = [0] * window_count
+        latencies: List[List[float]] = [[] for _ in range(window_count)]
+
+        def window_index(timestamp: float) -> int:
+            return min(window_count - 1, max(0, int((timestamp - run_start) / window_s)))
+
+        for pub_event in self.publish_events:
+            index = window_index(pub_event.timestamp)
+            windows[index].publish_count += 1
+            publish_bytes[index] += pub_event.payload_size
+
+        publish_map = self._get_publish_time_map()
+        for recv_event in self.recv_events:
+            index = window_index(recv_event.timestamp)
+            windows[index].recv_count += 1
+            recv_bytes[index] += recv_event.payload_size
+            key = (recv_event.sending_client_id, recv_event.corr_data)
+            if key in publish_map:
+                latencies[index].append((recv_event.timestamp - publish_map[key]) * 1000.0)
+
+        for connect_event in self.connect_events:
+            windows[window_index(connect_event.timestamp)].connect_count += 1
+        for disconnect_event in self.disconnect_events:
+            windows[window_index(disconnect_event.timestamp)].disconnect_count += 1
+        for op_event in self.op_publish_events:
+            # Responses are published to the response topic, only count the requests
+            if not op_event.topic.startswith(GlobalDefs.OP_RESPONSE_TOPIC):
+                windows[window_index(op_event.timestamp)].op_request_count += 1
+        for change_event in self.purpose_change_events:
+            windows[window_index(change_event.timestamp)].purpose_change_count += 1
+
+        # Broker samples outside the run are dropped rather than clamped into the edge windows
+        cpu_samples: List[List[float]] = [[] for _ in range(window_count)]
+        mem_samples: List[List[float]] = [[] for _ in range(window_count)]
+        rx_samples: List[List[float]] = [[] for _ in range(window_count)]
+        tx_samples: List[List[float]] = [[] for _ in range(window_count)]
+        for sample_event in self.broker_sample_events:
+            if sample_event.timestamp < run_start or sample_event.timestamp >= run_start + window_count * window_s:
+                continue
+            index = window_index(sample_event.timestamp)
+            if sample_event.cpu_usage_percent is not None:
+                cpu_samples[index].append(sample_event.cpu_usage_percent)
+            if sample_event.mem_usage_percent is not None:
+                mem_samples[index].append(sample_event.mem_usage_percent)
+            if sample_event.net_rx_bytes_per_sec is not None and sample_event.net_tx_bytes_per_sec is not None:
+                rx_samples[index].append(sample_event.net_rx_bytes_per_sec)
+                tx_samples[index].append(sample_event.net_tx_bytes_per_sec)
+            if sample_event.tcp_retransmits is not None:
+                windows[index].tcp_retransmits = (windows[index].tcp_retransmits or 0) + sample_event.tcp_retransmits
+
+        for index, window in enumerate(windows):
+            window.publish_rate = window.publish_count / window_s
+            window.recv_rate = window.recv_count / window_s
+            window.publish_bytes_per_sec = publish_bytes[index] / window_s
+            window.recv_bytes_per_sec = recv_bytes[index] / window_s
+
+            if cpu_samples[index]:
+                window.cpu_usage_percent = statistics.mean(cpu_samples[index])
+            if mem_samples[index]:
+                window.mem_usage_percent = statistics.mean(mem_samples[index])
+            if rx_samples[index]:
+                window.net_rx_bytes_per_sec = statistics.mean(rx_samples[index])
+                window.net_tx_bytes_per_sec = statistics.mean(tx_samples[index])
+
+            window_latencies = latencies[index]
+            if window_latencies:
+                window_latencies.sort()
+                window.latency_p50_ms = _percentile(window_latencies, 50)
+                window.latency_p90_ms = _percentile(window_latencies, 90)
+                window.latency_p99_ms = _percentile(window_latencies, 99)
+                window.latency_max_ms = window_latencies[-1]
+
+        return windows
+
+    def calculate_broker_resource_stats(self, time_series: List[TimeSeriesWindow]) -> BrokerResourceStats:
+        """Relate broker resource samples to messaging performance
+
+        CPU usage is correlated with the latency and delivery rate of the time series windows
+        that hold a sample, and network throughput with the latency, to tell whether latency
+        follows CPU or network load. The CPU cost per message divides the active CPU time sampled within
+        the measurement window by the messages published and delivered in it. Node Exporter
+        reports host-wide CPU time, so the cost includes anything else running on the broker host
+        unless the process or cgroup monitor backend was used. Memory, context switches and open
+        file descriptors are summarized over the same window.
+
+        Parameters
+        ----------
+        time_series : List[TimeSeriesWindow]
+            The time series with broker samples already aligned to its windows
+
+        Returns
+        -------
+        BrokerResourceStats
+            The aligned resource stats
+        """
+        stats = BrokerResourceStats(sample_count=len(self.broker_sample_events))
+        if not self.broker_sample_events:
+            return stats
+
+        # Correlations only use windows with both a CPU sample and the messaging value
+        cpu_values: List[float] = []
+        latency_values: List[float] = []
+        rate_cpu_values: List[float] = []
+        rate_values: List[float] = []
+        for window in time_series:
+            if window.cpu_usage_percent is None:
+                continue
+            stats.aligned_window_count += 1
+            rate_cpu_values.append(window.cpu_usage_percent)
+            rate_values.append(window.recv_rate)
+            if window.recv_count > 0:
+                cpu_values.append(window.cpu_usage_percent)
+                latency_values.append(window.latency_p99_ms)
+
+        stats.cpu_latency_p99_correlation = _correlation(cpu_values, latency_values)
+        stats.cpu_recv_rate_correlation = _correlation(rate_cpu_values, rate_values)
+
+        net_values: List[float] = []
+        net_latency_values: List[float] = []
+        for window in time_series:
+            if window.net_rx_bytes_per_sec is not None and window.net_tx_bytes_per_sec is not None and window.recv_count > 0:
+                net_values.append(window.net_rx_bytes_per_sec + window.net_tx_bytes_per_sec)
+                net_latency_values.append(window.latency_p99_ms)
+        stats.net_latency_p99_correlation = _correlation(net_values, net_latency_values)
+
+        # Each sample holds the CPU time since the previous one, so it is attributed to where it ends
+        window_start, window_end, _ = self.find_measurement_window()
+        window_samples = [sample_event for sample_event in self.broker_sample_events
+                          if window_start < sample_event.timestamp <= window_end]
+        stats.cpu_seconds = sum(sample_event.cpu_active_seconds for sample_event in window_samples
+                                if sample_event.cpu_active_seconds is not None)
+
+        mem_values = [sample_event.mem_bytes for sample_event in window_samples if sample_event.mem_bytes is not None]
+        if mem_values:
+            stats.mem_bytes_avg = statistics.mean(mem_values)
+            stats.mem_bytes_max = max(mem_values)
+
+        stats.voluntary_ctx_switches = sum(sample_event.voluntary_ctx_switches for sample_event in window_samples
+                                           if sample_event.voluntary_ctx_switches is not None)
+        stats.involuntary_ctx_switches = sum(sample_event.involuntary_ctx_switches for sample_event in window_samples
+                                             if sample_event.involuntary_ctx_switches is not None)
+        ctx_switches = stats.voluntary_ctx_switches + stats.involuntary_ctx_switches
+        if window_end > window_start:
+            stats.ctx_switches_per_sec = ctx_switches / (window_end - window_start)
+
+        fd_values = [sample_event.open_fds for sample_event in window_samples if sample_event.open_fds is not None]
+        if fd_values:
+            stats.open_fds_max = max(fd_values)
+
+        rx_values = [sample_event.net_rx_bytes_per_sec for sample_event in window_samples if sample_event.net_rx_bytes_per_sec is not None]
+        tx_values = [sample_event.net_tx_bytes_per_sec for sample_event in window_samples if sample_event.net_tx_bytes_per_sec is not None]
+        stats.network_sampled = any(sample_event.tcp_sockets_inuse is not None or sample_event.net_rx_bytes_per_sec is not None
+                                    for sample_event in window_samples)
+        if rx_values:
+            stats.net_rx_bytes_per_sec_avg = statistics.mean(rx_values)
+            stats.net_rx_bytes_per_sec_max = max(rx_values)
+        if tx_values:
+            stats.net_tx_bytes_per_sec_avg = statistics.mean(tx_values)
+            stats.net_tx_bytes_per_sec_max = max(tx_values)
+
+        stats.tcp_retransmits = sum(sample_event.tcp_retransmits for sample_event in window_samples
+                                    if sample_event.tcp_retransmits is not None)
+        if window_end > window_start:
+            stats.tcp_retransmits_per_sec = stats.tcp_retransmits / (window_end - window_start)
+        stats.tcp_sockets_inuse_max = max((sample_event.tcp_sockets_inuse for sample_event in window_samples
+                                           if sample_event.tcp_sockets_inuse is not None), default=0)
+        stats.tcp_sockets_time_wait_max = max((sample_event.tcp_sockets_time_wait for sample_event in window_samples
+                                               if sample_event.tcp_sockets_time_wait is not None), default=0)
+        stats.sockets_used_max = max((sample_event.sockets_used for sample_event in window_samples
+                                      if sample_event.sockets_used is not None), default=0)
+
+        publish_count = sum(1 for pub_event in self.publish_events if window_start <= pub_event.timestamp <= window_end)
+        delivery_count = sum(1 for recv_event in self.recv_events if window_start <= recv_event.timestamp <= window_end)
+        if publish_count > 0:
+            stats.cpu_us_per_publish = stats.cpu_seconds * 1e6 / publish_count
+        if delivery_count > 0:
+            stats.cpu_us_per_delivery = stats.cpu_seconds * 1e6 / delivery_count
+            stats.ctx_switches_per_delivery = ctx_switches / delivery_count
+
+        return stats
+
+    def calculate_broker_sys_stats(self) -> Dict[str, BrokerSysTopicStats]:
+        """Summarize the broker's $SYS statistics over the measurement window
+
+        The change is the difference between the last and first value in the window, which
+        gives the count over the window for cumulative counters such as messages received.
+
+        Returns
+        -------
+        Dict[str, BrokerSysTopicStats]
+            Stats by $SYS topic
+        """
+        all_stats: Dict[str, BrokerSysTopicStats] = {}
+        window_start, window_end, _ = self.find_measurement_window()
+
+        for topic, samples in sorted(self.broker_sys_samples.items()):
+            values = [value for timestamp, value in sorted(samples) if window_start <= timestamp <= window_end]
+            if not values:
+                continue
+
+            all_stats[topic] = BrokerSysTopicStats(
+                topic=topic,
+                sample_count=len(values),
+                min_value=min(values),
+                max_value=max(values),
+                avg_value=statistics.mean(values),
+                change=values[-1] - values[0]
+            )
+
+        return all_stats
+
+    def calculate_calibration(self) -> Optional[CalibrationStats]:
+        """Calculate the publish and receive rates reached without a broker
+
+        Tests of one benchmark node run one after another, so their durations add up,
+        while nodes run side by side, so the longest node gives the duration.
+
+        Returns
+        -------
+        Optional[CalibrationStats]
+            The calibration, or None if the run was against a broker
+        """
+        if not self.calibration_records:
+            return None
+
+        stats = CalibrationStats(pm_method=self.calibration_records[0][1])
+        duration_by_node: Dict[str, float] = {}
+        for benchmark_id, _, saturate, duration_s, publish_count, recv_count in self.calibration_records:
+            duration_by_node[benchmark_id] = duration_by_node.get(benchmark_id, 0.0) + duration_s
+            stats.saturate = stats.saturate or saturate
+            stats.publish_count += publish_count
+            stats.recv_count += recv_count
+
+        stats.duration_s = max(duration_by_node.values())
+        if stats.duration_s > 0:
+            stats.publish_rate = stats.publish_count / stats.duration_s
+            stats.recv_rate = stats.recv_count / stats.duration_s
+
+        return stats
+
+    def calculate_purpose_propagation(self) -> Dict[str, PurposePropagationStats]:
+        """Calculate how quickly purpose changes are enforced per device type
+
+        Each change is followed until the next change of the same device. Only deliveries that
+        the old and new purposes disagree on are used: the first one allowed only by the new purpose
+        marks when it took effect and the last one allowed only by the old purpose marks when the old
+        purpose stopped being enforced. Subscriber changes are judged on the deliveries to the
+        subscriber, publisher changes on the deliveries of messages published after the change.
+
+        Returns
+        -------
+        Dict[str, PurposePropagationStats]
+            The propagation delays keyed by device type
+        """
+        results: Dict[str, PurposePropagationStats] = {}
+        new_purpose_delays: Dict[str, List[float]] = {}
+        old_purpose_delays: Dict[str, List[float]] = {}
+
+        publish_map: Dict[Tuple[str, int], PublishEvent] = {}
+        for pub_event in self.publish_events:
+            publish_map[(pub_event.client_id, pub_event.corr_data)] = pub_event
+
+        changes_by_client: Dict[str, List[PurposeChangeEvent]] = {}
+        for change_event in self.purpose_change_events:
+            changes_by_client.setdefault(change_event.client_id, []).append(change_event)
+
+        for client_id, changes in changes_by_client.items():
+            changes.sort(key=lambda e: e.timestamp)
+            is_subscriber = client_id in self.subscriber_subscriptions
+
+            if is_subscriber:
+                deliveries = [e for e in self.recv_events if e.recv_client_id == client_id]
+            else:
+                deliveries = [e for e in self.recv_events if e.sending_client_id == client_id]
+
+            for index, change_event in enumerate(changes):
+                end_time = changes[index + 1].timestamp if index + 1 < len(changes) else sys.float_info.max
+                first_new_time: Optional[float] = None
+                last_old_time: Optional[float] = None
+
+                for recv_event in deliveries:
+                    if recv_event.timestamp < change_event.timestamp or recv_event.timestamp >= end_time:
+                        continue
+
+                    pub_event = publish_map.get((recv_event.sending_client_id, recv_event.corr_data))
+                    if pub_event is None:
+                        continue
+
+                    if is_subscriber:
+                        allowed_by_new = GlobalDefs.purpose_described_by_filter(pub_event.purpose, change_event.new_purpose)
+                        allowed_by_old = GlobalDefs.purpose_described_by_filter(pub_event.purpose, change_event.old_purpose)
+                    else:
+                        # Messages published before the change are expected to carry the old purpose
+                        if pub_event.timestamp < change_event.timestamp:
+                            continue
+                        purpose_filter = self._get_purpose_filter_at(recv_event.recv_client_id, pub_event.topic, recv_event.timestamp)
+                        if purpose_filter is None:
+                            continue
+                        allowed_by_new = GlobalDefs.purpose_described_by_filter(change_event.new_purpose, purpose_filter)
+                        allowed_by_old = GlobalDefs.purpose_described_by_filter(change_event.old_purpose, purpose_filter)
+
+                    if allowed_by_new and not allowed_by_old:
+                        if first_new_time is None or recv_event.timestamp < first_new_time:
+                            first_new_time = recv_event.timestamp
+                    elif allowed_by_old and not allowed_by_new:
+                        if last_old_time is None or recv_event.timestamp > last_old_time:
+                            last_old_time = recv_event.timestamp
+
+                device_type = change_event.device_type
+                if device_type not in results:
+                    results[device_type] = PurposePropagationStats(device_type=device_type)
+                    new_purpose_delays[device_type] = []
+                    old_purpose_delays[device_type] = []
+
+                results[device_type].change_count += 1
+                if first_new_time is not None:
+                    new_purpose_delays[device_type].append((first_new_time - change_event.timestamp) * 1000.0)
+                if last_old_time is not None:
+                    old_purpose_delays[device_type].append((last_old_time - change_event.timestamp) * 1000.0)
+
+        for device_type, stats in results.items():
+            if new_purpose_delays[device_type]:
+                stats.new_purpose_observed = len(new_purpose_delays[device_type])
+                stats.new_purpose_delay_avg_ms = statistics.mean(new_purpose_delays[device_type])
+                stats.new_purpose_delay_max_ms = max(new_purpose_delays[device_type])
+            if old_purpose_delays[device_type]:
+                stats.old_purpose_observed = len(old_purpose_delays[device_type])
+                stats.old_purpose_delay_avg_ms = statistics.mean(old_purpose_delays[device_type])
+                stats.old_purpose_delay_max_ms = max(old_purpose_delays[device_type])
+
+        return results
+
+    def _build_subscription_index(self) -> None:
+        """Index every subscription by topic filter and by subscription identifier"""
+        self.subscription_index = TopicFilterTrie()
+        for sub in self.subscribe_events:
+            self.subscription_index.add(sub.topic_filter, sub)
+            if sub.sub_id not in MISSING_SUB_IDS:
+                self.subscriptions_by_id.setdefault((sub.client_id, sub.sub_id), []).append(sub)
+
+    def _get_topic_subscriptions(self, topic: str) -> Dict[str, List[SubscribeEvent]]:
+        """Get every subscription whose topic filter matches a topic, keyed by subscriber"""
+        subscriptions = self.topic_subscriptions.get(topic)
+        if subscriptions is None:
+            if self.subscription_index is None:
+                self._build_subscription_index()
+
+            subscriptions = {}
+            for sub in self.subscription_index.match(topic):
+                subscriptions.setdefault(sub.client_id, []).append(sub)
+            self.topic_subscriptions[topic] = subscriptions
+        return subscriptions
+
+    def _get_subscription_end(self, sub: SubscribeEvent) -> float:
+        """Get the last time a subscription was live, which is unbounded until subscription periods are parsed"""
+        return sub.end_timestamp if sub.end_timestamp is not None else sys.float_info.max
+
+    def _get_recv_subscription(self, recv_event: RecvEvent) -> Optional[SubscribeEvent]:
+        """Get the subscription a message was delivered on from its subscription identifier, if it carried a known one"""
+        if recv_event.sub_id in MISSING_SUB_IDS:
+            return None
+        if self.subscription_index is None:
+            self._build_subscription_index()
+
+        # PM4 purpose changes keep the identifier, so take the latest subscription using it at reception
+        delivered_on: Optional[SubscribeEvent] = None
+        for sub in self.subscriptions_by_id.get((recv_event.recv_client_id, recv_event.sub_id), []):
+            if sub.timestamp <= recv_event.timestamp and (delivered_on is None or sub.timestamp >= delivered_on.timestamp):
+                delivered_on = sub
+        return delivered_on
+
+    def _get_purpose_filter_at(self, client_id: str, topic: str, timestamp: float) -> Optional[str]:
+        """Get the purpose filter of the client's latest subscription covering the topic at a time"""
+        latest_sub: Optional[SubscribeEvent] = None
+        for sub in self._get_topic_subscriptions(topic).get(client_id, []):
+            if sub.timestamp <= timestamp <= sub.end_timestamp:
+                if latest_sub is None or sub.timestamp > latest_sub.timestamp:
+                    latest_sub = sub
+        return latest_sub.purpose_filter if latest_sub is not None else None
+
+    def _get_publish_segments(self) -> Tuple[List[float], Dict[Tuple[str, str], int], Dict[Tuple[int, int], List[PublishEvent]],
+                                             Dict[Tuple[str, int], List[Tuple[PublishEvent, int, int]]]]:
+        """Group data publishes by the time segment they fall in and by their topic and purpose
+
+        Returns
+        -------
+        Tuple[List[float], Dict[Tuple[str, str], int], Dict[Tuple[int, int], List[PublishEvent]], Dict[Tuple[str, int], List[Tuple[PublishEvent, int, int]]]]
+            The segment boundaries, the index of each topic and purpose key, the publishes of each
+            segment and key, and the records of each publisher and correlation data with their segment and key
+        """
+        if self.publish_segments is None:
+            # Subscriptions only start and end at these times, so which are live is fixed within each segment between them
+            boundaries = sorted(set(itertools.chain.from_iterable(
+                (sub.timestamp, self._get_subscription_end(sub)) for sub in self.subscribe_events)))
+
+            # Every publish with the same topic and purpose in the same segment is eligible for the same subscriptions,
+            # so expected deliveries are counted per group rather than per publish
+            publish_keys: Dict[Tuple[str, str], int] = {}
+            publish_groups: Dict[Tuple[int, int], List[PublishEvent]] = {}
+            publish_records: Dict[Tuple[str, int], List[Tuple[PublishEvent, int, int]]] = {}
+            for pub_event in self.publish_events:
+                if pub_event.msg_type != "DATA":
+                    continue
+                key_index = publish_keys.setdefault((pub_event.topic, pub_event.purpose), len(publish_keys))
+                segment = _get_time_segment(boundaries, pub_event.timestamp)
+                publish_groups.setdefault((segment, key_index), []).append(pub_event)
+
+                # PM1 logs a record per described purpose under the same correlation data
+                publish_records.setdefault((pub_event.client_id, pub_event.corr_data), []).append((pub_event, segment, key_index))
+
+            self.publish_segments = (boundaries, publish_keys, publish_groups, publish_records)
+        return self.publish_segments
+
+    def _get_subscriber_masks(self, subscriber_id: str) -> Tuple[List[int], List[int]]:
+        """Get which of a subscriber's subscriptions are live in each segment and eligible for each publish key
+
+        Each of the subscriber's subscriptions is a bit, so a publish is expected once per bit set in
+        both the live mask of its segment and the eligible mask of its topic and purpose
+
+        Parameters
+        ----------
+        subscriber_id : str
+            The subscriber whose subscriptions to look at
+
+        Returns
+        -------
+        Tuple[List[int], List[int]]
+            The live masks indexed by segment and the eligible masks indexed by publish key
+        """
+        masks = self.subscriber_masks.get(subscriber_id)
+        if masks is None:
+            boundaries, publish_keys, _, _ = self._get_publish_segments()
+            subscriptions = self.subscriber_subscriptions.get(subscriber_id, [])
+            sub_bits: Dict[int, int] = {id(sub): 1 << index for index, sub in enumerate(subscriptions)}
+
+            # A subscription is live from the segment of its start through the segment of its end
+            live_changes = [0] * (2 * len(boundaries) + 2)
+            for sub in subscriptions:
+                live_changes[_get_time_segment(boundaries, sub.timestamp)] += sub_bits[id(sub)]
+                live_changes[_get_time_segment(boundaries, self._get_subscription_end(sub)) + 1] -= sub_bits[id(sub)]
+            live_masks = list(itertools.accumulate(live_changes))
+
+            eligible_masks = [0] * len(publish_keys)
+            for (topic, purpose), key_index in publish_keys.items():
+                for sub in self._get_topic_subscriptions(topic).get(subscriber_id, []):
+                    if GlobalDefs.purpose_described_by_filter(purpose, sub.purpose_filter):
+                        eligible_masks[key_index] |= sub_bits[id(sub)]
+
+            masks = (live_masks, eligible_masks)
+            self.subscriber_masks[subscriber_id] = masks
+        return masks
+
     def calculate_purpose_correctness(self) -> Dict[str, SubscriberPurposeCorrectness]:
         """Calculate purpose correctness per subscriber"""
         results: Dict[str, SubscriberPurposeCorrectness] = {}
+        _, _, publish_groups, publish_records = self._get_publish_segments()
+
+        recvs_by_subscriber: Dict[str, List[RecvEvent]] = {}
+        for recv_event in self.recv_events:
+            recvs_by_subscriber.setdefault(recv_event.recv_client_id, []).append(recv_event)
 
         # For each subscriber, check if received messages match their purpose filter
         for subscriber_id, subscriptions in self.subscriber_subscriptions.items():
             metrics = SubscriberPurposeCorrectness(subscriber_id=subscriber_id)
 
             # Get all messages received by this subscriber
-            subscriber_recvs = [
-                recv for recv in self.recv_events
-                if recv.recv_client_id == subscriber_id
-            ]
+            subscriber_recvs = recvs_by_subscriber.get(subscriber_id, [])
 
             metrics.total_recv_count = len(subscriber_recvs)
 
             # For each received message, check if purpose matches any subscription
             for recv_event in subscriber_recvs:
                 # Find the corresponding publish event to get the purpose
-                matching_pubs = [
-                    pub for pub in self.publish_events
-                    if pub.client_id == recv_event.sending_client_id
-                    and pub.corr_data == recv_event.corr_data
-                ]
-
-                if not matching_pubs:
+                pub_records = publish_records.get((recv_event.sending_client_id, recv_event.corr_data))
+                if not pub_records:
                     continue
 
-                pub_event = matching_pubs[0]
+                pub_event = pub_records[0][0]
 
-                # Check if this message's purpose matches any of the subscriber's filters during the subscription time
-                for sub in subscriptions:
-                    topic_matched = topic_matches_sub(sub.topic_filter, pub_event.topic)
+                # The broker names the subscription it delivered on, whose filters decided the delivery when it was routed
+                sub = self._get_recv_subscription(recv_event)
+                if sub is not None:
+                    if sub not in self._get_topic_subscriptions(pub_event.topic).get(subscriber_id, []):
+                        metrics.wrong_sub_recv_count += 1
+                        metrics.invalid_recv_count += 1
+                    elif GlobalDefs.purpose_described_by_filter(pub_event.purpose, sub.purpose_filter):
+                        metrics.valid_recv_count += 1
+                    else:
+                        metrics.invalid_recv_count += 1
+                    continue
+
+                # Otherwise check if this message's purpose matches any of the subscriber's filters for its topic during the subscription time
+                for sub in self._get_topic_subscriptions(pub_event.topic).get(subscriber_id, []):
                     purpose_matched = GlobalDefs.purpose_described_by_filter(pub_event.purpose, sub.purpose_filter)
                     time_valid = (recv_event.timestamp >= sub.timestamp and (sub.end_timestamp is None or recv_event.timestamp <= sub.end_timestamp))
                     
-                    if topic_matched and purpose_matched and time_valid:
+                    if purpose_matched and time_valid:
                         metrics.valid_recv_count += 1
-                    elif time_valid and topic_matched and not purpose_matched:
+                    elif time_valid and not purpose_matched:
                         metrics.invalid_recv_count += 1
 
             # Calculate expected message count
             # For this, we need to check all messages sent, and see if there was a valid subscription
-            # during this time. This is similar to above, but we care about pub events not recv events
-            for pub_event in self.publish_events:
-                
-                # Get recv events that match this pub for later
-                recv_events_for_pub = [e for e in subscriber_recvs 
-                                        if e.corr_data == pub_event.corr_data
-                                        and e.sending_client_id == pub_event.client_id
-                                        and e.topic.startswith(pub_event.topic)]
-                
-                # Check if we have a subscription for this message with compatible purposes and the relevant time
-                matched_subs = 0
-                for sub in subscriptions:
-                    
-                    topic_matched = topic_matches_sub(sub.topic_filter, pub_event.topic)
-                    purpose_matched = GlobalDefs.purpose_described_by_filter(pub_event.purpose, sub.purpose_filter)
-                    time_valid = (pub_event.timestamp >= sub.timestamp and (sub.end_timestamp is None or pub_event.timestamp <= sub.end_timestamp))
-                    
-                    if topic_matched and purpose_matched and time_valid:
-                        matched_subs += 1
-                        
-                        
-                if matched_subs > 0:
-                    metrics.expected_msg_count += matched_subs
-                    actual_received = len(recv_events_for_pub)    
-                    
-                    if actual_received < matched_subs:
-                        metrics.bad_reject += (matched_subs - actual_received)               
-            
+            # during this time. A publish is expected once per subscription that is both live in its
+            # segment and eligible for its topic and purpose
+            live_masks, eligible_masks = self._get_subscriber_masks(subscriber_id)
+
+            for (segment, key_index), group in publish_groups.items():
+                if eligible_masks[key_index]:
+                    metrics.expected_msg_count += len(group) * (live_masks[segment] & eligible_masks[key_index]).bit_count()
+
+            # Every expected delivery is a false reject unless one of the publish's receptions accounts for it,
+            # so only the publishes this subscriber received need to be looked at individually
+            received_topics: Dict[Tuple[str, int], List[str]] = {}
+            for recv_event in subscriber_recvs:
+                received_topics.setdefault((recv_event.sending_client_id, recv_event.corr_data), []).append(recv_event.topic)
+
+            delivered_count = 0
+            for key, topics in received_topics.items():
+                for pub_event, segment, key_index in publish_records.get(key, []):
+                    matched_subs = (live_masks[segment] & eligible_masks[key_index]).bit_count()
+                    if matched_subs > 0:
+                        actual_received = sum(1 for topic in topics if topic.startswith(pub_event.topic))
+                        delivered_count += min(matched_subs, actual_received)
+            metrics.bad_reject = metrics.expected_msg_count - delivered_count
+
             # Calculate false accept and false reject
             if metrics.total_recv_count > 0:
                 metrics.false_accept = metrics.invalid_recv_count / metrics.total_recv_count
@@ -625,7 +1792,7 @@ class MetricsCalculator:
             relevant_sub_clients = list()
             for pub in pubs_by_client:
                 
-                for subscriber_id, subs in self.subscriber_subscriptions.items():
+                for subscriber_id, subs in self._get_topic_subscriptions(pub.topic).items():
                     
                     # Don't run this if we already have this subscriber
                     if subscriber_id in relevant_sub_clients:
@@ -634,11 +1801,10 @@ class MetricsCalculator:
                     found = False      
                     for sub in subs:
                         
-                        topic_matched = topic_matches_sub(sub.topic_filter, pub.topic)
                         purpose_matched = GlobalDefs.purpose_described_by_filter(pub.purpose, sub.purpose_filter)
                         time_valid = (pub.timestamp >= sub.timestamp and (sub.end_timestamp is None or pub.timestamp <= sub.end_timestamp))
                         
-                        if topic_matched and purpose_matched and time_valid:
+                        if purpose_matched and time_valid:
                             found = True
                             break
                         
@@ -700,6 +1866,229 @@ class MetricsCalculator:
 
         return results
 
+    def calculate_op_latency(self) -> Tuple[Dict[str, OPLatencyStats], Dict[str, OPLatencyStats]]:
+        """Calculate operational request round-trip latency
+
+        For every request the delay until its first and last response is measured, along with
+        the fan-in rate at which the responses arrived between them. Broker responses are included
+        as they are the only answer some C1 requests get.
+
+        Returns
+        -------
+        Tuple[Dict[str, OPLatencyStats], Dict[str, OPLatencyStats]]
+            The latencies keyed by op type and keyed by op category
+        """
+        # Index responses by the requesting client, op type and request ID
+        responses: Dict[Tuple[str, str, int], List[float]] = {}
+        for resp_recv in self.op_resp_recv_events:
+            key = (resp_recv.recv_client_id, resp_recv.op_type, resp_recv.corr_data)
+            responses.setdefault(key, []).append(resp_recv.timestamp)
+
+        # Collect the per request values for each grouping
+        groups: Dict[str, Dict[str, Tuple[OPLatencyStats, List[float], List[float], List[float]]]] = {"type": {}, "category": {}}
+        for op_pub in self.op_publish_events:
+            if op_pub.topic.startswith(GlobalDefs.OP_RESPONSE_TOPIC):
+                continue  # Skip responses, we only want the original requests
+
+            response_times = responses.get((op_pub.client_id, op_pub.op_type, op_pub.corr_data), [])
+
+            for grouping, group_key in (("type", op_pub.op_type), ("category", op_pub.op_category)):
+                if group_key not in groups[grouping]:
+                    groups[grouping][group_key] = (OPLatencyStats(), [], [], [])
+                stats, first_latencies, last_latencies, fan_in_rates = groups[grouping][group_key]
+
+                stats.request_count += 1
+                stats.response_count += len(response_times)
+                if not response_times:
+                    continue
+
+                stats.answered_count += 1
+                first_time = min(response_times)
+                last_time = max(response_times)
+                first_latencies.append((first_time - op_pub.timestamp) * 1000.0)
+                last_latencies.append((last_time - op_pub.timestamp) * 1000.0)
+
+                # A single response has no fan-in interval
+                if len(response_times) > 1 and last_time > first_time:
+                    fan_in_rates.append(len(response_times) / (last_time - first_time))
+
+        results: List[Dict[str, OPLatencyStats]] = []
+        for grouping in ("type", "category"):
+            grouping_results: Dict[str, OPLatencyStats] = {}
+            for group_key, (stats, first_latencies, last_latencies, fan_in_rates) in groups[grouping].items():
+                if first_latencies:
+                    first_latencies.sort()
+                    last_latencies.sort()
+                    stats.first_response_avg_ms = statistics.mean(first_latencies)
+                    stats.first_response_p50_ms = _percentile(first_latencies, 50)
+                    stats.first_response_p99_ms = _percentile(first_latencies, 99)
+                    stats.first_response_max_ms = first_latencies[-1]
+                    stats.last_response_avg_ms = statistics.mean(last_latencies)
+                    stats.last_response_p50_ms = _percentile(last_latencies, 50)
+                    stats.last_response_p99_ms = _percentile(last_latencies, 99)
+                    stats.last_response_max_ms = last_latencies[-1]
+                if fan_in_rates:
+                    stats.fan_in_rate_avg = statistics.mean(fan_in_rates)
+                grouping_results[group_key] = stats
+            results.append(grouping_results)
+
+        return results[0], results[1]
+
+    def calculate_sequence_stats(self) -> SequenceStats:
+        """Calculate loss, duplicates and reordering of the data publishes each subscriber was expected to receive
+
+        Publishes and receptions are followed together in order of time. Each data publish is marked
+        as expected on the stream from its publisher to every subscriber one of whose subscriptions was
+        live and eligible for its topic and purpose, so the correlation data skipped by op requests and
+        by publishes the subscriber's purposes rightly filtered out are not part of the stream, and
+        expected numbers that never arrive are lost. Numbers arriving again are repeats, such as QoS 1
+        redeliveries or the copies PM1 sends on each purpose topic, and numbers arriving after a higher
+        one are reorderings. Receptions of publishes that were not expected are only counted, as
+        purpose correctness accounts for them.
+
+        Returns
+        -------
+        SequenceStats
+            The totals over all streams, with the largest reorder distance of any stream
+        """
+        stats = SequenceStats()
+        _, _, publish_groups, _ = self._get_publish_segments()
+        subscriber_masks = {subscriber_id: self._get_subscriber_masks(subscriber_id) for subscriber_id in self.subscriber_subscriptions}
+
+        key_indexes_by_segment: Dict[int, List[int]] = {}
+        for segment, key_index in publish_groups:
+            key_indexes_by_segment.setdefault(segment, []).append(key_index)
+
+        def expected_publishes():
+            # Segments follow each other in time, so merging the groups of one segment at a time orders every publish
+            for segment in sorted(key_indexes_by_segment):
+                group_subscribers: Dict[int, List[str]] = {}
+                for key_index in key_indexes_by_segment[segment]:
+                    group_subscribers[key_index] = [subscriber_id for subscriber_id, (live_masks, eligible_masks) in subscriber_masks.items()
+                                                    if live_masks[segment] & eligible_masks[key_index]]
+                groups = [sorted(((pub_event.timestamp, 0, pub_event, group_subscribers[key_index]) for pub_event in publish_groups[(segment, key_index)]),
+                                 key=lambda entry: entry[0])
+                          for key_index in key_indexes_by_segment[segment] if group_subscribers[key_index]]
+                yield from heapq.merge(*groups, key=lambda entry: entry[0])
+
+        # Publishes sort before receptions at the same time, so a message is expected before it can arrive
+        receptions = ((recv_event.timestamp, 1, recv_event, None) for recv_event in sorted(self.recv_events, key=lambda e: e.timestamp)
+                      if recv_event.msg_type == "DATA")
+
+        trackers: Dict[Tuple[str, str], SequenceTracker] = {}
+        for _, _, event, subscribers in heapq.merge(expected_publishes(), receptions, key=lambda entry: entry[:2]):
+            if subscribers is not None:
+                for subscriber_id in subscribers:
+                    tracker = trackers.get((event.client_id, subscriber_id))
+                    if tracker is None:
+                        tracker = SequenceTracker()
+                        trackers[(event.client_id, subscriber_id)] = tracker
+                    tracker.expect(event.corr_data)
+                continue
+
+            tracker = trackers.get((event.sending_client_id, event.recv_client_id))
+            if tracker is None:
+                stats.unexpected_count += 1
+                continue
+            tracker.record(event.corr_data)
+
+        for tracker in trackers.values():
+            stats.stream_count += 1
+            stats.expected_count += tracker.expected_count
+            stats.received_count += tracker.received_count
+            stats.lost_count += tracker.missing_count()
+            stats.repeat_count += tracker.repeat_count
+            stats.reorder_count += tracker.reorder_count
+            stats.max_reorder_distance = max(stats.max_reorder_distance, tracker.max_reorder_distance)
+            stats.out_of_window_count += tracker.out_of_window_count
+            stats.unexpected_count += tracker.unexpected_count
+
+        return stats
+
+    def calculate_reconnect_stats(self) -> ReconnectStats:
+        """Calculate how clients recover after resuming a persistent session
+
+        Every connection made with clean start disabled is followed until the client's next
+        disconnect. Deliveries of messages published before the reconnect are counted as the
+        backlog replayed by the broker, which drains from the reconnect until the last of them.
+        Deliveries of a message the client had already received on the same topic are counted as
+        duplicates, so the copies PM1 delivers once per purpose topic are not.
+
+        Returns
+        -------
+        ReconnectStats
+            The recovery stats over all persistent reconnects
+        """
+        stats = ReconnectStats()
+        first_msg_delays: List[float] = []
+        replayed_counts: List[int] = []
+        drain_rates: List[float] = []
+
+        publish_map = self._get_publish_time_map()
+
+        recvs_by_client: Dict[str, List[RecvEvent]] = {}
+        for recv_event in self.recv_events:
+            recvs_by_client.setdefault(recv_event.recv_client_id, []).append(recv_event)
+
+        for connect_event in self.connect_events:
+            if connect_event.clean_start:
+                continue
+
+            stats.reconnect_count += 1
+            if connect_event.session_present:
+                stats.session_present_count += 1
+
+            # The session lasts until the next disconnect of this client
+            later_disconnects = [e.timestamp for e in self.disconnect_events
+                                 if e.client_id == connect_event.client_id and e.timestamp > connect_event.timestamp]
+            end_time = min(later_disconnects) if later_disconnects else sys.float_info.max
+
+            client_recvs = recvs_by_client.get(connect_event.client_id, [])
+            already_received: Set[Tuple[str, int, str]] = set(
+                (e.sending_client_id, e.corr_data, e.topic) for e in client_recvs if e.timestamp < connect_event.timestamp
+            )
+
+            first_msg_time: Optional[float] = None
+            last_replayed_time: Optional[float] = None
+            replayed_count = 0
+            for recv_event in client_recvs:
+                if recv_event.timestamp < connect_event.timestamp or recv_event.timestamp >= end_time:
+                    continue
+
+                if first_msg_time is None or recv_event.timestamp < first_msg_time:
+                    first_msg_time = recv_event.timestamp
+
+                key = (recv_event.sending_client_id, recv_event.corr_data, recv_event.topic)
+                if key in already_received:
+                    stats.duplicate_count += 1
+                    continue
+                already_received.add(key)
+
+                publish_time = publish_map.get((recv_event.sending_client_id, recv_event.corr_data))
+                if publish_time is not None and publish_time < connect_event.timestamp:
+                    replayed_count += 1
+                    if last_replayed_time is None or recv_event.timestamp > last_replayed_time:
+                        last_replayed_time = recv_event.timestamp
+
+            if first_msg_time is not None:
+                first_msg_delays.append((first_msg_time - connect_event.timestamp) * 1000.0)
+
+            replayed_counts.append(replayed_count)
+            if last_replayed_time is not None and last_replayed_time > connect_event.timestamp:
+                drain_rates.append(replayed_count / (last_replayed_time - connect_event.timestamp))
+
+        if first_msg_delays:
+            stats.first_msg_count = len(first_msg_delays)
+            stats.first_msg_avg_ms = statistics.mean(first_msg_delays)
+            stats.first_msg_max_ms = max(first_msg_delays)
+        if replayed_counts:
+            stats.replayed_msg_count = sum(replayed_counts)
+            stats.replayed_msg_avg = statistics.mean(replayed_counts)
+        if drain_rates:
+            stats.drain_rate_avg = statistics.mean(drain_rates)
+
+        return stats
+
     def calculate_all_metrics(self, log_file_path: str, test_name: str = "test") -> Optional[TestMetrics]:
         """Calculate all metrics"""
         if not self.parse_log_file(log_file_path):
@@ -718,6 +2107,16 @@ class MetricsCalculator:
         metrics.messaging_stats = self.calculate_messaging_stats()
         metrics.purpose_correctness_per_sub = self.calculate_purpose_correctness()
         metrics.op_correctness = self.calculate_op_correctness()
+        metrics.time_series = self.calculate_time_series()
+        metrics.purpose_propagation = self.calculate_purpose_propagation()
+        metrics.op_latency_by_type, metrics.op_latency_by_category = self.calculate_op_latency()
+        metrics.reconnect_stats = self.calculate_reconnect_stats()
+        metrics.sequence_stats = self.calculate_sequence_stats()
+        metrics.wire_stats = self.calculate_wire_stats()
+        metrics.amplification_stats = self.calculate_amplification_stats()
+        metrics.broker_resource_stats = self.calculate_broker_resource_stats(metrics.time_series)
+        metrics.broker_sys_stats = self.calculate_broker_sys_stats()
+        metrics.calibration = self.calculate_calibration()
 
         return metrics
 
@@ -728,6 +2127,13 @@ class MetricsCalculator:
         print(f"Purpose Management Method: {metrics.pm_method}")
         print(f"{'='*80}")
 
+        # Calibration against the loopback sink
+        if metrics.calibration is not None:
+            print(f"\n--- Calibration (No Broker) ---")
+            print(f"Duration: {metrics.calibration.duration_s:.3f}s{' (saturated)' if metrics.calibration.saturate else ''}")
+            print(f"Max Publish Rate: {metrics.calibration.publish_rate:.5f} msgs/sec ({metrics.calibration.publish_count} messages)")
+            print(f"Max Receive Rate: {metrics.calibration.recv_rate:.5f} msgs/sec ({metrics.calibration.recv_count} messages)")
+
         # Broker Stats
         print(f"\n--- Broker Statistics ---")
         print(f"CPU Usage:")
@@ -741,18 +2147,88 @@ class MetricsCalculator:
         print(f"  Average:  {metrics.broker_stats.mem_avg:.5f} MB")
         print(f"  Variance: {metrics.broker_stats.mem_variance:.5f}")
 
+        # Broker samples aligned with the time series
+        resource_stats = metrics.broker_resource_stats
+        if resource_stats.sample_count > 0:
+            print(f"\n--- Broker Resource Usage ---")
+            print(f"Samples: {resource_stats.sample_count} ({resource_stats.aligned_window_count} time series windows)")
+            if resource_stats.cpu_latency_p99_correlation is not None:
+                print(f"CPU vs Latency P99 Correlation:   {resource_stats.cpu_latency_p99_correlation:.5f}")
+            if resource_stats.cpu_recv_rate_correlation is not None:
+                print(f"CPU vs Receive Rate Correlation:  {resource_stats.cpu_recv_rate_correlation:.5f}")
+            if resource_stats.net_latency_p99_correlation is not None:
+                print(f"Network vs Latency P99 Correlation: {resource_stats.net_latency_p99_correlation:.5f}")
+            print(f"Active CPU Time: {resource_stats.cpu_seconds:.5f} s")
+            print(f"CPU Cost per Publish:  {resource_stats.cpu_us_per_publish:.5f} us")
+            print(f"CPU Cost per Delivery: {resource_stats.cpu_us_per_delivery:.5f} us")
+            print(f"Memory Avg: {resource_stats.mem_bytes_avg / 1e6:.5f} MB")
+            print(f"Memory Max: {resource_stats.mem_bytes_max / 1e6:.5f} MB")
+            print(f"Context Switches: {resource_stats.voluntary_ctx_switches} voluntary, {resource_stats.involuntary_ctx_switches} involuntary")
+            print(f"Context Switches per Second:   {resource_stats.ctx_switches_per_sec:.5f}")
+            print(f"Context Switches per Delivery: {resource_stats.ctx_switches_per_delivery:.5f}")
+            if resource_stats.open_fds_max is not None:
+                print(f"Open File Descriptors Max: {resource_stats.open_fds_max}")
+            if resource_stats.network_sampled:
+                print(f"Network Receive:  {resource_stats.net_rx_bytes_per_sec_avg:.5f} bytes/sec avg, {resource_stats.net_rx_bytes_per_sec_max:.5f} max")
+                print(f"Network Transmit: {resource_stats.net_tx_bytes_per_sec_avg:.5f} bytes/sec avg, {resource_stats.net_tx_bytes_per_sec_max:.5f} max")
+                print(f"TCP Retransmits: {resource_stats.tcp_retransmits} ({resource_stats.tcp_retransmits_per_sec:.5f}/sec)")
+                print(f"TCP Sockets Max: {resource_stats.tcp_sockets_inuse_max} in use, {resource_stats.tcp_sockets_time_wait_max} in TIME_WAIT")
+                print(f"Sockets Used Max: {resource_stats.sockets_used_max}")
+
+        # Broker $SYS statistics
+        if metrics.broker_sys_stats:
+            print(f"\n--- Broker $SYS Statistics ---")
+            for topic, sys_stats in metrics.broker_sys_stats.items():
+                print(f"{topic}:")
+                print(f"  Average: {sys_stats.avg_value:.5f} (min {sys_stats.min_value:.5f}, max {sys_stats.max_value:.5f}, {sys_stats.sample_count} samples)")
+                print(f"  Change:  {sys_stats.change:.5f}")
+
         # Messaging Stats
         print(f"\n--- Messaging Statistics ---")
+        print(f"Measurement Window: {metrics.messaging_stats.window_start_s:.3f}s - {metrics.messaging_stats.window_end_s:.3f}s"
+              f"{' (steady state)' if metrics.messaging_stats.steady_state_detected else ''}")
         print(f"Latency:")
         print(f"  Min:      {metrics.messaging_stats.latency_min_ms:.5f} ms")
         print(f"  Max:      {metrics.messaging_stats.latency_max_ms:.5f} ms")
         print(f"  Average:  {metrics.messaging_stats.latency_avg_ms:.5f} ms")
         print(f"  Variance: {metrics.messaging_stats.latency_variance_ms:.5f}")
+        if metrics.messaging_stats.inband_latency_count > 0:
+            print(f"\nIn-Band Latency, Whole Run ({metrics.messaging_stats.inband_latency_count} messages):")
+            print(f"  Min:      {metrics.messaging_stats.inband_latency_min_ms:.5f} ms")
+            print(f"  Max:      {metrics.messaging_stats.inband_latency_max_ms:.5f} ms")
+            print(f"  Average:  {metrics.messaging_stats.inband_latency_avg_ms:.5f} ms")
+            print(f"  P50:      {metrics.messaging_stats.inband_latency_p50_ms:.5f} ms")
+            print(f"  P99:      {metrics.messaging_stats.inband_latency_p99_ms:.5f} ms")
+            print(f"  Delta vs Log Join: {metrics.messaging_stats.latency_crosscheck_delta_ms:.5f} ms")
         print(f"\nThroughput: {metrics.messaging_stats.throughput_msgs_per_sec:.5f} msgs/sec")
         print(f"Average Header Size: {metrics.messaging_stats.avg_header_size_bytes:.5f} bytes")
         print(f"Data Messages: {metrics.messaging_stats.total_data_msg_count}")
         print(f"Non-Data Messages: {metrics.messaging_stats.non_data_msg_count}")
 
+        # Wire Stats
+        if metrics.wire_stats is not None:
+            print(f"\n--- Wire Bytes ({metrics.pm_method}) ---")
+            print(f"Total:                {metrics.wire_stats.total_bytes} bytes ({metrics.wire_stats.sent_bytes} sent, {metrics.wire_stats.received_bytes} received)")
+            print(f"Rate:                 {metrics.wire_stats.bytes_per_sec:.5f} bytes/sec")
+            print(f"Header/Payload Ratio: {metrics.wire_stats.header_payload_ratio:.5f}")
+            print(f"Control-Plane Share:  {metrics.wire_stats.control_plane_share:.4f} ({metrics.wire_stats.control_plane_share*100:.5f}%)")
+            for type_key, type_bytes in sorted(metrics.wire_stats.packet_type_bytes.items()):
+                print(f"  {type_key:<20} {type_bytes} bytes")
+
+        # Amplification
+        amplification = metrics.amplification_stats
+        print(f"\n--- Message Amplification ({metrics.pm_method}) ---")
+        print(f"Logical Data Messages:       {amplification.logical_msg_count}")
+        print(f"Amplification Factor:        {amplification.amplification_factor:.5f} PUBLISH per message")
+        print(f"Avg Fan-Out:                 {amplification.fan_out_avg:.5f} subscribers per message")
+        print(f"Deliveries:                  {amplification.delivery_count} ({amplification.useful_delivery_count} useful)")
+        print(f"Control Messages:            {amplification.control_msg_count} ({amplification.registration_msg_count} registrations, "
+              f"{amplification.op_request_msg_count} op requests, {amplification.op_response_msg_count} op responses)")
+        print(f"Control Msgs per Data Msg:   {amplification.control_msgs_per_data_msg:.5f}")
+        if metrics.wire_stats is not None:
+            print(f"Packets per Useful Delivery: {amplification.packets_per_useful_delivery:.5f}")
+            print(f"Bytes per Useful Delivery:   {amplification.bytes_per_useful_delivery:.5f}")
+
         # Purpose Correctness Summary
         print(f"\n--- Purpose Correctness Summary ---")
         if metrics.purpose_correctness_per_sub:
@@ -762,6 +2238,7 @@ class MetricsCalculator:
             total_expected = sum(pc.expected_msg_count for pc in metrics.purpose_correctness_per_sub.values())
             total_received = sum(pc.total_recv_count for pc in metrics.purpose_correctness_per_sub.values())
             total_rejected = sum(pc.bad_reject for pc in metrics.purpose_correctness_per_sub.values())
+            total_wrong_sub = sum(pc.wrong_sub_recv_count for pc in metrics.purpose_correctness_per_sub.values())
             avg_false_accept = sum(pc.false_accept for pc in metrics.purpose_correctness_per_sub.values()) / total_subs
             avg_false_reject = sum(pc.false_reject for pc in metrics.purpose_correctness_per_sub.values()) / total_subs
 
@@ -771,11 +2248,20 @@ class MetricsCalculator:
             print(f"Total Expected:          {total_expected}")
             print(f"Total Received:          {total_received}")
             print(f"Total Rejected:          {total_rejected}")
+            print(f"Wrong Subscription:      {total_wrong_sub}")
             print(f"Avg False Accept Rate:   {avg_false_accept:.4f} ({avg_false_accept*100:.5f}%)")
             print(f"Avg False Reject Rate:   {avg_false_reject:.4f} ({avg_false_reject*100:.5f}%)")
         else:
             print("No purpose correctness data available")
 
+        # Purpose Change Propagation
+        if metrics.purpose_propagation:
+            print(f"\n--- Purpose Change Propagation ({metrics.pm_method}) ---")
+            for device_type, stats in sorted(metrics.purpose_propagation.items()):
+                print(f"{device_type} ({stats.change_count} changes):")
+                print(f"  First New-Purpose Delivery: avg {stats.new_purpose_delay_avg_ms:.5f} ms, max {stats.new_purpose_delay_max_ms:.5f} ms ({stats.new_purpose_observed} observed)")
+                print(f"  Last Old-Purpose Delivery:  avg {stats.old_purpose_delay_avg_ms:.5f} ms, max {stats.old_purpose_delay_max_ms:.5f} ms ({stats.old_purpose_observed} observed)")
+
         # OP Correctness Summary
         if metrics.op_correctness:
             print(f"\n--- OP Correctness Summary ---")
@@ -800,6 +2286,39 @@ class MetricsCalculator:
             # Show the breakdown by category (C1_REG, C2, C3) to see what's going on
             #self._print_op_by_category(metrics)
 
+        # Reconnect Recovery
+        if metrics.reconnect_stats.reconnect_count > 0:
+            print(f"\n--- Reconnect Recovery ---")
+            print(f"Persistent Reconnects:     {metrics.reconnect_stats.reconnect_count} ({metrics.reconnect_stats.session_present_count} with session present)")
+            print(f"Time to First Message:     avg {metrics.reconnect_stats.first_msg_avg_ms:.5f} ms, max {metrics.reconnect_stats.first_msg_max_ms:.5f} ms")
+            print(f"Replayed Messages:         {metrics.reconnect_stats.replayed_msg_count} ({metrics.reconnect_stats.replayed_msg_avg:.5f} per reconnect)")
+            print(f"Avg Drain Rate:            {metrics.reconnect_stats.drain_rate_avg:.5f} msgs/sec")
+            print(f"Duplicate Messages:        {metrics.reconnect_stats.duplicate_count}")
+
+        # Sequence Analysis
+        if metrics.sequence_stats.stream_count > 0:
+            print(f"\n--- Sequence Analysis ---")
+            print(f"Streams:                   {metrics.sequence_stats.stream_count} ({metrics.sequence_stats.expected_count} expected, {metrics.sequence_stats.received_count} received)")
+            print(f"Lost:                      {metrics.sequence_stats.lost_count}")
+            print(f"Repeats:                   {metrics.sequence_stats.repeat_count}")
+            print(f"Reorderings:               {metrics.sequence_stats.reorder_count} (max distance {metrics.sequence_stats.max_reorder_distance})")
+            if metrics.sequence_stats.out_of_window_count > 0:
+                print(f"Out of Window:             {metrics.sequence_stats.out_of_window_count}")
+            if metrics.sequence_stats.unexpected_count > 0:
+                print(f"Unexpected:                {metrics.sequence_stats.unexpected_count}")
+
+        # OP Round-Trip Latency
+        if metrics.op_latency_by_type:
+            print(f"\n--- OP Round-Trip Latency ---")
+            for label, latency_stats in (("Type", metrics.op_latency_by_type), ("Category", metrics.op_latency_by_category)):
+                for group_key, stats in sorted(latency_stats.items()):
+                    print(f"\n{label} {group_key} ({stats.answered_count}/{stats.request_count} answered, {stats.response_count} responses):")
+                    print(f"  First Response: avg {stats.first_response_avg_ms:.5f} ms, P50 {stats.first_response_p50_ms:.5f} ms, "
+                          f"P99 {stats.first_response_p99_ms:.5f} ms, max {stats.first_response_max_ms:.5f} ms")
+                    print(f"  Last Response:  avg {stats.last_response_avg_ms:.5f} ms, P50 {stats.last_response_p50_ms:.5f} ms, "
+                          f"P99 {stats.last_response_p99_ms:.5f} ms, max {stats.last_response_max_ms:.5f} ms")
+                    print(f"  Avg Fan-In Rate: {stats.fan_in_rate_avg:.5f} responses/sec")
+
         print(f"\n{'='*80}\n")
 
     def _get_op_category_stats(self, metrics: TestMetrics) -> dict:
@@ -905,6 +2424,13 @@ class MetricsCalculator:
             # Header
             writer.writerow(["Metric Category", "Metric Name", "Value"])
 
+            # Calibration against the loopback sink
+            if metrics.calibration is not None:
+                writer.writerow(["Calibration", "Saturated", f"{metrics.calibration.saturate}"])
+                writer.writerow(["Calibration", "Duration (s)", f"{metrics.calibration.duration_s:.5f}"])
+                writer.writerow(["Calibration", "Max Publish Rate (msgs/sec)", f"{metrics.calibration.publish_rate:.5f}"])
+                writer.writerow(["Calibration", "Max Receive Rate (msgs/sec)", f"{metrics.calibration.recv_rate:.5f}"])
+
             # Broker Stats
             writer.writerow(["Broker", "CPU Min (%)", f"{metrics.broker_stats.cpu_min:.5f}"])
             writer.writerow(["Broker", "CPU Max (%)", f"{metrics.broker_stats.cpu_max:.5f}"])
@@ -915,16 +2441,94 @@ class MetricsCalculator:
             writer.writerow(["Broker", "Memory Avg (MB)", f"{metrics.broker_stats.mem_avg:.5f}"])
             writer.writerow(["Broker", "Memory Variance", f"{metrics.broker_stats.mem_variance:.5f}"])
 
+            resource_stats = metrics.broker_resource_stats
+            if resource_stats.sample_count > 0:
+                writer.writerow(["Broker", "Sample Count", f"{resource_stats.sample_count}"])
+                if resource_stats.cpu_latency_p99_correlation is not None:
+                    writer.writerow(["Broker", "CPU vs Latency P99 Correlation", f"{resource_stats.cpu_latency_p99_correlation:.5f}"])
+                if resource_stats.cpu_recv_rate_correlation is not None:
+                    writer.writerow(["Broker", "CPU vs Receive Rate Correlation", f"{resource_stats.cpu_recv_rate_correlation:.5f}"])
+                if resource_stats.net_latency_p99_correlation is not None:
+                    writer.writerow(["Broker", "Network vs Latency P99 Correlation", f"{resource_stats.net_latency_p99_correlation:.5f}"])
+                writer.writerow(["Broker", "Active CPU Time (s)", f"{resource_stats.cpu_seconds:.5f}"])
+                writer.writerow(["Broker", "CPU per Publish (us)", f"{resource_stats.cpu_us_per_publish:.5f}"])
+                writer.writerow(["Broker", "CPU per Delivery (us)", f"{resource_stats.cpu_us_per_delivery:.5f}"])
+                writer.writerow(["Broker", "Memory Avg (bytes)", f"{resource_stats.mem_bytes_avg:.5f}"])
+                writer.writerow(["Broker", "Memory Max (bytes)", f"{resource_stats.mem_bytes_max}"])
+                writer.writerow(["Broker", "Voluntary Context Switches", f"{resource_stats.voluntary_ctx_switches}"])
+                writer.writerow(["Broker", "Involuntary Context Switches", f"{resource_stats.involuntary_ctx_switches}"])
+                writer.writerow(["Broker", "Context Switches/sec", f"{resource_stats.ctx_switches_per_sec:.5f}"])
+                writer.writerow(["Broker", "Context Switches per Delivery", f"{resource_stats.ctx_switches_per_delivery:.5f}"])
+                if resource_stats.open_fds_max is not None:
+                    writer.writerow(["Broker", "Open File Descriptors Max", f"{resource_stats.open_fds_max}"])
+                if resource_stats.network_sampled:
+                    writer.writerow(["Broker", "Network Receive Avg (bytes/sec)", f"{resource_stats.net_rx_bytes_per_sec_avg:.5f}"])
+                    writer.writerow(["Broker", "Network Receive Max (bytes/sec)", f"{resource_stats.net_rx_bytes_per_sec_max:.5f}"])
+                    writer.writerow(["Broker", "Network Transmit Avg (bytes/sec)", f"{resource_stats.net_tx_bytes_per_sec_avg:.5f}"])
+                    writer.writerow(["Broker", "Network Transmit Max (bytes/sec)", f"{resource_stats.net_tx_bytes_per_sec_max:.5f}"])
+                    writer.writerow(["Broker", "TCP Retransmits", f"{resource_stats.tcp_retransmits}"])
+                    writer.writerow(["Broker", "TCP Retransmits/sec", f"{resource_stats.tcp_retransmits_per_sec:.5f}"])
+                    writer.writerow(["Broker", "TCP Sockets In Use Max", f"{resource_stats.tcp_sockets_inuse_max}"])
+                    writer.writerow(["Broker", "TCP Sockets TIME_WAIT Max", f"{resource_stats.tcp_sockets_time_wait_max}"])
+                    writer.writerow(["Broker", "Sockets Used Max", f"{resource_stats.sockets_used_max}"])
+
+            # Broker $SYS statistics
+            for topic, sys_stats in metrics.broker_sys_stats.items():
+                writer.writerow(["Broker $SYS", f"{topic} Avg", f"{sys_stats.avg_value:.5f}"])
+                writer.writerow(["Broker $SYS", f"{topic} Min", f"{sys_stats.min_value:.5f}"])
+                writer.writerow(["Broker $SYS", f"{topic} Max", f"{sys_stats.max_value:.5f}"])
+                writer.writerow(["Broker $SYS", f"{topic} Change", f"{sys_stats.change:.5f}"])
+
             # Messaging Stats
+            writer.writerow(["Messaging", "Window Start (s)", f"{metrics.messaging_stats.window_start_s:.5f}"])
+            writer.writerow(["Messaging", "Window End (s)", f"{metrics.messaging_stats.window_end_s:.5f}"])
+            writer.writerow(["Messaging", "Steady State Detected", f"{metrics.messaging_stats.steady_state_detected}"])
             writer.writerow(["Messaging", "Latency Min (ms)", f"{metrics.messaging_stats.latency_min_ms:.5f}"])
             writer.writerow(["Messaging", "Latency Max (ms)", f"{metrics.messaging_stats.latency_max_ms:.5f}"])
             writer.writerow(["Messaging", "Latency Avg (ms)", f"{metrics.messaging_stats.latency_avg_ms:.5f}"])
             writer.writerow(["Messaging", "Latency Variance", f"{metrics.messaging_stats.latency_variance_ms:.5f}"])
+            writer.writerow(["Messaging", "In-Band Latency Count", f"{metrics.messaging_stats.inband_latency_count}"])
+            writer.writerow(["Messaging", "In-Band Latency Min (ms)", f"{metrics.messaging_stats.inband_latency_min_ms:.5f}"])
+            writer.writerow(["Messaging", "In-Band Latency Max (ms)", f"{metrics.messaging_stats.inband_latency_max_ms:.5f}"])
+            writer.writerow(["Messaging", "In-Band Latency Avg (ms)", f"{metrics.messaging_stats.inband_latency_avg_ms:.5f}"])
+            writer.writerow(["Messaging", "In-Band Latency P50 (ms)", f"{metrics.messaging_stats.inband_latency_p50_ms:.5f}"])
+            writer.writerow(["Messaging", "In-Band Latency P99 (ms)", f"{metrics.messaging_stats.inband_latency_p99_ms:.5f}"])
+            writer.writerow(["Messaging", "Latency Cross-Check Delta (ms)", f"{metrics.messaging_stats.latency_crosscheck_delta_ms:.5f}"])
             writer.writerow(["Messaging", "Throughput (msgs/sec)", f"{metrics.messaging_stats.throughput_msgs_per_sec:.5f}"])
             writer.writerow(["Messaging", "Avg Header Size (bytes)", f"{metrics.messaging_stats.avg_header_size_bytes:.5f}"])
             writer.writerow(["Messaging", "Data Messages", f"{metrics.messaging_stats.total_data_msg_count}"])
             writer.writerow(["Messaging", "Non-Data Messages", f"{metrics.messaging_stats.non_data_msg_count}"])
 
+            # Wire Stats
+            if metrics.wire_stats is not None:
+                writer.writerow(["Wire", "Total Bytes", f"{metrics.wire_stats.total_bytes}"])
+                writer.writerow(["Wire", "Sent Bytes", f"{metrics.wire_stats.sent_bytes}"])
+                writer.writerow(["Wire", "Received Bytes", f"{metrics.wire_stats.received_bytes}"])
+                writer.writerow(["Wire", "Payload Bytes", f"{metrics.wire_stats.payload_bytes}"])
+                writer.writerow(["Wire", "Header Bytes", f"{metrics.wire_stats.header_bytes}"])
+                writer.writerow(["Wire", "Control-Plane Bytes", f"{metrics.wire_stats.control_bytes}"])
+                writer.writerow(["Wire", "Bytes/sec", f"{metrics.wire_stats.bytes_per_sec:.5f}"])
+                writer.writerow(["Wire", "Header/Payload Ratio", f"{metrics.wire_stats.header_payload_ratio:.5f}"])
+                writer.writerow(["Wire", "Control-Plane Share", f"{metrics.wire_stats.control_plane_share:.4f}"])
+                for type_key, type_bytes in sorted(metrics.wire_stats.packet_type_bytes.items()):
+                    writer.writerow(["Wire", f"{type_key} Bytes", f"{type_bytes}"])
+
+            # Amplification
+            amplification = metrics.amplification_stats
+            writer.writerow(["Amplification", "Logical Data Messages", f"{amplification.logical_msg_count}"])
+            writer.writerow(["Amplification", "Data PUBLISH Packets", f"{amplification.data_publish_count}"])
+            writer.writerow(["Amplification", "Amplification Factor", f"{amplification.amplification_factor:.5f}"])
+            writer.writerow(["Amplification", "Deliveries", f"{amplification.delivery_count}"])
+            writer.writerow(["Amplification", "Useful Deliveries", f"{amplification.useful_delivery_count}"])
+            writer.writerow(["Amplification", "Avg Fan-Out", f"{amplification.fan_out_avg:.5f}"])
+            writer.writerow(["Amplification", "Registration Messages", f"{amplification.registration_msg_count}"])
+            writer.writerow(["Amplification", "Op Request Messages", f"{amplification.op_request_msg_count}"])
+            writer.writerow(["Amplification", "Op Response Messages", f"{amplification.op_response_msg_count}"])
+            writer.writerow(["Amplification", "Control Messages", f"{amplification.control_msg_count}"])
+            writer.writerow(["Amplification", "Control Msgs per Data Msg", f"{amplification.control_msgs_per_data_msg:.5f}"])
+            writer.writerow(["Amplification", "Packets per Useful Delivery", f"{amplification.packets_per_useful_delivery:.5f}"])
+            writer.writerow(["Amplification", "Bytes per Useful Delivery", f"{amplification.bytes_per_useful_delivery:.5f}"])
+
             # Purpose Correctness Summary
             if metrics.purpose_correctness_per_sub:
                 total_subs = len(metrics.purpose_correctness_per_sub)
@@ -933,6 +2537,7 @@ class MetricsCalculator:
                 total_expected = sum(pc.expected_msg_count for pc in metrics.purpose_correctness_per_sub.values())
                 total_received = sum(pc.total_recv_count for pc in metrics.purpose_correctness_per_sub.values())
                 total_rejected = sum(pc.bad_reject for pc in metrics.purpose_correctness_per_sub.values())
+                total_wrong_sub = sum(pc.wrong_sub_recv_count for pc in metrics.purpose_correctness_per_sub.values())
                 avg_false_accept = sum(pc.false_accept for pc in metrics.purpose_correctness_per_sub.values()) / total_subs
                 avg_false_reject = sum(pc.false_reject for pc in metrics.purpose_correctness_per_sub.values()) / total_subs
 
@@ -942,9 +2547,20 @@ class MetricsCalculator:
                 writer.writerow(["Purpose Correctness", "Total Expected", f"{total_expected}"])
                 writer.writerow(["Purpose Correctness", "Total Received", f"{total_received}"])
                 writer.writerow(["Purpose Correctness", "Total Rejected", f"{total_rejected}"])
+                writer.writerow(["Purpose Correctness", "Total Wrong Subscription", f"{total_wrong_sub}"])
                 writer.writerow(["Purpose Correctness", "Avg False Accept Rate", f"{avg_false_accept:.4f}"])
                 writer.writerow(["Purpose Correctness", "Avg False Reject Rate", f"{avg_false_reject:.4f}"])
 
+            # Purpose Change Propagation
+            for device_type, stats in sorted(metrics.purpose_propagation.items()):
+                writer.writerow(["Purpose Propagation", f"{device_type} Changes", f"{stats.change_count}"])
+                writer.writerow(["Purpose Propagation", f"{device_type} New Purpose Observed", f"{stats.new_purpose_observed}"])
+                writer.writerow(["Purpose Propagation", f"{device_type} New Purpose Delay Avg (ms)", f"{stats.new_purpose_delay_avg_ms:.5f}"])
+                writer.writerow(["Purpose Propagation", f"{device_type} New Purpose Delay Max (ms)", f"{stats.new_purpose_delay_max_ms:.5f}"])
+                writer.writerow(["Purpose Propagation", f"{device_type} Old Purpose Observed", f"{stats.old_purpose_observed}"])
+                writer.writerow(["Purpose Propagation", f"{device_type} Old Purpose Delay Avg (ms)", f"{stats.old_purpose_delay_avg_ms:.5f}"])
+                writer.writerow(["Purpose Propagation", f"{device_type} Old Purpose Delay Max (ms)", f"{stats.old_purpose_delay_max_ms:.5f}"])
+
             # OP Correctness Summary
             if metrics.op_correctness:
                 total_requests = len(metrics.op_correctness)
@@ -967,3 +2583,81 @@ class MetricsCalculator:
 
                 # Add the category breakdown (C1_REG, C2, C3) to the CSV too
                 # self._export_op_by_category_to_csv(writer, metrics)
+
+            # Reconnect Recovery
+            if metrics.reconnect_stats.reconnect_count > 0:
+                writer.writerow(["Reconnect", "Persistent Reconnects", f"{metrics.reconnect_stats.reconnect_count}"])
+                writer.writerow(["Reconnect", "Session Present", f"{metrics.reconnect_stats.session_present_count}"])
+                writer.writerow(["Reconnect", "Time to First Message Avg (ms)", f"{metrics.reconnect_stats.first_msg_avg_ms:.5f}"])
+                writer.writerow(["Reconnect", "Time to First Message Max (ms)", f"{metrics.reconnect_stats.first_msg_max_ms:.5f}"])
+                writer.writerow(["Reconnect", "Replayed Messages", f"{metrics.reconnect_stats.replayed_msg_count}"])
+                writer.writerow(["Reconnect", "Replayed Messages per Reconnect", f"{metrics.reconnect_stats.replayed_msg_avg:.5f}"])
+                writer.writerow(["Reconnect", "Avg Drain Rate (msgs/sec)", f"{metrics.reconnect_stats.drain_rate_avg:.5f}"])
+                writer.writerow(["Reconnect", "Duplicate Messages", f"{metrics.reconnect_stats.duplicate_count}"])
+
+            # Sequence Analysis
+            if metrics.sequence_stats.stream_count > 0:
+                writer.writerow(["Sequence", "Streams", f"{metrics.sequence_stats.stream_count}"])
+                writer.writerow(["Sequence", "Expected", f"{metrics.sequence_stats.expected_count}"])
+                writer.writerow(["Sequence", "Received", f"{metrics.sequence_stats.received_count}"])
+                writer.writerow(["Sequence", "Lost", f"{metrics.sequence_stats.lost_count}"])
+                writer.writerow(["Sequence", "Repeats", f"{metrics.sequence_stats.repeat_count}"])
+                writer.writerow(["Sequence", "Reorderings", f"{metrics.sequence_stats.reorder_count}"])
+                writer.writerow(["Sequence", "Max Reorder Distance", f"{metrics.sequence_stats.max_reorder_distance}"])
+                writer.writerow(["Sequence", "Out of Window", f"{metrics.sequence_stats.out_of_window_count}"])
+                writer.writerow(["Sequence", "Unexpected", f"{metrics.sequence_stats.unexpected_count}"])
+
+            # OP Round-Trip Latency
+            for label, latency_stats in (("Type", metrics.op_latency_by_type), ("Category", metrics.op_latency_by_category)):
+                for group_key, stats in sorted(latency_stats.items()):
+                    category = f"OP Latency {label} {group_key}"
+                    writer.writerow([category, "Requests", f"{stats.request_count}"])
+                    writer.writerow([category, "Answered Requests", f"{stats.answered_count}"])
+                    writer.writerow([category, "Responses", f"{stats.response_count}"])
+                    writer.writerow([category, "First Response Avg (ms)", f"{stats.first_response_avg_ms:.5f}"])
+                    writer.writerow([category, "First Response P50 (ms)", f"{stats.first_response_p50_ms:.5f}"])
+                    writer.writerow([category, "First Response P99 (ms)", f"{stats.first_response_p99_ms:.5f}"])
+                    writer.writerow([category, "First Response Max (ms)", f"{stats.first_response_max_ms:.5f}"])
+                    writer.writerow([category, "Last Response Avg (ms)", f"{stats.last_response_avg_ms:.5f}"])
+                    writer.writerow([category, "Last Response P50 (ms)", f"{stats.last_response_p50_ms:.5f}"])
+                    writer.writerow([category, "Last Response P99 (ms)", f"{stats.last_response_p99_ms:.5f}"])
+                    writer.writerow([category, "Last Response Max (ms)", f"{stats.last_response_max_ms:.5f}"])
+                    writer.writerow([category, "Avg Fan-In Rate (responses/sec)", f"{stats.fan_in_rate_avg:.5f}"])
+
+    def export_time_series_to_csv(self, metrics: TestMetrics, output_path: str):
+        """Export the time series to CSV with one row per window"""
+        import csv
+
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+
+            # Header
+            writer.writerow(["Window Start (s)", "Published", "Received", "Publish Rate (msgs/sec)", "Receive Rate (msgs/sec)",
+                             "Publish Bytes/sec", "Receive Bytes/sec", "Latency P50 (ms)", "Latency P90 (ms)",
+                             "Latency P99 (ms)", "Latency Max (ms)", "Connects", "Disconnects", "Operational Requests",
+                             "Purpose Changes", "Broker CPU (%)", "Broker Memory (%)", "Broker Network Receive Bytes/sec",
+                             "Broker Network Transmit Bytes/sec", "Broker TCP Retransmits"])
+
+            for window in metrics.time_series:
+                writer.writerow([
+                    f"{window.start_s:.3f}",
+                    f"{window.publish_count}",
+                    f"{window.recv_count}",
+                    f"{window.publish_rate:.5f}",
+                    f"{window.recv_rate:.5f}",
+                    f"{window.publish_bytes_per_sec:.5f}",
+                    f"{window.recv_bytes_per_sec:.5f}",
+                    f"{window.latency_p50_ms:.5f}",
+                    f"{window.latency_p90_ms:.5f}",
+                    f"{window.latency_p99_ms:.5f}",
+                    f"{window.latency_max_ms:.5f}",
+                    f"{window.connect_count}",
+                    f"{window.disconnect_count}",
+                    f"{window.op_request_count}",
+                    f"{window.purpose_change_count}",
+                    "" if window.cpu_usage_percent is None else f"{window.cpu_usage_percent:.5f}",
+                    "" if window.mem_usage_percent is None else f"{window.mem_usage_percent:.5f}",
+                    "" if window.net_rx_bytes_per_sec is None else f"{window.net_rx_bytes_per_sec:.5f}",
+                    "" if window.net_tx_bytes_per_sec is None else f"{window.net_tx_bytes_per_sec:.5f}",
+                    "" if window.tcp_retransmits is None else f"{window.tcp_retransmits}"
+                ])
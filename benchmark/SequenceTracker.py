@@ -0,0 +1,114 @@
+from typing import Optional
+
+# Sequence numbers this far below the highest one received can still be told apart as
+# repeats or late arrivals, at a cost of one bit each per tracked stream
+DEFAULT_WINDOW_BITS: int = 1024
+
+
+class SequenceTracker:
+    """Streaming loss, duplicate and reordering detection for one stream of sequence numbers
+
+    Meant for the correlation data one publisher's messages reach one subscriber with. The numbers
+    the subscriber was expected to receive are marked as their publishes are sent, so numbers the
+    stream never carries, such as those of op requests or of publishes its purposes filter out, are
+    neither lost nor counted in reorder distances. Only the highest number and bitmaps of which of
+    the last window_bits numbers were expected and have arrived are kept, so memory per stream is
+    bounded however long the run is. Arrivals further behind than the window cannot be classified
+    and are only counted.
+    """
+
+    def __init__(self, window_bits: int = DEFAULT_WINDOW_BITS):
+        self.window_bits: int = window_bits
+        self.window_mask: int = (1 << window_bits) - 1
+        self.highest: Optional[int] = None  # Highest number expected so far, bit 0 of the bitmaps
+        self.highest_received: Optional[int] = None
+        self.expected_bitmap: int = 0  # Bit i is set once highest - i is expected
+        self.seen_bitmap: int = 0  # Bit i is set once highest - i has arrived
+        self.expected_count: int = 0
+        self.received_count: int = 0
+        self.unique_count: int = 0
+        self.repeat_count: int = 0
+        self.reorder_count: int = 0
+        self.max_reorder_distance: int = 0
+        self.out_of_window_count: int = 0
+        self.unexpected_count: int = 0
+
+    def expect(self, sequence: int):
+        """Mark a sequence number as expected, which should be done in the order the numbers were sent
+
+        Parameters
+        ----------
+        sequence : int
+            The sequence number the subscriber should receive
+        """
+        # Newer than anything so far, the window slides forward
+        if self.highest is None or sequence > self.highest:
+            shift = sequence - self.highest if self.highest is not None else self.window_bits
+            if shift >= self.window_bits:
+                self.expected_bitmap = 1
+                self.seen_bitmap = 0
+            else:
+                self.expected_bitmap = ((self.expected_bitmap << shift) | 1) & self.window_mask
+                self.seen_bitmap = (self.seen_bitmap << shift) & self.window_mask
+            self.highest = sequence
+            self.expected_count += 1
+            return
+
+        # Numbers behind the window cannot be told apart from ones already expected, so are taken as new
+        distance = self.highest - sequence
+        if distance >= self.window_bits:
+            self.expected_count += 1
+            return
+
+        bit = 1 << distance
+        if not self.expected_bitmap & bit:
+            self.expected_bitmap |= bit
+            self.expected_count += 1
+
+    def record(self, sequence: int):
+        """Record the arrival of a sequence number
+
+        Parameters
+        ----------
+        sequence : int
+            The sequence number that arrived
+        """
+        if self.highest is None or sequence > self.highest:
+            self.unexpected_count += 1
+            return
+
+        distance = self.highest - sequence
+        if distance >= self.window_bits:
+            self.received_count += 1
+            self.out_of_window_count += 1
+            return
+
+        bit = 1 << distance
+        if not self.expected_bitmap & bit:
+            self.unexpected_count += 1
+            return
+
+        self.received_count += 1
+        if self.seen_bitmap & bit:
+            self.repeat_count += 1
+            return
+
+        self.seen_bitmap |= bit
+        self.unique_count += 1
+        if self.highest_received is None or sequence > self.highest_received:
+            self.highest_received = sequence
+            return
+
+        # A missing number arrived late, and its distance counts only the expected numbers from it up to the highest received
+        between = (bit - 1) & ~((1 << (self.highest - self.highest_received)) - 1)
+        reorder_distance = (self.expected_bitmap & between).bit_count()
+        self.reorder_count += 1
+        if reorder_distance > self.max_reorder_distance:
+            self.max_reorder_distance = reorder_distance
+
+    def missing_count(self) -> int:
+        """Get how many expected sequence numbers never arrived
+
+        Late arrivals outside the window are not known to have filled a gap, so they still count as missing
+        """
+        return self.expected_count - self.unique_count
@@ -16,7 +16,8 @@ from DeviceDefinitions import (
     SubscriberDefinition, PurposeDefinition, DeviceDefinition
 )
 from BrokerMonitor import BrokerMonitor
-from LoggingModule import console_log, ConsoleLogLevel
+from MQTTClient import MQTTClient
+from LoggingModule import console_log, ConsoleLogLevel, get_timestamp_ns
 
 class TestExecutor():
     """Test executor with deterministic event scheduling and per-device publication rates"""
@@ -29,8 +30,8 @@ class TestExecutor():
     stop_event: threading.Event
     duration_scheduler: sched.scheduler
     
-    pending_publishes: Dict[str, Dict[int, Tuple[str, str, str, float]]] # client name => [message id => (topic, purpose, message_type, timestamp)]
-    pending_subscribes: Dict[str, Dict[int, Tuple[str, str, int, float]]] # client name => [message id => (topic_filter, purpose_filter, sub_id, timestamp)]
+    pending_publishes: Dict[str, Dict[int, Tuple[str, str, str, int, int]]] # client name => [message id => (topic, purpose, message_type, payload_size, timestamp_ns)]
+    pending_subscribes: Dict[str, Dict[int, Tuple[str, str, int, int]]] # client name => [message id => (topic_filter, purpose_filter, sub_id, timestamp_ns)]
     sub_ids: Dict[str, Dict[str, int]]
     publish_lock: threading.Lock
     subscribe_lock: threading.Lock
@@ -40,13 +41,20 @@ class TestExecutor():
     c1_reg_ops: List[str]
     all_operations: Dict[str, str]
 
+    # Time the last main loop iteration ran past its planned sleep
+    main_loop_lag_ms: float
+
+    # Whether publishers ignore their publication period and publish as fast as possible
+    saturate: bool
+
     def __init__(self, executor_id: str, broker_address: str, broker_port: int,
-                 method: GlobalDefs.PurposeManagementMethod):
+                 method: GlobalDefs.PurposeManagementMethod, saturate: bool = False):
 
         self.my_id = executor_id
         self.broker_address = broker_address
         self.broker_port = broker_port
         self.method = method
+        self.saturate = saturate
         self.pending_publishes = dict()
         self.pending_subscribes = dict()
         self.sub_ids = dict()
@@ -59,6 +67,8 @@ class TestExecutor():
         self.c1_reg_ops = []
         self.all_operations = {}
 
+        self.main_loop_lag_ms = 0.0
+
         #  Seed the random number generator and write seed to log file
         seed = int(time.time())
         random.seed(time.time())
@@ -146,21 +156,25 @@ class TestExecutor():
                 # Send operational requests if it's time
                 self._send_operational_requests_if_ready(elapsed_ms)
 
-                # Collect broker metrics if needed
-                if self.broker_monitor and self.broker_monitor.should_collect_sample(test_config.monitor_interval_ms):
-                    self.broker_monitor.collect_sample()
-
                 # Sleep briefly to avoid busy waiting
-                # Calculate sleep time based on next event
-                sleep_time = self._calculate_optimal_sleep_time(test_config)
+                # Calculate sleep time based on next event, only yielding when saturating
+                sleep_time = 0.0 if self.saturate else self._calculate_optimal_sleep_time(test_config)
                 time.sleep(sleep_time)
 
+                # Anything beyond the planned sleep delays the publication schedule
+                iteration_ms = time.monotonic() * 1000.0 - current_time_ms
+                self.main_loop_lag_ms = max(0.0, iteration_ms - sleep_time * 1000.0)
+
         except KeyboardInterrupt:
             console_log(ConsoleLogLevel.WARNING, f"Test interrupted by user")
         except Exception as e:
             console_log(ConsoleLogLevel.WARNING, f"Test failed with error: {e}")
             raise
 
+        # Without a broker, the rates reached are the ceiling of the benchmark itself
+        if GlobalDefs.NULL_BROKER:
+            self._log_calibration(time.monotonic() * 1000.0 - test_start_time_ms)
+
         console_log(ConsoleLogLevel.INFO, f"Test complete! Cleaning up...", __name__)
 
         # Stop monitoring
@@ -179,6 +193,10 @@ class TestExecutor():
             
         # Give a moment to finish pending operations
         time.sleep(2)
+
+        # Log in-band latencies now that no more messages will arrive
+        self._log_latency_histograms()
+        self._log_wire_bytes()
         
         self._clear_previous_test_data()
 
@@ -276,7 +294,11 @@ class TestExecutor():
 
     def _setup_broker_monitoring(self, test_config: TestConfiguration):
         """Setup broker monitoring"""
-        self.broker_monitor = BrokerMonitor(test_config.node_exporter_url)
+        self.broker_monitor = BrokerMonitor(test_config.node_exporter_url, test_config.monitor_interval_ms,
+                                            test_config.monitor_backend, test_config.monitor_pid,
+                                            test_config.monitor_process, test_config.monitor_cgroup_path,
+                                            test_config.monitor_sys_topics, self.broker_address, self.broker_port,
+                                            f"{self.my_id}_broker_monitor")
 
     def _setup_operational_requests(self, test_config: TestConfiguration):
         """Setup operational request tracking"""
@@ -351,7 +373,8 @@ class TestExecutor():
 
         # Track this response in pending publishes for logging
         self.publish_lock.acquire()
-        now = time.time()
+        now = get_timestamp_ns()
+        subscriber.publish_count += len(results)
         
         for message_info, topic in results:
             if subscriber.mqtt_client_name not in self.pending_publishes:
@@ -362,8 +385,9 @@ class TestExecutor():
                 purpose_start_index = topic.rfind('[')
                 topic = topic[:purpose_start_index - 1]
 
+            # Operational payloads are built by the client interface and their size is not logged
             self.pending_publishes[subscriber.mqtt_client_name][message_info.mid] = (
-                topic, GlobalDefs.OP_PURPOSE, operation_type, now
+                topic, GlobalDefs.OP_PURPOSE, operation_type, 0, now
             )
 
             # Save message counter for correlations
@@ -388,7 +412,8 @@ class TestExecutor():
             qos=self.current_config.qos
         )
 
-        now = time.time()
+        now = get_timestamp_ns()
+        publisher.publish_count += len(results)
 
         for message_info, topic in results:
             if publisher.mqtt_client_name not in self.pending_publishes:
@@ -400,7 +425,7 @@ class TestExecutor():
                 topic = topic[:purpose_start_index - 1]
 
             self.pending_publishes[publisher.mqtt_client_name][message_info.mid] = (
-                topic, GlobalDefs.OP_PURPOSE, operation, now
+                topic, GlobalDefs.OP_PURPOSE, operation, 0, now
             )
 
             # Save message counter for correlations
@@ -410,7 +435,7 @@ class TestExecutor():
 
     def _publish_from_ready_devices(self, elapsed_ms: float):
         """Publish from all devices that are ready based on their individual publication rates"""
-        ready_publishers = self.device_manager.get_publishers_ready_to_publish(elapsed_ms)
+        ready_publishers = self.device_manager.get_publishers_ready_to_publish(elapsed_ms, self.saturate)
 
         for device_instance in ready_publishers:
             self._publish_from_device(device_instance, elapsed_ms)
@@ -429,6 +454,14 @@ class TestExecutor():
         self.publish_lock.acquire()
         message_counter = device_instance.message_count
 
+        # Take the send time before publishing so the logged and embedded send times agree
+        now = get_timestamp_ns()
+        send_timestamp_ns = None
+        if self.current_config.send_timestamp_mode is GlobalDefs.SendTimestampMode.PROPERTY:
+            send_timestamp_ns = now
+        elif self.current_config.send_timestamp_mode is GlobalDefs.SendTimestampMode.PAYLOAD:
+            payload = self._prefix_send_timestamp(payload, now)
+
         results = GlobalDefs.CLIENT_MODULE.publish_with_purpose(
             device_instance.mqtt_client,
             self.method,
@@ -436,10 +469,10 @@ class TestExecutor():
             device_instance.current_purpose_filter,
             qos=self.current_config.qos,
             payload=payload,
-            correlation_data=message_counter
+            correlation_data=message_counter,
+            send_timestamp_ns=send_timestamp_ns
         )
-
-        now = time.time()
+        device_instance.publish_count += len(results)
 
         for message_info, topic in results:
             if device_instance.mqtt_client_name not in self.pending_publishes:
@@ -451,7 +484,7 @@ class TestExecutor():
                 topic = topic[:purpose_start_index - 1]
 
             self.pending_publishes[device_instance.mqtt_client_name][message_info.mid] = (
-                topic, device_instance.current_purpose_filter, "DATA", now
+                topic, device_instance.current_purpose_filter, "DATA", len(payload) if payload else 0, now
             )
             
             # Save message counter for correlations
@@ -462,6 +495,49 @@ class TestExecutor():
         # Mark as published
         device_instance.mark_published(elapsed_ms)
 
+    def _prefix_send_timestamp(self, payload: bytes | None, send_timestamp_ns: int) -> bytes:
+        """Overwrite the start of a payload with the send timestamp, padding payloads that are too short"""
+        prefix = send_timestamp_ns.to_bytes(GlobalDefs.SEND_TIMESTAMP_BYTES, byteorder='big', signed=False)
+        if payload is None:
+            return prefix
+        return prefix + payload[GlobalDefs.SEND_TIMESTAMP_BYTES:]
+
+    def _extract_send_timestamp(self, message: mqtt.MQTTMessage, send_time_property: Optional[str]) -> Optional[int]:
+        """Get the send timestamp a publisher embedded in a message, or None if there is none"""
+        mode = self.current_config.send_timestamp_mode
+
+        if mode is GlobalDefs.SendTimestampMode.PROPERTY and send_time_property is not None:
+            return int(send_time_property)
+        elif mode is GlobalDefs.SendTimestampMode.PAYLOAD and len(message.payload) >= GlobalDefs.SEND_TIMESTAMP_BYTES:
+            return int.from_bytes(message.payload[:GlobalDefs.SEND_TIMESTAMP_BYTES], byteorder='big', signed=False)
+
+        return None
+
+    def _log_latency_histograms(self):
+        """Log the in-band latency histogram of every device that received timestamped messages"""
+        timestamp = get_timestamp_ns()
+        for device in self.device_manager.get_all_subscribers():
+            histogram = device.latency_histogram
+            if histogram.count > 0:
+                GlobalDefs.LOGGING_MODULE.log_latency_histogram(timestamp, self.my_id, device.mqtt_client_name, histogram)
+
+    def _log_calibration(self, duration_ms: float):
+        """Log the number of messages published and received by all devices during the test"""
+        publish_count = sum(device.publish_count for device in self.device_manager.get_all_instances())
+        recv_count = sum(device.recv_count for device in self.device_manager.get_all_instances())
+        GlobalDefs.LOGGING_MODULE.log_calibration(get_timestamp_ns(), self.my_id, self.method.value, self.saturate,
+                                                  duration_ms / 1000.0, publish_count, recv_count)
+
+    def _log_wire_bytes(self):
+        """Log the bytes each device's client sent and received per packet type and traffic class"""
+        timestamp = get_timestamp_ns()
+        for device in self.device_manager.get_all_instances():
+            if not isinstance(device.mqtt_client, MQTTClient):
+                continue
+            for (direction, packet_type, traffic_class), stats in sorted(device.mqtt_client.get_wire_stats().items()):
+                GlobalDefs.LOGGING_MODULE.log_wire_bytes(timestamp, self.my_id, device.mqtt_client_name, direction, packet_type, traffic_class,
+                                                         stats.packet_count, stats.total_bytes, stats.payload_bytes)
+
     def _calculate_optimal_sleep_time(self, test_config: TestConfiguration) -> float:
         """Calculate optimal sleep time based on next event and publication schedules"""
         min_sleep = 0.001  # 1ms minimum
@@ -569,6 +645,7 @@ class TestExecutor():
                 if device:
                     old_purpose = device.current_purpose_filter
                     device.current_purpose_filter = new_purpose
+                    GlobalDefs.LOGGING_MODULE.log_purpose_change(get_timestamp_ns(), self.my_id, device.mqtt_client_name, device.device_definition.id, old_purpose, new_purpose)
                     console_log(ConsoleLogLevel.DEBUG, f"Changed purpose for {device.mqtt_client_name}: {old_purpose} -> {new_purpose}", __name__)
 
                     # Publisher change
@@ -589,6 +666,7 @@ class TestExecutor():
         if device.is_connected:
             return
 
+        device.clean_start = clean_start
         result_code = GlobalDefs.CLIENT_MODULE.connect_client(
             device.mqtt_client, self.broker_address, self.broker_port, clean_start
         )
@@ -624,7 +702,8 @@ class TestExecutor():
         if reason_code == 0:  # Success
             device_instance.is_connected = True
 
-            GlobalDefs.LOGGING_MODULE.log_connect(time.time(), self.my_id, device_instance.mqtt_client_name)
+            GlobalDefs.LOGGING_MODULE.log_connect(get_timestamp_ns(), self.my_id, device_instance.mqtt_client_name,
+                                                  device_instance.clean_start, flags.session_present)
 
             # Subscribe if this is a subscriber
             if isinstance(device_instance.device_definition, SubscriberDefinition):
@@ -651,7 +730,7 @@ class TestExecutor():
             device_instance: DeviceInstance = userdata
             device_instance.is_connected = False
 
-            GlobalDefs.LOGGING_MODULE.log_disconnect(time.time(), self.my_id, device_instance.mqtt_client_name)
+            GlobalDefs.LOGGING_MODULE.log_disconnect(get_timestamp_ns(), self.my_id, device_instance.mqtt_client_name)
 
     def _subscribe_device(self, device: DeviceInstance, existing_subscription: bool = False, previous_purpose_filter: str = ""):
         """Subscribe a device to its configured topics"""
@@ -668,7 +747,7 @@ class TestExecutor():
             self.current_config.qos, existing_subscription, previous_purpose_filter
         )
 
-        now = time.time()
+        now = get_timestamp_ns()
 
         for result_code, mid, sub_id in results:
             if result_code == 0:
@@ -686,7 +765,7 @@ class TestExecutor():
             sub_id = "UNKNOWN"
             if device.mqtt_client_name in self.sub_ids and device_def.topic_filter in self.sub_ids[device.mqtt_client_name]:
                 sub_id = self.sub_ids[device.mqtt_client_name][device_def.topic_filter]
-            GlobalDefs.LOGGING_MODULE.log_subscribe(time.time(), self.my_id, device.mqtt_client_name, device_def.topic_filter, device.current_purpose_filter, sub_id)
+            GlobalDefs.LOGGING_MODULE.log_subscribe(get_timestamp_ns(), self.my_id, device.mqtt_client_name, device_def.topic_filter, device.current_purpose_filter, sub_id)
 
         self.subscribe_lock.release()
 
@@ -710,7 +789,7 @@ class TestExecutor():
                 device.mqtt_client, self.method, topic
             )
 
-            now = time.time()
+            now = get_timestamp_ns()
 
             # Track subscriptions so we can log them when they complete
             for result_code, mid, sub_id in results:
@@ -771,10 +850,11 @@ class TestExecutor():
             if mid in self.pending_publishes[device_instance.mqtt_client_name]: 
                 
                 corr_data = device_instance.message_id_to_send_counter[mid]
+                device_instance.publish_ack_count += 1
                     
                 # If successful
                 if reason_code == 0:
-                    topic, purpose, op_type, time = self.pending_publishes[device_instance.mqtt_client_name][mid]
+                    topic, purpose, op_type, payload_size, time = self.pending_publishes[device_instance.mqtt_client_name][mid]
                     
                     # Do not log communications to the broker
                     # if not topic[0] == '$':
@@ -782,7 +862,7 @@ class TestExecutor():
                     # Check if operational or data
                     if op_type == "DATA":
                         # Log message
-                        GlobalDefs.LOGGING_MODULE.log_publish(time, self.my_id, device_instance.mqtt_client_name, corr_data, topic, purpose, op_type)
+                        GlobalDefs.LOGGING_MODULE.log_publish(time, self.my_id, device_instance.mqtt_client_name, corr_data, topic, purpose, op_type, payload_size)
                     else:
                         # Log operational message - use self.all_operations which includes C1_REG ops
                         op_category = self.all_operations.get(op_type, "UNKNOWN")
@@ -791,7 +871,7 @@ class TestExecutor():
                 
     def _on_message_recv(self, client: mqtt.Client, userdata: Any, message: mqtt.MQTTMessage):
         
-        timestamp = time.time()
+        timestamp = get_timestamp_ns()
         
         operational_message = False
         operational_response = False
@@ -799,8 +879,11 @@ class TestExecutor():
         sending_client = "UNKNOWN"
         op_message_type = "OP"
         correlation_data = -1
+        send_time_property = None
         sub_id: List[int] = list()
         device_instance: DeviceInstance = userdata
+        device_instance.recv_count += 1
+        device_instance.recv_bytes += len(message.payload)
         
         # Check properties
         if message.properties is not None:
@@ -814,6 +897,8 @@ class TestExecutor():
                     elif name == GlobalDefs.PROPERTY_OP_STATUS:
                         operational_response = True
                         op_message_type = value
+                    elif name == GlobalDefs.PROPERTY_SEND_TIME:
+                        send_time_property = value
                         
             if hasattr(message.properties, "CorrelationData"):
                 correlation_data = int.from_bytes(message.properties.CorrelationData, byteorder='big', signed=False)
@@ -836,4 +921,11 @@ class TestExecutor():
                 if isinstance(device_instance.device_definition, SubscriberDefinition) and hasattr(message.properties, "ResponseTopic") and message.properties.ResponseTopic:
                     self._send_operational_response(device_instance, message.properties.ResponseTopic, operation_type, correlation_data)
         else:
-            GlobalDefs.LOGGING_MODULE.log_recv(timestamp, self.my_id, device_instance.mqtt_client_name, sending_client, correlation_data, message.topic, "DATA", sub_id[0])
\ No newline at end of file
+            GlobalDefs.LOGGING_MODULE.log_recv(timestamp, self.my_id, device_instance.mqtt_client_name, sending_client, correlation_data, message.topic, "DATA", sub_id[0], len(message.payload))
+
+            # Record the latency on the spot if the publisher embedded its send time
+            send_timestamp_ns = self._extract_send_timestamp(message, send_time_property)
+            if send_timestamp_ns is not None:
+                latency_ns = timestamp - send_timestamp_ns
+                device_instance.latency_histogram.record(latency_ns)
+                device_instance.recent_latencies_ns.append(latency_ns)
\ No newline at end of file
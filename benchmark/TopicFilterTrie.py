@@ -0,0 +1,70 @@
+from typing import Any, Dict, List
+
+
+class _TrieNode:
+    __slots__ = ("children", "values", "multi_level_values")
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.values: List[Any] = []  # Values of filters ending at this node
+        self.multi_level_values: List[Any] = []  # Values of filters ending in '#' below this node
+
+
+class TopicFilterTrie:
+    """An index of MQTT topic filters that finds every filter matching a topic in one walk
+
+    Filters are split into levels once when added, with '+' matching any one level and '#'
+    matching the parent level and everything below it. As with paho's topic_matches_sub,
+    wildcards at the first level do not match topics starting with '$'. Matches are cached per
+    topic until the next filter is added, since the same topics are looked up over and over.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self.match_cache: Dict[str, List[Any]] = {}
+
+    def add(self, topic_filter: str, value: Any):
+        """Index a value under a topic filter, several values may share a filter"""
+        node = self.root
+        levels = topic_filter.split('/')
+        for index, level in enumerate(levels):
+            if level == '#' and index == len(levels) - 1:
+                node.multi_level_values.append(value)
+                self.match_cache.clear()
+                return
+            node = node.children.setdefault(level, _TrieNode())
+        node.values.append(value)
+        self.match_cache.clear()
+
+    def match(self, topic: str) -> List[Any]:
+        """Get the values of every filter matching a topic, in the order they were added per filter
+
+        The returned list is shared with later lookups of the same topic and must not be modified
+        """
+        matches = self.match_cache.get(topic)
+        if matches is None:
+            matches = []
+            levels = topic.split('/')
+            self._match(self.root, levels, 0, topic.startswith('$'), matches)
+            self.match_cache[topic] = matches
+        return matches
+
+    def _match(self, node: _TrieNode, levels: List[str], index: int, system_topic: bool, matches: List[Any]):
+        wildcards_allowed = not (index == 0 and system_topic)
+
+        # '#' also matches the level above it, so 'a/#' matches 'a'
+        if wildcards_allowed:
+            matches.extend(node.multi_level_values)
+
+        if index == len(levels):
+            matches.extend(node.values)
+            return
+
+        child = node.children.get(levels[index])
+        if child is not None:
+            self._match(child, levels, index + 1, system_topic, matches)
+
+        if wildcards_allowed:
+            child = node.children.get('+')
+            if child is not None:
+                self._match(child, levels, index + 1, system_topic, matches)
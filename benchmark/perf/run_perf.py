@@ -0,0 +1,248 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import GlobalDefs
+import ClientInterface
+from ConfigParser import ConfigParser
+from EventScheduler import EventScheduler
+from LogGenerator import LogGenerator, GeneratorSettings
+from LoggingModule import ResultLogger, get_timestamp_ns
+from LoopbackClient import NULL_BROKER_ADDRESS
+from MetricsCalculator import MetricsCalculator
+
+# Purpose filters of increasing expansion size, from a single purpose to 4 x 3 x 3 x 2 purposes
+PURPOSE_FILTERS: Dict[str, str] = {
+    "single": "billing",
+    "hierarchy": "billing/invoices/monthly",
+    "braces_2x2": "{billing,ads}/{monthly,yearly}",
+    "braces_3x3x3": "{billing,ads,analytics}/{monthly,yearly,daily}/{eu,us,asia}",
+    "braces_nested_optional": "{billing,ads,analytics,research}/{internal,partner,public}/{eu,us,asia}/{.,archive}",
+}
+
+PUBLISH_PURPOSE_FILTER: str = "{billing,ads}/{monthly,yearly}"
+PUBLISH_PAYLOAD_BYTES: int = 64
+
+# Publishing starts this late in the analyzer workload, which then writes this many PUBLISH and RECV records per second
+ANALYZER_CONFIG: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analyzer_scaling.cfg")
+ANALYZER_START_MS: int = 100
+ANALYZER_RECORDS_PER_SECOND: int = 300
+
+BENCHMARK_NAMES: List[str] = ["publish", "purposes", "logger", "scheduler", "analyzer"]
+
+
+"""Times a function and summarizes the runs
+
+Parameters
+----------
+name : str
+    The name to report the result under
+function : Callable
+    The function to time, called with the value returned by setup
+operations : int
+    The number of operations one call performs
+repeats : int
+    The number of timed calls
+setup : Callable, optional
+    Called untimed before each call to prepare its argument
+
+Returns
+----------
+dict
+    The timing result
+"""
+def _measure(name: str, function: Callable, operations: int, repeats: int, setup: Optional[Callable] = None) -> Dict[str, Any]:
+    durations_ns: List[int] = []
+    for _ in range(repeats):
+        argument = setup() if setup is not None else None
+        start_ns = time.perf_counter_ns()
+        function(argument)
+        durations_ns.append(time.perf_counter_ns() - start_ns)
+
+    median_s = statistics.median(durations_ns) / 1e9
+    result = {
+        "name": name,
+        "operations": operations,
+        "repeats": repeats,
+        "median_s": median_s,
+        "min_s": min(durations_ns) / 1e9,
+        "max_s": max(durations_ns) / 1e9,
+        "ops_per_sec": operations / median_s if median_s > 0 else 0.0,
+        "ns_per_op": median_s * 1e9 / operations if operations > 0 else 0.0,
+    }
+    return result
+
+def bench_publish_with_purpose(iterations: int, repeats: int) -> List[Dict[str, Any]]:
+    """Time ClientInterface.publish_with_purpose per PM method against the loopback sink"""
+    results = []
+    GlobalDefs.NULL_BROKER = True
+    payload = bytes(PUBLISH_PAYLOAD_BYTES)
+
+    for method in GlobalDefs.PurposeManagementMethod:
+        client = ClientInterface.create_v5_client(f"perf_publisher_{method.name}")
+        ClientInterface.connect_client(client, NULL_BROKER_ADDRESS)
+
+        def publish(_, client=client, method=method):
+            for counter in range(iterations):
+                ClientInterface.publish_with_purpose(client, method, "perf/topic", PUBLISH_PURPOSE_FILTER,
+                                                     payload=payload, correlation_data=counter)
+
+        results.append(_measure(f"publish_with_purpose[{method.name}]", publish, iterations, repeats))
+        ClientInterface.disconnect_client(client)
+
+    GlobalDefs.NULL_BROKER = False
+    return results
+
+def bench_find_described_purposes(iterations: int, repeats: int) -> List[Dict[str, Any]]:
+    """Time purpose filter expansion uncached and through the shared cache, and membership tests, on filters of increasing size"""
+    results = []
+    for filter_name, purpose_filter in PURPOSE_FILTERS.items():
+        described_purpose = GlobalDefs.find_described_purposes(purpose_filter)[-1]
+
+        def compile_filter(_, purpose_filter=purpose_filter):
+            for _ in range(iterations):
+                GlobalDefs.PurposeFilter(purpose_filter)
+
+        def expand(_, purpose_filter=purpose_filter):
+            for _ in range(iterations):
+                GlobalDefs.find_described_purposes(purpose_filter)
+
+        def check(_, purpose_filter=purpose_filter, described_purpose=described_purpose):
+            for _ in range(iterations):
+                GlobalDefs.purpose_described_by_filter(described_purpose, purpose_filter)
+
+        results.append(_measure(f"PurposeFilter[{filter_name}]", compile_filter, iterations, repeats))
+        results.append(_measure(f"find_described_purposes[{filter_name}]", expand, iterations, repeats))
+        results.append(_measure(f"purpose_described_by_filter[{filter_name}]", check, iterations, repeats))
+    return results
+
+def bench_result_logger(lines: int, repeats: int, work_dir: str) -> List[Dict[str, Any]]:
+    """Time ResultLogger from the first log call until every line is on disk"""
+
+    # The logger refuses to overwrite an existing file, so each run gets its own
+    run_counter = itertools.count()
+
+    def new_log_path():
+        return os.path.join(work_dir, f"logger_{next(run_counter)}.log")
+
+    def log_lines(log_path):
+        logger = ResultLogger()
+        logger.start(log_path)
+        timestamp = get_timestamp_ns()
+        for counter in range(lines):
+            logger.log_publish(timestamp + counter, "perf", "perf_publisher", counter, "perf/topic", "billing", "DATA", PUBLISH_PAYLOAD_BYTES)
+        logger.shutdown()
+
+    return [_measure("ResultLogger.log_publish (lines)", log_lines, lines, repeats, new_log_path)]
+
+def bench_event_scheduler(events: int, repeats: int) -> List[Dict[str, Any]]:
+    """Time EventScheduler dispatch of events that are all due"""
+
+    def setup():
+        scheduler = EventScheduler()
+        scheduler.register_handler("perf", lambda params: None)
+        for counter in range(events):
+            scheduler.schedule_event(-float(events - counter), "perf", {"counter": counter}, "perf event")
+        scheduler.start()
+        return scheduler
+
+    return [_measure("EventScheduler.process_due_events (events)", lambda scheduler: scheduler.process_due_events(),
+                     events, repeats, setup)]
+
+def bench_metrics_calculator(sizes: List[int], work_dir: str) -> List[Dict[str, Any]]:
+    """Time MetricsCalculator parsing and full analysis on synthetic logs of each size"""
+    results = []
+    benchmark_config = ConfigParser().parse_config(ANALYZER_CONFIG)
+    for size in sizes:
+        log_path = os.path.join(work_dir, f"analyzer_{size}.log")
+        duration_ms = ANALYZER_START_MS + int(size / ANALYZER_RECORDS_PER_SECOND * 1000)
+        truth = LogGenerator(benchmark_config, GeneratorSettings(duration_ms=duration_ms)).generate(log_path)
+        written = truth["publish_records"] + truth["totals"]["received"]
+
+        results.append(_measure(f"MetricsCalculator.parse_log_file[{size:.0e} events]",
+                                lambda _: MetricsCalculator().parse_log_file(log_path), written, 1))
+        results.append(_measure(f"MetricsCalculator.calculate_all_metrics[{size:.0e} events]",
+                                lambda _: MetricsCalculator().calculate_all_metrics(log_path), written, 1))
+
+        os.remove(log_path)
+    return results
+
+def _print_result(result: Dict[str, Any], baseline: Dict[str, Dict[str, Any]]):
+    line = f"{result['name']:<55} {result['ops_per_sec']:>15,.1f} ops/s {result['ns_per_op']:>12,.1f} ns/op"
+    previous = baseline.get(result['name'])
+    if previous is not None and previous['ops_per_sec'] > 0:
+        line += f" {(result['ops_per_sec'] / previous['ops_per_sec'] - 1.0) * 100.0:>+8.1f}%"
+    print(line)
+
+def _get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the benchmark's hot paths without a broker")
+    parser.add_argument("-o", "--outfile", default="perf_results.json", help="The JSON file in which to store the results (default: 'perf_results.json')")
+    parser.add_argument("-b", "--benchmarks", nargs="+", choices=BENCHMARK_NAMES, default=BENCHMARK_NAMES,
+                        help="The benchmarks to run (default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=10000, help="Operations per timed run (default: 10000)")
+    parser.add_argument("-r", "--repeats", type=int, default=5, help="Timed runs per benchmark, the median is reported (default: 5)")
+    parser.add_argument("--analyzer-events", type=float, nargs="+", default=[1e5],
+                        help="Synthetic log sizes in events for the analyzer, e.g. 1e5 1e6 (default: 1e5)")
+    parser.add_argument("--baseline", help="A previous results file to report the change in throughput against (optional)")
+    args = parser.parse_args()
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = {result['name']: result for result in json.load(f)['results']}
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        benchmarks: Dict[str, Callable[[], List[Dict[str, Any]]]] = {
+            "publish": lambda: bench_publish_with_purpose(args.iterations, args.repeats),
+            "purposes": lambda: bench_find_described_purposes(args.iterations, args.repeats),
+            "logger": lambda: bench_result_logger(args.iterations * 10, args.repeats, work_dir),
+            "scheduler": lambda: bench_event_scheduler(args.iterations, args.repeats),
+            "analyzer": lambda: bench_metrics_calculator([int(size) for size in args.analyzer_events], work_dir),
+        }
+
+        for name in BENCHMARK_NAMES:
+            if name not in args.benchmarks:
+                continue
+
+            # Console output of the modules under test is part of their cost but not of the report
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                benchmark_results = benchmarks[name]()
+            for result in benchmark_results:
+                _print_result(result, baseline)
+            results += benchmark_results
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "repeats": args.repeats,
+        "results": results,
+    }
+    with open(args.outfile, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to: {args.outfile}")
+
+if __name__ == "__main__":
+    main()